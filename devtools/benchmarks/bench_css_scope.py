@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+CSS Scoping Benchmark - Compare tools/css_scope.py with the legacy BS4+cssutils path
+
+Times both implementations on the official apps and on synthetic large
+stylesheets, and checks that they scope the official apps the same way
+(same top-level selectors and the same root element tagged).
+
+Usage:
+    python benchmarks/bench_css_scope.py
+    python benchmarks/bench_css_scope.py --rules 1000 5000 --repeat 5
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import logging
+import argparse
+from pathlib import Path
+
+devtools_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(devtools_dir / 'tools'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from css_scope import scope_app_styles
+from legacy_css_scope import scope_app_styles as legacy_scope_app_styles
+
+import cssutils
+from bs4 import BeautifulSoup
+
+# The legacy path logs a warning for every rule cssutils does not understand
+cssutils.log.setLevel(logging.CRITICAL)
+
+OFFICIAL_DIR = devtools_dir.parent / 'official'
+
+
+def load_official_apps():
+    """Return [(name, app_id, html fragment)] built like the packer's minify stage output"""
+    apps = []
+    for app_dir in sorted(glob.glob(str(OFFICIAL_DIR / '*'))):
+        app_files = [f for f in glob.glob(os.path.join(app_dir, '*.app')) if '_packaged' not in f]
+        index_html = os.path.join(app_dir, 'src', 'index.html')
+        if not app_files or not os.path.exists(index_html):
+            continue
+        with open(app_files[0], 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        css = []
+        for style in metadata.get('styles', ['style.css']):
+            path = os.path.join(app_dir, 'src', style)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    css.append(f.read())
+        with open(index_html, 'r', encoding='utf-8') as f:
+            html = f.read()
+        html += f"\n<style>{''.join(css)}</style>\n<script>console.log('ok');</script>"
+        apps.append((os.path.basename(app_dir), metadata['id'], html))
+    return apps
+
+
+def synthetic_app(rule_count):
+    """An HTML fragment with a large stylesheet: plain rules, @media blocks and keyframes"""
+    rules = []
+    for i in range(rule_count):
+        if i % 50 == 0:
+            rules.append(f"@keyframes fade{i} {{ from {{ opacity: 0; }} to {{ opacity: 1; }} }}")
+        if i % 20 == 0:
+            rules.append(
+                f"@media (max-width: {400 + i}px) {{ .item-{i} .title, .item-{i}:hover {{ padding: {i % 16}px; }} }}"
+            )
+        rules.append(
+            f".app-container .item-{i} > .title:not(.hidden), #panel-{i} [data-kind=\"x{i}\"] "
+            f"{{ color: #{i % 4096:03x}; margin: 0 {i % 8}px; animation: fade{i - i % 50} 0.{i % 9 + 1}s ease; }}"
+        )
+    html = '<div class="app-container"><div class="app-content">Synthetic</div></div>'
+    return html + f"\n<style>{chr(10).join(rules)}</style>"
+
+
+def time_call(func, payload, appid, repeat):
+    """Best wall time of repeat calls, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload, appid)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def _scoping_summary(html):
+    """Top-level selectors (normalized by cssutils) and the tagged root element of a scoped fragment"""
+    soup = BeautifulSoup(html, 'html.parser')
+    selectors = []
+    for style in soup.find_all('style'):
+        sheet = cssutils.parseString(style.string or '', validate=False)
+        selectors.extend(rule.selectorText for rule in sheet.cssRules if rule.type == rule.STYLE_RULE)
+    root = soup.find(attrs={'data-appid': True})
+    root_desc = (root.name, tuple(root.get('class', []))) if root else None
+    return selectors, root_desc
+
+
+def check_parity(apps):
+    """Compare the scoping of both implementations on the official apps"""
+    ok = True
+    for name, appid, html in apps:
+        legacy = _scoping_summary(legacy_scope_app_styles(html, appid))
+        current = _scoping_summary(scope_app_styles(html, appid))
+        same = legacy == current
+        ok = ok and same
+        print(f"   {'✅' if same else '❌'} {name}: {len(current[0])} top-level rules, root {current[1]}")
+        if not same:
+            missing = [s for s in legacy[0] if s not in current[0]]
+            extra = [s for s in current[0] if s not in legacy[0]]
+            print(f"      legacy-only: {missing[:5]}  new-only: {extra[:5]}  roots: {legacy[1]} vs {current[1]}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSS scoping implementations')
+    parser.add_argument('--rules', type=int, nargs='+', default=[500, 2000], help='Synthetic stylesheet sizes in rules')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case (best time is reported)')
+    args = parser.parse_args()
+
+    apps = load_official_apps()
+    cases = [(name, appid, html) for name, appid, html in apps]
+    cases += [(f"synthetic-{n}", 'bench-app', synthetic_app(n)) for n in args.rules]
+
+    print(f"⏱️  CSS scoping: legacy (BS4+cssutils) vs css_scope (best of {args.repeat})")
+    print(f"   {'Case':<24}  {'Size':>9}  {'Legacy':>10}  {'New':>9}  {'Speedup':>8}")
+    print(f"   {'-' * 24}  {'-' * 9}  {'-' * 10}  {'-' * 9}  {'-' * 8}")
+    for name, appid, html in cases:
+        legacy_ms = time_call(legacy_scope_app_styles, html, appid, args.repeat)
+        new_ms = time_call(scope_app_styles, html, appid, args.repeat)
+        print(
+            f"   {name:<24}  {len(html) / 1024:>6.1f} KB  {legacy_ms:>7.1f} ms  {new_ms:>6.1f} ms  "
+            f"{legacy_ms / new_ms if new_ms else float('inf'):>7.1f}x"
+        )
+
+    print(f"\n🔍 Parity on official apps:")
+    if not check_parity(apps):
+        print(f"❌ Scoping differs from the legacy path")
+        sys.exit(1)
+    print(f"✅ Same top-level selectors and root tagging as the legacy path")
+
+
+if __name__ == '__main__':
+    main()
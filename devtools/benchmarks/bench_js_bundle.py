@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+JS Bundling Benchmark - Compare tools/js_bundle.py with plain script concatenation
+
+For the official apps and a synthetic app (classic scripts full of unused
+helpers plus a tree of ES modules), reports the script size concatenated and
+bundled, before and after minification, and the bundling time. With node on
+the PATH it also checks that every bundle compiles and times how long V8
+takes to parse each variant.
+
+Usage:
+    python benchmarks/bench_js_bundle.py
+    python benchmarks/bench_js_bundle.py --helpers 200 1000 --repeat 5
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+devtools_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(devtools_dir / 'tools'))
+
+from js_bundle import bundle_scripts, BundleError
+from pack_app import minify_js, _minifier
+
+OFFICIAL_DIR = devtools_dir.parent / 'official'
+
+# Compiles each file given on the command line 20 times; prints the best time in ms per file (null if it does not compile)
+_NODE_PARSE_SCRIPT = r"""
+const fs = require('fs');
+const vm = require('vm');
+const times = process.argv.slice(1).map((path) => {
+  const source = fs.readFileSync(path, 'utf8');
+  let best = Infinity;
+  for (let i = 0; i < 20; i++) {
+    const start = process.hrtime.bigint();
+    try {
+      new vm.Script(source, { filename: path + '#' + i });
+    } catch (e) {
+      return null;
+    }
+    best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  return best;
+});
+console.log(JSON.stringify(times));
+"""
+
+
+def load_official_apps():
+    """Return [(name, script order, {path: content}, index.html)] for the official apps"""
+    apps = []
+    for app_dir in sorted(glob.glob(str(OFFICIAL_DIR / '*'))):
+        app_files = [f for f in glob.glob(os.path.join(app_dir, '*.app')) if '_packaged' not in f]
+        index_html = os.path.join(app_dir, 'src', 'index.html')
+        if not app_files or not os.path.exists(index_html):
+            continue
+        with open(app_files[0], 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        script_order = metadata.get('scripts', ['script.js'])
+        sources = {}
+        for script in script_order:
+            path = os.path.join(app_dir, 'src', script)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    sources[script] = f.read()
+            else:
+                sources[script] = None
+        with open(index_html, 'r', encoding='utf-8') as f:
+            html = f.read()
+        apps.append((os.path.basename(app_dir), script_order, sources, html))
+    return apps
+
+
+def synthetic_app(helper_count):
+    """Classic scripts where one helper in four is used, plus an ES module tree with unused exports"""
+    scripts = {}
+    script_order = []
+    for part in range(4):
+        lines = [f"// Helpers, part {part}"]
+        for i in range(part, helper_count, 4):
+            lines.append(
+                f"function helper{i}(value) {{\n"
+                f"    const scaled = value * {i % 7 + 1};\n"
+                f"    return scaled > {i} ? `big ${{scaled}}` : 'small ' + scaled;\n"
+                f"}}"
+            )
+            lines.append(f"const TABLE_{i} = {{ id: {i}, label: 'row {i}', tags: ['a', 'b', 'c'] }};")
+        name = f"js/helpers{part}.js"
+        scripts[name] = '\n'.join(lines) + '\n'
+        script_order.append(name)
+
+    used = ', '.join(f"helper{i}({i})" for i in range(0, helper_count, 4))
+    scripts['js/main.js'] = f"function init() {{\n    return [{used}];\n}}\n"
+    script_order.append('js/main.js')
+
+    module_count = max(2, helper_count // 50)
+    for m in range(module_count):
+        lines = []
+        if m + 1 < module_count:
+            lines.append(f"import {{ compute{m + 1} }} from './mod{m + 1}.js';")
+        for j in range(10):
+            body = f"compute{m + 1}(x) + {j}" if m + 1 < module_count and j == 0 else f"x * {j + 1}"
+            lines.append(f"export function {'compute' if j == 0 else 'extra'}{m if j == 0 else f'{m}_{j}'}(x) {{ return {body}; }}")
+        scripts[f"modules/mod{m}.js"] = '\n'.join(lines) + '\n'
+    scripts['modules/entry.js'] = "import { compute0 } from './mod0.js';\nwindow.result = compute0(1);\n"
+    script_order.append('modules/entry.js')
+
+    html = '<div class="app-container"><button onclick="init()">Run</button></div>'
+    return script_order, scripts, html
+
+
+def concatenate(script_order, sources):
+    """Scripts joined in declared order, as the packer does without bundling"""
+    return '\n\n'.join(sources[name] for name in script_order if sources.get(name) is not None)
+
+
+def time_bundle(script_order, sources, html, repeat):
+    """Bundle repeat times; returns (result, best wall time in ms)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = bundle_scripts(script_order, sources, html)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def node_parse_times(node, codes):
+    """V8 compile time in ms for each JavaScript string, or None where it does not compile"""
+    tmp_dir = tempfile.mkdtemp(prefix='sypnex-bench-bundle-')
+    try:
+        paths = []
+        for i, code in enumerate(codes):
+            path = os.path.join(tmp_dir, f"{i}.js")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(code)
+            paths.append(path)
+        completed = subprocess.run([node, '-e', _NODE_PARSE_SCRIPT] + paths, capture_output=True, text=True, check=True)
+        return json.loads(completed.stdout)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JS bundling against script concatenation')
+    parser.add_argument('--helpers', type=int, nargs='+', default=[200, 1000], help='Synthetic app sizes in helper functions')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case (best time is reported)')
+    args = parser.parse_args()
+
+    cases = load_official_apps()
+    for n in args.helpers:
+        # Only the entry module is listed; the rest are found through its imports
+        cases.append((f"synthetic-{n}",) + synthetic_app(n))
+
+    minify = _minifier('js') is not None
+    node = shutil.which('node')
+    if not minify:
+        print(f"⚠️  jsmin not installed - minified sizes equal the raw sizes")
+    if not node:
+        print(f"⚠️  node not found - skipping the compile check and parse times")
+
+    print(f"⏱️  JS bundling vs concatenation (best of {args.repeat})")
+    print(f"   {'Case':<22}  {'Concat':>9}  {'Bundle':>9}  {'Concat min':>10}  {'Bundle min':>10}  {'Dropped':>7}  {'Time':>8}")
+    failed = []
+    parse_rows = []
+    for name, script_order, sources, html in cases:
+        concatenated = concatenate(script_order, sources)
+        try:
+            result, bundle_ms = time_bundle(script_order, sources, html, args.repeat)
+        except BundleError as e:
+            print(f"   ❌ {name}: {e}")
+            failed.append(name)
+            continue
+        concat_min = minify_js(concatenated) if minify else concatenated
+        bundle_min = minify_js(result['js']) if minify else result['js']
+        print(
+            f"   {name:<22}  {len(concatenated) / 1024:>6.1f} KB  {len(result['js']) / 1024:>6.1f} KB  "
+            f"{len(concat_min) / 1024:>7.1f} KB  {len(bundle_min) / 1024:>7.1f} KB  "
+            f"{len(result['dropped']) + len(result['shadowed']):>7}  {bundle_ms:>5.1f} ms"
+        )
+        if result['missing']:
+            print(f"      missing: {', '.join(result['missing'])}")
+        parse_rows.append((name, concat_min, bundle_min))
+
+    if node and parse_rows:
+        print(f"\n🔍 V8 parse time of the minified output (node vm.Script, best of 20):")
+        times = node_parse_times(node, [code for row in parse_rows for code in row[1:]])
+        for index, (name, _, _) in enumerate(parse_rows):
+            concat_ms, bundle_ms = times[2 * index], times[2 * index + 1]
+            if bundle_ms is None:
+                print(f"   ❌ {name}: bundle does not compile")
+                failed.append(name)
+            elif concat_ms is None:
+                # Concatenated ES modules are not a valid classic script
+                print(f"   {name:<22}  concat n/a  bundle {bundle_ms:>6.2f} ms")
+            else:
+                print(f"   {name:<22}  concat {concat_ms:>6.2f} ms  bundle {bundle_ms:>6.2f} ms")
+
+    if failed:
+        print(f"\n❌ Bundling failed for: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"\n✅ Every app bundled")
+
+
+if __name__ == '__main__':
+    main()
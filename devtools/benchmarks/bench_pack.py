@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Pack Pipeline Benchmark - Time every packer stage on real and synthetic apps
+
+Packs every app in official/ plus generated large apps (hundreds of scripts,
+multi-megabyte stylesheets, large additional_files) with the build cache
+disabled and validation answered by an in-process stub server, so each run
+measures the full cold pipeline without a Sypnex OS instance.
+
+Per app it records the time of each stage (read, validate, minify, scope,
+serialize, checksum) and the peak traced memory; discovery is timed once for
+the whole suite. Results are written as JSON and can be compared against a
+previous run, failing when a stage regresses by more than a threshold.
+
+Usage:
+    python benchmarks/bench_pack.py --output baseline.json
+    python benchmarks/bench_pack.py --compare baseline.json --threshold 15
+    python benchmarks/bench_pack.py --suite synthetic --scale 2 --repeat 5
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import platform
+import argparse
+import threading
+import functools
+import contextlib
+import io
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+devtools_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(devtools_dir / 'tools'))
+
+import pack_app
+import package_writer
+from deploy_all import discover_apps
+
+OFFICIAL_DIR = devtools_dir.parent / 'official'
+STAGES = ('read', 'validate', 'minify', 'scope', 'serialize', 'checksum')
+RESULTS_VERSION = 1
+
+# Stages faster than this in the baseline are too noisy to flag as regressions
+MIN_COMPARE_SECONDS = 0.005
+
+
+class _ValidationHandler(BaseHTTPRequestHandler):
+    """Accepts every validation request, like a server with no rule violations"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        body = json.dumps({'validation_results': {'is_valid': True, 'errors': []}}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def stub_validation_server():
+    """Run a validation stub on an ephemeral port and point the packer at it"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ValidationHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    saved = {name: os.environ.get(name) for name in ('SYPNEX_SERVER_URL', 'SYPNEX_DEV_TOKEN', 'SYPNEX_BUILD_CACHE')}
+    os.environ['SYPNEX_SERVER_URL'] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ['SYPNEX_DEV_TOKEN'] = 'benchmark-token'
+    # Every run measures the cold pipeline
+    os.environ['SYPNEX_BUILD_CACHE'] = '0'
+    try:
+        yield
+    finally:
+        server.shutdown()
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class StageTimer:
+    """Accumulates wall time per stage by wrapping the packer's stage functions"""
+
+    def __init__(self):
+        self.times = {}
+        self._patches = []
+
+    def _wrap(self, owner, name, stage):
+        original = getattr(owner, name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.times[stage] = self.times.get(stage, 0.0) + time.perf_counter() - start
+
+        setattr(owner, name, timed)
+        self._patches.append((owner, name, original))
+
+    def __enter__(self):
+        self._wrap(pack_app, '_prepare_build', 'read')
+        self._wrap(pack_app, '_concatenate_stage', 'read')
+        self._wrap(pack_app, 'verify_sources', 'validate')
+        self._wrap(pack_app, '_minify_cached', 'minify')
+        self._wrap(pack_app, 'scope_app_styles', 'scope')
+        self._wrap(package_writer.Package, 'write', 'serialize')
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+
+
+def _pack_once(app_dir, output_file):
+    """Pack one app quietly, returning (stage times, package size)"""
+    with StageTimer() as timer, contextlib.redirect_stdout(io.StringIO()):
+        if not pack_app.pack_app(app_dir, output_file):
+            raise RuntimeError(f"Packing {app_dir} failed")
+        # What a recipient pays to verify the .sha256 file
+        start = time.perf_counter()
+        pack_app.generate_checksum(output_file)
+        timer.times['checksum'] = time.perf_counter() - start
+    return timer.times, os.path.getsize(output_file)
+
+
+def benchmark_app(app_dir, work_dir, repeat):
+    """Pack an app repeat times, keeping each stage's best time, then measure peak memory"""
+    output_file = os.path.join(work_dir, 'bench_packaged.app')
+    best = {}
+    totals = []
+    package_size = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        times, package_size = _pack_once(app_dir, output_file)
+        totals.append(time.perf_counter() - start)
+        for stage, seconds in times.items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+
+    tracemalloc.start()
+    try:
+        _pack_once(app_dir, output_file)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'stages': {stage: round(best.get(stage, 0.0), 6) for stage in STAGES},
+        'total': round(min(totals), 6),
+        'peak_memory': peak,
+        'package_size': package_size
+    }
+
+
+def _write_app(app_dir, app_id, scripts, styles, additional_files=None):
+    """Write a development app with src/index.html and the given sources"""
+    src_dir = os.path.join(app_dir, 'src')
+    os.makedirs(src_dir, exist_ok=True)
+    metadata = {
+        'id': app_id,
+        'name': app_id,
+        'type': 'user_app',
+        'scripts': list(scripts),
+        'styles': list(styles)
+    }
+    if additional_files:
+        metadata['additional_files'] = additional_files
+    with open(os.path.join(app_dir, f"{app_id}.app"), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    with open(os.path.join(src_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write('<div class="app-container">\n  <div class="app-content">\n'
+                + ''.join(f'    <section class="panel-{i}"><h2>Panel {i}</h2><button id="btn-{i}">Go</button></section>\n'
+                          for i in range(50))
+                + '  </div>\n</div>\n')
+    for name, content in list(scripts.items()) + list(styles.items()):
+        path = os.path.join(src_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+def _script(index, functions):
+    return ''.join(
+        f"// Module {index} helper {n}\n"
+        f"function module{index}_helper{n}(items, options) {{\n"
+        f"    const result = [];\n"
+        f"    for (let i = 0; i < items.length; i++) {{\n"
+        f"        if (items[i] && items[i].value > {n}) {{\n"
+        f"            result.push(`${{items[i].label}}: ${{items[i].value * {index + 1}}}`);\n"
+        f"        }}\n"
+        f"    }}\n"
+        f"    return options && options.sorted ? result.sort() : result;\n"
+        f"}}\n\n"
+        for n in range(functions)
+    )
+
+
+def _stylesheet(rules):
+    return ''.join(
+        f"/* Rule {i} */\n"
+        f".app-container .panel-{i % 50} .item-{i} > .title:not(.hidden) {{\n"
+        f"    color: #{i % 4096:03x};\n    margin: 0 {i % 8}px;\n    padding: {i % 12}px {i % 5}px;\n"
+        f"    transition: opacity 0.{i % 9 + 1}s ease-in-out;\n}}\n"
+        + (f"@media (max-width: {400 + i % 800}px) {{\n    .item-{i} {{ display: none; }}\n}}\n" if i % 25 == 0 else '')
+        for i in range(rules)
+    )
+
+
+def generate_synthetic_apps(root_dir, scale=1.0):
+    """Generate large apps under root_dir and return their directories"""
+    rng = random.Random(42)
+    apps = []
+
+    # Hundreds of small scripts
+    app_dir = os.path.join(root_dir, 'many_scripts')
+    count = int(300 * scale)
+    _write_app(app_dir, 'bench-many-scripts',
+               {f"js/module_{i:04d}.js": _script(i, 4) for i in range(count)},
+               {'style.css': _stylesheet(200)})
+    apps.append(app_dir)
+
+    # Multi-megabyte stylesheet
+    app_dir = os.path.join(root_dir, 'large_styles')
+    _write_app(app_dir, 'bench-large-styles',
+               {'script.js': _script(0, 50)},
+               {'style.css': _stylesheet(int(12000 * scale)), 'theme.css': _stylesheet(int(3000 * scale))})
+    apps.append(app_dir)
+
+    # Large additional_files (incompressible assets and a big JSON document)
+    app_dir = os.path.join(root_dir, 'large_assets')
+    assets_dir = os.path.join(app_dir, 'src', 'assets')
+    os.makedirs(assets_dir, exist_ok=True)
+    additional_files = []
+    for i in range(3):
+        name = f"texture_{i}.bin"
+        with open(os.path.join(assets_dir, name), 'wb') as f:
+            f.write(rng.randbytes(int(8 * 1024 * 1024 * scale)))
+        additional_files.append({'source_file': f"assets/{name}", 'vfs_path': f"/apps/bench/{name}"})
+    with open(os.path.join(assets_dir, 'data.json'), 'w', encoding='utf-8') as f:
+        json.dump([{'id': i, 'label': f"item {i}", 'value': rng.random()} for i in range(int(100000 * scale))], f)
+    additional_files.append({'source_file': 'assets/data.json', 'vfs_path': '/apps/bench/data.json'})
+    _write_app(app_dir, 'bench-large-assets', {'script.js': _script(0, 20)}, {'style.css': _stylesheet(100)}, additional_files)
+    apps.append(app_dir)
+
+    return apps
+
+
+def run_suite(app_dirs, root_dir, repeat):
+    """Benchmark a list of app directories found under root_dir"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        discovered = discover_apps(root_dir)
+    discover_time = time.perf_counter() - start
+    names = {app_dir: app_id for app_id, _, app_dir in discovered}
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='sypnex-bench-')
+    try:
+        for app_dir in app_dirs:
+            name = os.path.basename(app_dir.rstrip(os.sep))
+            print(f"⏱️  {name} ({names.get(os.path.abspath(app_dir), '?')})...", flush=True)
+            results[name] = benchmark_app(app_dir, work_dir, repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {'discover': round(discover_time, 6), 'apps': results}
+
+
+def print_results(results):
+    print(f"\n📊 Results (best of {results['repeat']}):")
+    header = ''.join(f"  {stage:>9}" for stage in STAGES)
+    print(f"   {'App':<24}{header}  {'Total':>9}  {'Peak mem':>9}  {'Size':>9}")
+    for suite_name, suite in results['suites'].items():
+        print(f"   [{suite_name}] discover: {suite['discover'] * 1000:.1f} ms")
+        for name, app in suite['apps'].items():
+            stages = ''.join(f"  {app['stages'][stage] * 1000:>6.1f} ms" for stage in STAGES)
+            print(
+                f"   {name:<24}{stages}  {app['total'] * 1000:>6.1f} ms"
+                f"  {app['peak_memory'] / 1024 / 1024:>6.1f} MB  {app['package_size'] / 1024 / 1024:>6.2f} MB"
+            )
+
+
+def compare_results(current, baseline, threshold):
+    """Print per-stage changes against a baseline and return the list of regressions"""
+    regressions = []
+    print(f"\n📈 Comparison with baseline from {baseline.get('created_at', 'unknown')} (threshold {threshold:.0f}%):")
+    for suite_name, suite in current['suites'].items():
+        base_suite = baseline.get('suites', {}).get(suite_name)
+        if not base_suite:
+            print(f"   [{suite_name}] not in baseline - skipped")
+            continue
+        for name, app in suite['apps'].items():
+            base_app = base_suite['apps'].get(name)
+            if not base_app:
+                print(f"   {name}: not in baseline - skipped")
+                continue
+            metrics = [(stage, app['stages'][stage], base_app['stages'].get(stage)) for stage in STAGES]
+            metrics.append(('total', app['total'], base_app.get('total')))
+            for metric, value, base in metrics:
+                if base is None or base < MIN_COMPARE_SECONDS:
+                    continue
+                change = 100 * (value - base) / base
+                flag = '❌' if change > threshold else ('✅' if change < -threshold else '  ')
+                if change > threshold:
+                    regressions.append(f"{name}/{metric}")
+                print(f"   {flag} {name:<24} {metric:<10} {base * 1000:>8.1f} ms → {value * 1000:>8.1f} ms ({change:+.1f}%)")
+
+            base_peak = base_app.get('peak_memory')
+            if base_peak:
+                change = 100 * (app['peak_memory'] - base_peak) / base_peak
+                if change > threshold:
+                    regressions.append(f"{name}/peak_memory")
+                    print(f"   ❌ {name:<24} {'memory':<10} {base_peak / 1024 / 1024:>8.1f} MB → "
+                          f"{app['peak_memory'] / 1024 / 1024:>8.1f} MB ({change:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Sypnex app packer')
+    parser.add_argument('--suite', choices=['official', 'synthetic', 'all'], default='all', help='Apps to benchmark (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per app; the best time per stage is kept (default: 3)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Size multiplier for the synthetic apps (default: 1.0)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Compare against a previous results JSON file')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regression threshold in percent (default: 10)')
+    args = parser.parse_args()
+
+    results = {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'scale': args.scale,
+        'suites': {}
+    }
+
+    synthetic_dir = None
+    with stub_validation_server():
+        try:
+            if args.suite in ('official', 'all'):
+                official = [app_dir for _, _, app_dir in discover_apps(str(OFFICIAL_DIR))]
+                results['suites']['official'] = run_suite(official, str(OFFICIAL_DIR), args.repeat)
+            if args.suite in ('synthetic', 'all'):
+                synthetic_dir = tempfile.mkdtemp(prefix='sypnex-bench-apps-')
+                print(f"🧪 Generating synthetic apps (scale {args.scale})...")
+                synthetic = generate_synthetic_apps(synthetic_dir, args.scale)
+                results['suites']['synthetic'] = run_suite(synthetic, synthetic_dir, args.repeat)
+        finally:
+            if synthetic_dir:
+                shutil.rmtree(synthetic_dir, ignore_errors=True)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != results['scale']:
+            print(f"⚠️  Baseline was recorded at scale {baseline.get('scale')}, this run uses {results['scale']}")
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ No regressions above {args.threshold:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark - Check sypnex.py import cost per command against a budget
+
+Runs each command under `python -X importtime` and sums the cumulative time
+of its top-level imports, leaving out the ones the interpreter makes on its
+own (site, encodings - whatever `python -X importtime -c pass` imports), so
+the number is what sypnex.py and the modules it pulls in cost.
+
+Every command has an import budget and a list of modules it must not load at
+all on these paths (requests, the minifiers, zstandard and the legacy CSS
+stack). The benchmark exits with status 1 when a command exceeds its budget
+or loads a forbidden module.
+
+Commands run against temp directories and an unreachable server, so they fail
+fast without doing real work; only their startup is measured.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --output startup.json
+    python benchmarks/bench_startup.py --scale 2      # slower machine: double every budget
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+devtools_dir = Path(__file__).parent.parent
+SYPNEX = devtools_dir / 'sypnex.py'
+RESULTS_VERSION = 1
+
+# Imported only when a command actually sends a request or packs an app
+NETWORK_MODULES = ('requests', 'urllib3')
+PACK_MODULES = ('csscompressor', 'jsmin', 'htmlmin', 'zstandard')
+LEGACY_MODULES = ('bs4', 'lxml', 'cssutils')
+
+# (name, arguments, import budget in ms, modules the command must not import);
+# {tmp} is a temp directory with no apps or packages in it
+COMMANDS = (
+    ('help', ['--help'], 40, NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES + ('dotenv',)),
+    ('config', ['config'], 40, NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES),
+    ('verify', ['verify', '{tmp}'], 60, NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES),
+    ('release manifest', ['release', 'manifest', '{tmp}', '--output', '{tmp}/versions.json'], 60,
+     NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES),
+    ('pack all', ['pack', 'all', '{tmp}', '--out', '{tmp}/releases'], 80,
+     NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES),
+    ('pack', ['pack', '{tmp}/missing_app'], 80, NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES),
+    ('deploy vfs', ['deploy', 'vfs', '{tmp}/missing.py'], 80, NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES),
+    ('deploy app', ['deploy', 'app', '{tmp}/missing_app'], 100, NETWORK_MODULES + PACK_MODULES + LEGACY_MODULES),
+)
+
+
+def parse_importtime(stderr):
+    """Return ({top-level module: cumulative µs}, set of every imported module) from -X importtime output"""
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        modules.add(name.strip())
+        # Nested imports are indented; their time is already in their parent's cumulative
+        if not name[1:].startswith(' '):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, modules
+
+
+def run_importtime(args, env):
+    """Run python -X importtime with args; returns (top-level import µs, modules, wall seconds)"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args,
+        cwd=str(devtools_dir), env=env, stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    wall = time.perf_counter() - start
+    top_level, modules = parse_importtime(completed.stderr)
+    return top_level, modules, wall
+
+
+def benchmark_command(args, env, interpreter_modules, repeat):
+    """Best import time (ms, excluding interpreter startup) and wall time of a command, plus its modules"""
+    best_import = best_wall = None
+    modules = set()
+    for _ in range(repeat):
+        top_level, run_modules, wall = run_importtime([str(SYPNEX)] + args, env)
+        import_ms = sum(us for name, us in top_level.items() if name not in interpreter_modules) / 1000
+        best_import = import_ms if best_import is None else min(best_import, import_ms)
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+        modules |= run_modules
+    return best_import, best_wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check sypnex.py startup import time against per-command budgets')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per command; the best time is kept (default: 5)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for every budget, for slower machines (default: 1.0)')
+    parser.add_argument('--command', action='append', help='Only run this command (by name; can be repeated)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='sypnex-bench-startup-')
+    env = dict(os.environ)
+    # Never reach a real server, and keep the build cache out of the user's home
+    env['SYPNEX_SERVER_URL'] = 'http://127.0.0.1:9'
+    env['SYPNEX_CACHE_DIR'] = os.path.join(tmp_dir, 'cache')
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    # Measure the CLI itself, not forwarding to a running dev daemon
+    env['SYPNEX_DAEMON'] = '0'
+
+    results = {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'scale': args.scale,
+        'commands': {}
+    }
+    failures = []
+
+    try:
+        interpreter_modules = set(run_importtime(['-c', 'pass'], env)[0])
+        print(f"🐍 Excluding {len(interpreter_modules)} interpreter startup imports")
+        print(f"\n📊 Startup (best of {args.repeat}):")
+        print(f"   {'Command':<18}  {'Imports':>9}  {'Budget':>9}  {'Wall':>9}")
+
+        for name, command_args, budget_ms, forbidden in COMMANDS:
+            if args.command and name not in args.command:
+                continue
+            command_args = [arg.format(tmp=tmp_dir) for arg in command_args]
+            import_ms, wall, modules = benchmark_command(command_args, env, interpreter_modules, args.repeat)
+            budget = budget_ms * args.scale
+            loaded = sorted(module for module in forbidden if module in modules)
+
+            over_budget = import_ms > budget
+            flag = '❌' if over_budget or loaded else '✅'
+            print(f"   {flag} {name:<16}  {import_ms:>6.1f} ms  {budget:>6.1f} ms  {wall * 1000:>6.1f} ms")
+            if loaded:
+                print(f"      imports {', '.join(loaded)}")
+                failures.append(f"{name} (imports {', '.join(loaded)})")
+            elif over_budget:
+                failures.append(f"{name} ({import_ms:.1f} ms > {budget:.1f} ms)")
+
+            results['commands'][name] = {
+                'args': command_args,
+                'import_ms': round(import_ms, 2),
+                'wall_ms': round(wall * 1000, 2),
+                'budget_ms': budget,
+                'forbidden_imported': loaded
+            }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} command(s) failed the startup budget: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\n✅ Every command within its startup budget")
+
+
+if __name__ == '__main__':
+    main()
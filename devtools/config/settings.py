@@ -7,22 +7,36 @@ Loads configuration from .env file and provides centralized access to settings.
 import os
 from typing import Optional
 
-# Try to load python-dotenv if available
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    HAS_DOTENV = True
-except ImportError:
-    HAS_DOTENV = False
-    print("💡 Tip: Install python-dotenv for .env file support: pip install python-dotenv")
+def find_env_file() -> Optional[str]:
+    """Nearest .env file, searching from this package's directory upwards (as python-dotenv does)"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, '.env')
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+def load_env_file() -> bool:
+    """Load the .env file into the environment; python-dotenv is only imported when there is one"""
+    env_file = find_env_file()
+    if env_file is None:
+        return False
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        print("💡 Tip: Install python-dotenv for .env file support: pip install python-dotenv")
+        return False
+    return load_dotenv(env_file)
 
 class SypnexConfig:
     """Centralized configuration for Sypnex OS development tools"""
     
     def __init__(self):
         # Load .env file if python-dotenv is available
-        if HAS_DOTENV:
-            load_dotenv()
+        load_env_file()
     
     @property
     def dev_token(self) -> Optional[str]:
@@ -10,15 +10,26 @@ Usage:
 Commands:
     create <app_name>              Create a new app
     deploy app <app_name>          Deploy an app
-    deploy vfs <file>              Deploy a script to VFS
+    deploy all <directory>         Deploy every app under a directory
+    deploy vfs <file|dir>          Deploy a script or sync a directory to VFS
     pack <app_name>                Package an app
+    pack all <directory>           Package every changed app into a releases folder
     config                         Show current configuration
+    release manifest [dir]         Write versions.json for packaged releases
+    verify [paths...]              Check packages against their .sha256 files
+    dev-server                     Run a local stand-in server for testing deploys
+    daemon start|stop|status       Keep the toolchain warm for pack/deploy commands
     
 Examples:
     python sypnex.py create my_awesome_app
     python sypnex.py deploy app flow_editor
+    python sypnex.py deploy all ../official
     python sypnex.py deploy vfs script.py
+    python sypnex.py deploy vfs ./assets --to /assets
     python sypnex.py pack my_app
+    python sypnex.py pack all ../official --out ../releases
+    python sypnex.py verify ../releases --json
+    python sypnex.py daemon start
 """
 
 import sys
@@ -75,8 +86,8 @@ def create_app(app_name, output_dir=None, template="basic"):
             os.chdir(original_cwd)
         print(f"❌ Error creating app: {e}")
 
-def deploy_app(app_path, server_url=None):
-    """Deploy an app"""
+def deploy_app(app_path, server_url=None, watch=False, force=False):
+    """Deploy an app, optionally redeploying on every change"""
     try:
         from tools.dev_deploy import dev_deploy
         
@@ -97,7 +108,7 @@ def deploy_app(app_path, server_url=None):
         # Find any .app file to get the ID (ignore _packaged files)
         import glob
         import json
-        all_app_files = glob.glob(os.path.join(source_dir, "*.app"))
+        all_app_files = sorted(glob.glob(os.path.join(source_dir, "*.app")))
         app_files = [f for f in all_app_files if "_packaged" not in os.path.basename(f)]
         if not app_files:
             print(f"❌ Error: No .app file found in {source_dir}")
@@ -122,7 +133,11 @@ def deploy_app(app_path, server_url=None):
         if not config.validate_config():
             return False
         
-        success = dev_deploy(app_id, source_dir, target_server)
+        if watch:
+            from tools.watch import watch_and_deploy
+            return watch_and_deploy([(app_id, source_dir)], target_server, force=force)
+        
+        success = dev_deploy(app_id, source_dir, target_server, force)
         if success:
             print(f"✅ App '{app_id}' deployed successfully!")
         else:
@@ -133,14 +148,59 @@ def deploy_app(app_path, server_url=None):
         print(f"❌ Error deploying app: {e}")
         return False
 
-def deploy_vfs(file_path, server_url=None):
-    """Deploy a file to VFS"""
+def deploy_all(root_dir, server_url=None, jobs=None, concurrency=4, watch=False, force=False):
+    """Deploy every app under a directory, optionally redeploying changed apps"""
     try:
-        from tools.vfs_deploy import deploy_python_file
+        from tools.deploy_all import deploy_all as deploy_all_func
         
         # Use provided server or default from config
         target_server = server_url or config.server_url
         
+        root_dir = os.path.abspath(root_dir)
+        if not os.path.isdir(root_dir):
+            print(f"❌ Error: Directory not found: {root_dir}")
+            return False
+        
+        # Validate config before deployment
+        if not config.validate_config():
+            return False
+        
+        success = deploy_all_func(root_dir, target_server, jobs=jobs, concurrency=concurrency, force=force)
+        
+        if watch:
+            from tools.deploy_all import discover_apps
+            from tools.watch import watch_and_deploy
+            apps = [(app_id, app_dir) for app_id, _, app_dir in discover_apps(root_dir)]
+            return watch_and_deploy(apps, target_server, initial_deploy=False)
+        
+        return success
+        
+    except Exception as e:
+        print(f"❌ Error deploying apps: {e}")
+        return False
+
+def deploy_vfs(file_path, server_url=None, remote_path=None, concurrency=4):
+    """Deploy a file to VFS, or mirror a directory to a VFS folder"""
+    try:
+        from tools.vfs_deploy import deploy_python_file, sync_directory
+        
+        # Use provided server or default from config
+        target_server = server_url or config.server_url
+        
+        if os.path.isdir(file_path):
+            local_dir = os.path.abspath(file_path)
+            remote_path = remote_path or f"/scripts/{os.path.basename(local_dir)}"
+            
+            if not config.validate_config():
+                return False
+            
+            success = sync_directory(local_dir, remote_path, target_server, concurrency)
+            if success:
+                print(f"✅ Directory '{file_path}' synced to {remote_path}")
+            else:
+                print(f"❌ Failed to sync directory '{file_path}'")
+            return success
+        
         print(f"🚀 Deploying '{file_path}' to VFS at {target_server}")
         
         # Validate config before deployment
@@ -159,6 +219,18 @@ def deploy_vfs(file_path, server_url=None):
         print(f"❌ Error deploying to VFS: {e}")
         return False
 
+def find_app_in(root_dir, app_name):
+    """Directory of the app under root_dir named app_name (a subdirectory or an app ID), or None"""
+    candidate = os.path.join(root_dir, app_name)
+    if os.path.isdir(candidate):
+        return candidate
+    from tools.pack_app import discover_apps
+    for app_id, _, app_dir in discover_apps(root_dir):
+        if app_id == app_name:
+            return app_dir
+    return None
+
+
 def pack_app(app_path):
     """Package an app"""
     try:
@@ -178,7 +250,7 @@ def pack_app(app_path):
         # Find any .app file to get the ID for naming (ignore _packaged files)
         import glob
         import json
-        all_app_files = glob.glob(os.path.join(source_dir, "*.app"))
+        all_app_files = sorted(glob.glob(os.path.join(source_dir, "*.app")))
         app_files = [f for f in all_app_files if "_packaged" not in os.path.basename(f)]
         if not app_files:
             print(f"❌ Error: No .app file found in {source_dir}")
@@ -214,8 +286,117 @@ def pack_app(app_path):
         print(f"❌ Error packaging app: {e}")
         return False
 
-def main():
-    """Main CLI entry point"""
+def pack_all(root_dir, output_dir, jobs=None, force=False):
+    """Package every changed app under a directory into a releases folder"""
+    try:
+        from tools.pack_all import pack_all as pack_all_func
+        
+        root_dir = os.path.abspath(root_dir)
+        if not os.path.isdir(root_dir):
+            print(f"❌ Error: Directory not found: {root_dir}")
+            return False
+        
+        return pack_all_func(root_dir, os.path.abspath(output_dir), jobs=jobs, force=force)
+        
+    except Exception as e:
+        print(f"❌ Error packaging apps: {e}")
+        return False
+
+def release_manifest(releases_dir, output_file):
+    """Write versions.json for the packages in a releases directory"""
+    try:
+        from tools.release_manifest import write_manifest
+        
+        if not os.path.isdir(releases_dir):
+            print(f"❌ Error: Directory not found: {releases_dir}")
+            return False
+        
+        manifest = write_manifest(releases_dir, output_file)
+        if manifest is None:
+            return False
+        print(f"📋 Wrote {output_file} with {len(manifest)} apps")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error building release manifest: {e}")
+        return False
+
+def verify_packages(paths, jobs=None, use_cache=True, as_json=False):
+    """Check packages against their .sha256 files"""
+    try:
+        from tools.verify import verify
+        return verify(paths, jobs=jobs, use_cache=use_cache, as_json=as_json)
+    except Exception as e:
+        print(f"❌ Error verifying packages: {e}")
+        return False
+
+def dev_server(port=5000, data_dir=None, drop_rate=0.0):
+    """Run the local stand-in server for testing deploys"""
+    try:
+        from tools.dev_server import run_dev_server
+        
+        data_dir = data_dir or os.path.join(os.path.expanduser('~'), '.sypnex', 'dev-server')
+        return run_dev_server(data_dir, port=port, drop_rate=drop_rate)
+        
+    except Exception as e:
+        print(f"❌ Error running dev server: {e}")
+        return False
+
+def manage_daemon(action, idle_timeout=None):
+    """Start, stop, query or run the dev daemon"""
+    try:
+        from tools import daemon
+        
+        if action == 'start':
+            return daemon.start(idle_timeout)
+        if action == 'run':
+            return daemon.run_daemon(main, idle_timeout)
+        if action == 'stop':
+            if daemon.stop():
+                print("👋 Daemon stopped")
+            else:
+                print("ℹ️  No daemon running")
+            return True
+        
+        running = daemon.status()
+        if not running:
+            print(f"ℹ️  No daemon running on {daemon.socket_path()}")
+            return False
+        print(f"🛰️  Daemon running (pid {running['pid']}) on {running['socket']}")
+        print(f"   Uptime: {running['uptime']:.0f}s, {running['requests']} commands served")
+        print(f"   Idle timeout: {running['idle_timeout']:.0f}s")
+        memory = running.get('memory_cache')
+        if memory:
+            print(f"   Memory cache: {memory['entries']} entries, "
+                  f"{memory['bytes'] / 1024 / 1024:.1f} of {memory['limit'] / 1024 / 1024:.0f} MB")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error managing daemon: {e}")
+        return False
+
+def forward_to_daemon(args, argv):
+    """Run pack/deploy commands in the dev daemon if one is running; returns the exit code or None"""
+    if args.command not in ('pack', 'deploy') or args.profile or getattr(args, 'watch', False):
+        return None
+    from tools import daemon
+    if not daemon.enabled():
+        return None
+    return daemon.forward(argv)
+
+def load_tracing():
+    """Import the tracing module the same way the tools modules do, so they share one recorder"""
+    sys.path.insert(0, str(Path(__file__).parent / 'tools'))
+    import tracing
+    return tracing
+
+def main(argv=None, use_daemon=True):
+    """Main CLI entry point
+    
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+        use_daemon: Forward pack/deploy commands to a running dev daemon
+    """
     parser = argparse.ArgumentParser(
         description='Sypnex OS Development CLI',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -227,12 +408,32 @@ Examples:
   python sypnex.py create my_dashboard --template=menu
   python sypnex.py deploy app flow_editor
   python sypnex.py deploy app my_app --server https://remote.com/
+  python sypnex.py deploy app my_app --watch
+  python sypnex.py deploy app my_app --force
+  python sypnex.py deploy all ../official --concurrency 8
+  python sypnex.py deploy all ../official --shared-vendor
   python sypnex.py deploy vfs script.py
+  python sypnex.py deploy vfs ./scripts --to /scripts --concurrency 8
   python sypnex.py pack my_app
+  python sypnex.py pack my_app --format 2
+  python sypnex.py pack my_app --compress zstd --level 10
+  python sypnex.py pack my_app --no-minify
+  python sypnex.py pack my_app --reproducible
+  python sypnex.py pack my_app --bundle
+  python sypnex.py pack text_editor ../official
+  python sypnex.py pack my_app --optimize-assets
+  python sypnex.py pack all ../official --out ../releases
+  python sypnex.py --profile trace.json deploy app my_app
   python sypnex.py config
+  python sypnex.py release manifest ../releases --output versions.json
+  python sypnex.py verify ../releases --json
+  python sypnex.py dev-server --port 5055 --drop-rate 0.2
+  python sypnex.py daemon start --idle-timeout 1800
         """
     )
     
+    parser.add_argument('--profile', metavar='OUT_JSON', help='Write a Chrome/Perfetto trace of stages and HTTP calls to this file')
+    
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Create command
@@ -249,45 +450,190 @@ Examples:
     app_parser = deploy_subparsers.add_parser('app', help='Deploy an app')
     app_parser.add_argument('app_path', help='Path to the app (directory or app name if in current dir)')
     app_parser.add_argument('--server', help='Server URL (overrides .env)')
+    app_parser.add_argument('--watch', action='store_true', help='Redeploy automatically when source files change')
+    app_parser.add_argument('--force', action='store_true', help='Reinstall even if nothing changed since the last deploy')
+    app_parser.add_argument('--format', choices=['1', '2'], help='Package format version (default: SYPNEX_PACKAGE_FORMAT or 1)')
+    app_parser.add_argument('--compress', choices=['gzip', 'zstd', 'none'], help='Compress the upload with Content-Encoding (default: SYPNEX_COMPRESSION or none)')
+    app_parser.add_argument('--level', type=int, help='Compression level (default: SYPNEX_COMPRESSION_LEVEL, 6 for gzip, 3 for zstd)')
+    app_parser.add_argument('--no-minify', action='store_true', help='Skip CSS/JS/HTML minification (debugging)')
+    app_parser.add_argument('--bundle', action='store_true', help='Bundle scripts and their ES module imports, dropping unused code (default: SYPNEX_BUNDLE_JS)')
+    app_parser.add_argument('--shared-vendor', action='store_true', help='Load vendor/ scripts from a content-addressed store shared by all apps instead of inlining them (default: SYPNEX_SHARED_VENDOR)')
+    app_parser.add_argument('--optimize-assets', action='store_true', help='Minify JSON/SVG and recompress images in additional_files (default: SYPNEX_OPTIMIZE_ASSETS)')
+    
+    # Deploy all apps under a directory
+    all_parser = deploy_subparsers.add_parser('all', help='Deploy every app under a directory')
+    all_parser.add_argument('root_dir', help='Directory to search for apps')
+    all_parser.add_argument('--server', help='Server URL (overrides .env)')
+    all_parser.add_argument('--jobs', type=int, help='Number of parallel pack workers (default: CPU count)')
+    all_parser.add_argument('--concurrency', type=int, default=4, help='Maximum simultaneous installs (default: 4)')
+    all_parser.add_argument('--watch', action='store_true', help='After deploying, redeploy changed apps automatically')
+    all_parser.add_argument('--force', action='store_true', help='Reinstall every app even if unchanged since the last deploy')
+    all_parser.add_argument('--format', choices=['1', '2'], help='Package format version (default: SYPNEX_PACKAGE_FORMAT or 1)')
+    all_parser.add_argument('--compress', choices=['gzip', 'zstd', 'none'], help='Compress uploads with Content-Encoding (default: SYPNEX_COMPRESSION or none)')
+    all_parser.add_argument('--level', type=int, help='Compression level (default: SYPNEX_COMPRESSION_LEVEL, 6 for gzip, 3 for zstd)')
+    all_parser.add_argument('--no-minify', action='store_true', help='Skip CSS/JS/HTML minification (debugging)')
+    all_parser.add_argument('--bundle', action='store_true', help='Bundle scripts and their ES module imports, dropping unused code (default: SYPNEX_BUNDLE_JS)')
+    all_parser.add_argument('--shared-vendor', action='store_true', help='Load vendor/ scripts from a content-addressed store shared by all apps instead of inlining them (default: SYPNEX_SHARED_VENDOR)')
+    all_parser.add_argument('--optimize-assets', action='store_true', help='Minify JSON/SVG and recompress images in additional_files (default: SYPNEX_OPTIMIZE_ASSETS)')
     
     # Deploy to VFS
-    vfs_parser = deploy_subparsers.add_parser('vfs', help='Deploy a file to VFS')
-    vfs_parser.add_argument('file_path', help='Exact path to the file to deploy')
+    vfs_parser = deploy_subparsers.add_parser('vfs', help='Deploy a file or sync a directory to VFS')
+    vfs_parser.add_argument('file_path', help='Exact path to the file to deploy, or a directory to mirror')
+    vfs_parser.add_argument('--to', dest='remote_path', help='VFS folder to mirror a directory into (default: /scripts/<directory name>)')
+    vfs_parser.add_argument('--concurrency', type=int, default=4, help='Maximum simultaneous uploads when syncing a directory (default: 4)')
     vfs_parser.add_argument('--server', help='Server URL (overrides .env)')
+    vfs_parser.add_argument('--compress', choices=['gzip', 'zstd', 'none'], help='Compress the upload with Content-Encoding (default: SYPNEX_COMPRESSION or none)')
+    vfs_parser.add_argument('--level', type=int, help='Compression level (default: SYPNEX_COMPRESSION_LEVEL, 6 for gzip, 3 for zstd)')
     
     # Pack command
-    pack_parser = subparsers.add_parser('pack', help='Package an app')
-    pack_parser.add_argument('app_path', help='Path to the app (directory or app name if in current dir)')
+    pack_parser = subparsers.add_parser('pack', help='Package an app, or every changed app with "pack all <directory>"')
+    pack_parser.add_argument('app_path', help='Path to the app (directory or app name if in current dir), or "all"')
+    pack_parser.add_argument('root_dir', nargs='?', help='Directory to search for apps: every app with "all", otherwise the app by directory name or ID')
+    pack_parser.add_argument('--out', default='releases', help='With "all": release directory (default: releases)')
+    pack_parser.add_argument('--jobs', type=int, help='With "all": number of parallel pack workers (default: CPU count)')
+    pack_parser.add_argument('--force', action='store_true', help='With "all": repack every app even if unchanged')
+    pack_parser.add_argument('--format', choices=['1', '2'], help='Package format version: 1 = JSON, 2 = binary container (default: SYPNEX_PACKAGE_FORMAT or 1)')
+    pack_parser.add_argument('--compress', choices=['gzip', 'zstd', 'none'], help='Compress the package file (default: SYPNEX_COMPRESSION or none)')
+    pack_parser.add_argument('--level', type=int, help='Compression level (default: SYPNEX_COMPRESSION_LEVEL, 6 for gzip, 3 for zstd)')
+    pack_parser.add_argument('--no-minify', action='store_true', help='Skip CSS/JS/HTML minification (debugging)')
+    pack_parser.add_argument('--bundle', action='store_true', help='Bundle scripts and their ES module imports, dropping unused code (default: SYPNEX_BUNDLE_JS)')
+    pack_parser.add_argument('--optimize-assets', action='store_true', help='Minify JSON/SVG and recompress images in additional_files (default: SYPNEX_OPTIMIZE_ASSETS)')
+    pack_parser.add_argument('--reproducible', action='store_true', help='Byte-identical output for identical sources (always on for "all"); the build time comes from SOURCE_DATE_EPOCH')
     
     # Config command
     subparsers.add_parser('config', help='Show current configuration')
     
+    # Release commands
+    release_parser = subparsers.add_parser('release', help='Release tooling')
+    release_subparsers = release_parser.add_subparsers(dest='release_type', help='Release command')
+    manifest_parser = release_subparsers.add_parser('manifest', help='Write versions.json (id -> name, version, author, description, icon)')
+    manifest_parser.add_argument('releases_dir', nargs='?', default='releases', help='Directory of packaged apps (default: releases)')
+    manifest_parser.add_argument('--output', default='versions.json', help='Output file (default: versions.json)')
+    
+    # Verify command
+    verify_parser = subparsers.add_parser('verify', help='Check packages against their .sha256 files')
+    verify_parser.add_argument('paths', nargs='*', default=['releases'], help='Packages, .sha256 files or directories (default: releases)')
+    verify_parser.add_argument('--jobs', type=int, help='Number of parallel hashing threads (default: CPU count + 4, at most 32)')
+    verify_parser.add_argument('--json', action='store_true', help='Print one JSON document instead of sha256sum-style lines')
+    verify_parser.add_argument('--no-cache', action='store_true', help='Hash every package even if a cached digest matches its size, mtime and inode')
+    
+    # Dev server command
+    dev_server_parser = subparsers.add_parser('dev-server', help='Run a local stand-in server for testing deploys')
+    dev_server_parser.add_argument('--port', type=int, default=5000, help='Port to listen on (default: 5000)')
+    dev_server_parser.add_argument('--data-dir', help='Directory holding uploads, installed apps and the VFS (default: ~/.sypnex/dev-server)')
+    dev_server_parser.add_argument('--drop-rate', type=float, default=0.0, help='Share of upload chunks to drop, simulating a flaky link (default: 0)')
+    
+    # Daemon command
+    daemon_parser = subparsers.add_parser('daemon', help='Background process that runs pack/deploy commands with a warm toolchain')
+    daemon_parser.add_argument('action', choices=['start', 'stop', 'status', 'run'], help='start in the background, stop, show status, or run in the foreground')
+    daemon_parser.add_argument('--idle-timeout', type=float, help='Exit after this many seconds without a command (default: SYPNEX_DAEMON_IDLE_TIMEOUT or 600)')
+    
     # Parse arguments
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Handle commands
     if not args.command:
         parser.print_help()
         return
     
+    # Package options are read from the environment by the packer (including worker processes)
+    if getattr(args, 'format', None):
+        os.environ['SYPNEX_PACKAGE_FORMAT'] = args.format
+    if getattr(args, 'compress', None):
+        os.environ['SYPNEX_COMPRESSION'] = args.compress
+    if getattr(args, 'level', None) is not None:
+        os.environ['SYPNEX_COMPRESSION_LEVEL'] = str(args.level)
+    if getattr(args, 'no_minify', False):
+        os.environ['SYPNEX_MINIFY'] = '0'
+    if getattr(args, 'reproducible', False):
+        os.environ['SYPNEX_REPRODUCIBLE'] = '1'
+    if getattr(args, 'bundle', False):
+        os.environ['SYPNEX_BUNDLE_JS'] = '1'
+    if getattr(args, 'shared_vendor', False):
+        os.environ['SYPNEX_SHARED_VENDOR'] = '1'
+    if getattr(args, 'optimize_assets', False):
+        os.environ['SYPNEX_OPTIMIZE_ASSETS'] = '1'
+    
+    if args.command == 'deploy' and not args.deploy_type:
+        deploy_parser.print_help()
+        return
+    if args.command == 'release' and not args.release_type:
+        release_parser.print_help()
+        return
+    
+    if use_daemon:
+        code = forward_to_daemon(args, sys.argv[1:] if argv is None else argv)
+        if code is not None:
+            if code:
+                sys.exit(code)
+            return
+    
+    if not args.profile:
+        run_command(args)
+        return
+    
+    tracing = load_tracing()
+    tracing.enable()
+    try:
+        with tracing.span(f"sypnex {args.command} {getattr(args, 'deploy_type', None) or ''}".strip()):
+            run_command(args)
+    finally:
+        count = tracing.write_trace(args.profile)
+        print(f"📈 Wrote {count} trace events to {args.profile} (open in https://ui.perfetto.dev or chrome://tracing)")
+
+def run_command(args):
+    """Dispatch a parsed command"""
     if args.command == 'create':
         create_app(args.app_name, args.output, args.template)
     
     elif args.command == 'deploy':
-        if not args.deploy_type:
-            deploy_parser.print_help()
-            return
-        
         if args.deploy_type == 'app':
-            deploy_app(args.app_path, args.server)
+            if not deploy_app(args.app_path, args.server, args.watch, args.force):
+                sys.exit(1)
+        elif args.deploy_type == 'all':
+            if not deploy_all(args.root_dir, args.server, args.jobs, args.concurrency, args.watch, args.force):
+                sys.exit(1)
         elif args.deploy_type == 'vfs':
-            deploy_vfs(args.file_path, args.server)
+            deploy_vfs(args.file_path, args.server, args.remote_path, args.concurrency)
     
     elif args.command == 'pack':
-        pack_app(args.app_path)
+        if args.app_path == 'all' and args.root_dir:
+            if not pack_all(args.root_dir, args.out, args.jobs, args.force):
+                sys.exit(1)
+        elif args.app_path == 'all' and not os.path.isdir('all'):
+            print("❌ Error: pack all needs a directory to search for apps, e.g. pack all ../official --out ../releases")
+            sys.exit(1)
+        elif args.root_dir:
+            if not os.path.isdir(args.root_dir):
+                print(f"❌ Error: Directory not found: {os.path.abspath(args.root_dir)}")
+                sys.exit(1)
+            app_dir = find_app_in(args.root_dir, args.app_path)
+            if app_dir is None:
+                print(f"❌ Error: No app '{args.app_path}' found in {os.path.abspath(args.root_dir)}")
+                sys.exit(1)
+            if not pack_app(app_dir):
+                sys.exit(1)
+        elif not pack_app(args.app_path):
+            sys.exit(1)
     
     elif args.command == 'config':
         show_config()
+    
+    elif args.command == 'release':
+        if args.release_type == 'manifest':
+            if not release_manifest(args.releases_dir, args.output):
+                sys.exit(1)
+    
+    elif args.command == 'verify':
+        if not verify_packages(args.paths, args.jobs, not args.no_cache, args.json):
+            sys.exit(1)
+    
+    elif args.command == 'dev-server':
+        dev_server(args.port, args.data_dir, args.drop_rate)
+    
+    elif args.command == 'daemon':
+        if not manage_daemon(args.action, args.idle_timeout):
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
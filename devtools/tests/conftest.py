@@ -0,0 +1,104 @@
+"""Shared fixtures: an isolated build cache, a controllable validation server and throwaway apps"""
+
+import os
+import sys
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+
+@pytest.fixture(autouse=True)
+def environment(tmp_path, monkeypatch):
+    """Every test gets its own cache directory and no settings from the developer's shell"""
+    for name in list(os.environ):
+        if name.startswith('SYPNEX_') or name == 'SOURCE_DATE_EPOCH':
+            monkeypatch.delenv(name)
+    monkeypatch.setenv('SYPNEX_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('SYPNEX_DEV_TOKEN', 'test-token')
+    monkeypatch.setenv('SYPNEX_HTTP_BACKOFF', '0')
+    monkeypatch.setenv('SYPNEX_DAEMON', '0')
+
+
+class ValidationServer:
+    """Answers /api/dev/validate-app with a verdict the test can change"""
+
+    def __init__(self):
+        self.valid = True
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                server.requests += 1
+                errors = [] if server.valid else ['rejected by test server']
+                body = json.dumps({'validation_results': {'is_valid': server.valid, 'errors': errors}}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def validation_server(monkeypatch):
+    server = ValidationServer()
+    monkeypatch.setenv('SYPNEX_SERVER_URL', server.url)
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def dev_server(tmp_path):
+    """tools/dev_server.py on an ephemeral port; yields (url, data directory)"""
+    from dev_server import create_dev_server
+    data_dir = tmp_path / 'server'
+    httpd = create_dev_server(str(data_dir), port=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", data_dir
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def unreachable_url():
+    """URL of a port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Create a minimal user app (index.html, style.css, script.js) and return its directory"""
+    def make(app_id='test_app', script='function init() { return 1; }\n', additional_files=None):
+        app_dir = tmp_path / 'apps' / app_id
+        (app_dir / 'src').mkdir(parents=True)
+        metadata = {'id': app_id, 'name': app_id, 'type': 'user_app',
+                    'scripts': ['script.js'], 'styles': ['style.css']}
+        for name, content in (additional_files or {}).items():
+            path = app_dir / 'src' / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            metadata.setdefault('additional_files', []).append(
+                {'vfs_path': f"/apps/{app_id}/{name}", 'source_file': name})
+        (app_dir / f"{app_id}.app").write_text(json.dumps(metadata), encoding='utf-8')
+        (app_dir / 'src' / 'index.html').write_text('<div class="app-container"><p>Hi</p></div>\n', encoding='utf-8')
+        (app_dir / 'src' / 'style.css').write_text('p { color: red; }\n', encoding='utf-8')
+        (app_dir / 'src' / 'script.js').write_text(script, encoding='utf-8')
+        return str(app_dir)
+    return make
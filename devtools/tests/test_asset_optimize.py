@@ -0,0 +1,136 @@
+"""asset_optimize: JSON/SVG minification, the asset cache and packaging optimized copies"""
+
+import json
+
+import pytest
+
+import pack_app
+import asset_optimize
+
+DATA = {'name': 'Café', 'items': [1, 2.5, None, True], 'nested': {'text': 'two  spaces\n'}}
+
+SVG = b"""<?xml version="1.0"?>
+<!-- drawn by hand -->
+<svg xmlns="http://www.w3.org/2000/svg">
+    <style><![CDATA[
+        text  { font: 12px  serif; }
+    ]]></style>
+    <g>
+        <rect width="10" height="10"/>
+    </g>
+    <text x="1">  spaced   out  </text>
+</svg>
+"""
+
+
+@pytest.fixture
+def options():
+    return asset_optimize.asset_options()
+
+
+def test_json_minify_round_trips():
+    pretty = json.dumps(DATA, indent=4, ensure_ascii=False).encode('utf-8')
+    minified = asset_optimize.minify_json(b'\xef\xbb\xbf' + pretty)
+
+    assert json.loads(minified) == DATA
+    assert len(minified) < len(pretty)
+    assert b' ' not in minified.replace(b'two  spaces', b'')
+
+
+def test_svg_minify_drops_comments_and_gaps_but_keeps_text_and_cdata():
+    minified = asset_optimize.minify_svg(SVG).decode('utf-8')
+
+    assert 'drawn by hand' not in minified
+    assert '<g><rect width="10" height="10"/></g>' in minified
+    assert '<text x="1">  spaced   out  </text>' in minified
+    assert '<![CDATA[\n        text  { font: 12px  serif; }\n    ]]>' in minified
+
+
+def test_svg_comment_markers_inside_cdata_are_kept():
+    svg = b'<svg><script><![CDATA[ var a = "<!-- not a comment -->"; ]]></script></svg>'
+
+    assert b'<!-- not a comment -->' in asset_optimize.minify_svg(svg)
+
+
+def test_optimized_json_is_stored_by_content_hash(tmp_path, options):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(DATA, indent=4), encoding='utf-8')
+
+    result = asset_optimize.optimize_asset(str(path), 'data.json', options)
+
+    assert result['path'] == str(asset_optimize.asset_path(result['sha256']))
+    assert result['original_size'] == path.stat().st_size
+    with open(result['path'], 'rb') as f:
+        assert json.loads(f.read()) == DATA
+    assert result['cached'] is False
+    assert asset_optimize.optimize_asset(str(path), 'data.json', options)['cached'] is True
+
+
+def test_option_changes_invalidate_the_cache(tmp_path, options):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(DATA, indent=4), encoding='utf-8')
+    asset_optimize.optimize_asset(str(path), 'data.json', options)
+
+    changed = dict(options, max_dimension=512)
+    assert asset_optimize.optimize_asset(str(path), 'data.json', changed)['cached'] is False
+    assert asset_optimize.optimize_asset(str(path), 'data.json', changed)['cached'] is True
+
+
+def test_content_changes_invalidate_the_cache(tmp_path, options):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(DATA, indent=4), encoding='utf-8')
+    first = asset_optimize.optimize_asset(str(path), 'data.json', options)
+    path.write_text(json.dumps(dict(DATA, extra=1), indent=4), encoding='utf-8')
+
+    second = asset_optimize.optimize_asset(str(path), 'data.json', options)
+    assert second['cached'] is False
+    assert second['sha256'] != first['sha256']
+
+
+def test_output_that_is_not_smaller_keeps_the_original(tmp_path, options):
+    path = tmp_path / 'data.json'
+    path.write_bytes(b'{"a":1}')
+
+    result = asset_optimize.optimize_asset(str(path), 'data.json', options)
+
+    assert result == {'path': str(path), 'size': 7, 'original_size': 7, 'cached': False}
+    assert asset_optimize.optimize_asset(str(path), 'data.json', options)['cached'] is True
+
+
+def test_invalid_json_is_left_unchanged(tmp_path, options, capsys):
+    path = tmp_path / 'broken.json'
+    path.write_bytes(b'{"a": ')
+
+    assert asset_optimize.optimize_asset(str(path), 'broken.json', options)['path'] == str(path)
+    assert 'Could not optimize broken.json' in capsys.readouterr().out
+
+
+def test_images_without_pillow_are_left_unchanged(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(asset_optimize, '_pillow', False)
+    path = tmp_path / 'icon.png'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\0' * 64)
+
+    assert asset_optimize.optimize_asset(str(path), 'icon.png')['path'] == str(path)
+    assert 'Pillow not installed - icon.png left unoptimized' in capsys.readouterr().out
+
+
+def test_other_file_types_are_not_processed(tmp_path, options):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'  lots   of   space  ')
+
+    assert asset_optimize.optimize_asset(str(path), 'notes.txt', options)['path'] == str(path)
+
+
+def test_package_references_the_optimized_copy(monkeypatch, validation_server, make_app):
+    monkeypatch.setenv('SYPNEX_OPTIMIZE_ASSETS', '1')
+    pretty = json.dumps(DATA, indent=4).encode('utf-8')
+    app_dir = make_app(additional_files={'data.json': pretty, 'compact.json': b'{"a":1}'})
+
+    package = pack_app.build_package(app_dir)
+
+    paths = {entry['vfs_path']: entry['path'] for entry in package.additional_files}
+    assert paths['/apps/test_app/compact.json'].endswith('compact.json')
+    with open(paths['/apps/test_app/data.json'], 'rb') as f:
+        assert json.loads(f.read()) == DATA
+    [optimized] = package.package_info['optimized_assets']
+    assert (optimized['source_file'], optimized['original_size']) == ('data.json', len(pretty))
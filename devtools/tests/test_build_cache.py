@@ -0,0 +1,83 @@
+"""Build cache keys and the validate stage of pack_app.build_app_html"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+import pack_app
+
+
+def test_unchanged_app_is_a_cache_hit(validation_server, make_app, capsys):
+    app_dir = make_app()
+    first = pack_app.build_app_html('test_app', app_dir)
+    second = pack_app.build_app_html('test_app', app_dir)
+
+    assert second == first
+    assert validation_server.requests == 1
+    assert 'Build cache hit' in capsys.readouterr().out
+
+
+def test_source_change_changes_the_build_key(validation_server, make_app):
+    app_dir = make_app()
+    before = pack_app._prepare_build('test_app', app_dir)['cache_key']
+    with open(f"{app_dir}/src/script.js", 'a', encoding='utf-8') as f:
+        f.write('function other() {}\n')
+
+    assert pack_app._prepare_build('test_app', app_dir)['cache_key'] != before
+
+
+def test_unvalidated_build_is_not_served_from_cache(monkeypatch, unreachable_url, validation_server, make_app, capsys):
+    app_dir = make_app()
+    monkeypatch.setenv('SYPNEX_SERVER_URL', unreachable_url)
+    monkeypatch.setenv('SYPNEX_HTTP_RETRIES', '0')
+    assert pack_app.build_app_html('test_app', app_dir) is not None
+    capsys.readouterr()
+
+    # The API is back and rejects the app: the pack must validate and fail
+    validation_server.valid = False
+    monkeypatch.setenv('SYPNEX_SERVER_URL', validation_server.url)
+    with pytest.raises(pack_app.PackError):
+        pack_app.build_app_html('test_app', app_dir)
+    assert validation_server.requests == 1
+    assert 'Build cache hit' not in capsys.readouterr().out
+
+
+def test_rules_version_bump_revalidates(monkeypatch, validation_server, make_app, capsys):
+    app_dir = make_app()
+    pack_app.build_app_html('test_app', app_dir)
+    capsys.readouterr()
+
+    monkeypatch.setenv('SYPNEX_VALIDATION_RULES_VERSION', '2')
+    validation_server.valid = False
+    with pytest.raises(pack_app.PackError):
+        pack_app.build_app_html('test_app', app_dir)
+    assert validation_server.requests == 2
+    assert 'Build cache hit' not in capsys.readouterr().out
+
+
+def test_default_rules_version_keeps_existing_keys(monkeypatch, validation_server, make_app):
+    app_dir = make_app()
+    before = pack_app._prepare_build('test_app', app_dir)['cache_key']
+    monkeypatch.setenv('SYPNEX_VALIDATION_RULES_VERSION', '1')
+
+    assert pack_app._prepare_build('test_app', app_dir)['cache_key'] == before
+
+
+def test_rejected_app_fails_the_pack_without_exiting(validation_server, make_app, tmp_path, capsys):
+    app_dir = make_app()
+    validation_server.valid = False
+
+    assert pack_app.pack_app(app_dir, str(tmp_path / 'test_app_packaged.app')) is False
+    assert 'Validation failed for test_app' in capsys.readouterr().out
+
+
+def test_cli_turns_a_failed_pack_into_exit_code_1(validation_server, make_app):
+    app_dir = make_app()
+    validation_server.valid = False
+    sypnex = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sypnex.py')
+
+    result = subprocess.run([sys.executable, sypnex, 'pack', app_dir], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert 'Validation failed for test_app' in result.stdout
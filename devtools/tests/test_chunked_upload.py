@@ -0,0 +1,151 @@
+"""Resumable chunked uploads against the local dev server"""
+
+import os
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import chunked_upload
+import http_client
+from dev_deploy import package_app
+
+CHUNK = 64 * 1024
+
+
+@pytest.fixture
+def blob(tmp_path, monkeypatch):
+    monkeypatch.setenv('SYPNEX_UPLOAD_CHUNK_SIZE', str(CHUNK))
+    path = tmp_path / 'large.bin'
+    path.write_bytes(os.urandom(3 * CHUNK + 1000))
+    data = path.read_bytes()
+    return str(path), hashlib.sha256(data).hexdigest(), len(data)
+
+
+def _upload(url, blob):
+    path, sha256, size = blob
+    return chunked_upload.upload_file(url, {'X-Session-Token': 'test-token'}, path, sha256, size, 'large.bin')
+
+
+def _spy_puts(monkeypatch, fail):
+    """Count PUTs; fail(attempt, response) -> True makes that PUT raise a connection error"""
+    real_request = http_client.request
+    puts = []
+
+    def request(method, url, **kwargs):
+        if method != 'PUT':
+            return real_request(method, url, **kwargs)
+        puts.append(kwargs['headers']['Content-Range'])
+        if fail(len(puts), None):
+            raise http_client.ConnectionError('connection dropped before the chunk was sent')
+        response = real_request(method, url, **kwargs)
+        if fail(len(puts), response):
+            raise http_client.ConnectionError('reply lost')
+        return response
+
+    monkeypatch.setattr(http_client, 'request', request)
+    return puts
+
+
+def test_threshold_is_opt_in(monkeypatch):
+    assert chunked_upload.large_file_threshold() is None
+    monkeypatch.setenv('SYPNEX_LARGE_FILE_THRESHOLD', '1024')
+    assert chunked_upload.large_file_threshold() == 1024
+    monkeypatch.setenv('SYPNEX_LARGE_FILE_THRESHOLD', '0')
+    assert chunked_upload.large_file_threshold() is None
+
+
+def test_upload_resumes_after_a_dropped_chunk(monkeypatch, dev_server, blob):
+    url, data_dir = dev_server
+    puts = _spy_puts(monkeypatch, lambda attempt, response: attempt == 2 and response is None)
+
+    assert _upload(url, blob) is True
+    assert (data_dir / 'blobs' / blob[1]).stat().st_size == blob[2]
+    # The dropped chunk is sent again from the server's offset, nothing else is
+    assert len(puts) == 5
+    assert puts[1] == puts[2]
+
+
+def test_lost_reply_to_the_last_chunk_counts_as_complete(monkeypatch, dev_server, blob):
+    url, data_dir = dev_server
+    puts = _spy_puts(monkeypatch, lambda attempt, response: response is not None and response.json().get('complete'))
+
+    assert _upload(url, blob) is True
+    assert (data_dir / 'blobs' / blob[1]).exists()
+    assert len(puts) == 4
+
+
+def test_second_upload_of_the_same_blob_sends_nothing(monkeypatch, dev_server, blob):
+    url, _ = dev_server
+    assert _upload(url, blob) is True
+    puts = _spy_puts(monkeypatch, lambda attempt, response: False)
+
+    assert _upload(url, blob) is True
+    assert puts == []
+
+
+def test_unconfirmed_completion_backs_off_then_gives_up(monkeypatch, blob):
+    class Response:
+        status_code = 200
+        text = ''
+
+        def __init__(self, body):
+            self.body = body
+
+        def json(self):
+            return self.body
+
+    status = {'upload_id': 'stuck', 'offset': blob[2], 'size': blob[2], 'complete': False}
+    monkeypatch.setattr(http_client, 'post', lambda url, **kwargs: Response(status))
+    monkeypatch.setattr(http_client, 'get', lambda url, **kwargs: Response(status))
+    sleeps = []
+    monkeypatch.setattr(chunked_upload.time, 'sleep', sleeps.append)
+
+    assert _upload('http://127.0.0.1:1', blob) is False
+    assert len(sleeps) == chunked_upload.MAX_RESUMES
+
+
+@pytest.fixture
+def server_without_uploads():
+    """A server that answers 404 to everything, like one without the uploads endpoint"""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            requests.append(self.path)
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_large_files_are_embedded_for_a_server_without_uploads(monkeypatch, dev_server, server_without_uploads,
+                                                               make_app, capsys):
+    url, _ = dev_server
+    other_url, requests = server_without_uploads
+    monkeypatch.setenv('SYPNEX_SERVER_URL', url)
+    monkeypatch.setenv('SYPNEX_LARGE_FILE_THRESHOLD', '1024')
+    monkeypatch.setattr(chunked_upload, '_upload_support', {})
+    app_dir = make_app(additional_files={'large.bin': os.urandom(4096)})
+
+    assert [entry['filename'] for entry in package_app('test_app', app_dir, url).external_files()] == ['large.bin']
+
+    package = package_app('test_app', app_dir, other_url)
+    assert package.external_files() == []
+    assert package.additional_file_bytes('/apps/test_app/large.bin') == (
+        open(os.path.join(app_dir, 'src', 'large.bin'), 'rb').read())
+    assert 'has no /api/user-apps/uploads endpoint' in capsys.readouterr().out
+
+    # The server is asked once per run
+    package_app('test_app', app_dir, other_url)
+    assert requests == ['/api/user-apps/uploads']
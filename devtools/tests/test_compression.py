@@ -0,0 +1,86 @@
+"""gzip/zstd compression: settings, packages at rest and request bodies on the wire"""
+
+import pytest
+
+import compression
+import dev_server as dev_server_module
+from compression import CompressionStats, compress_chunks, decompress_bytes, resolve_compression
+from package_writer import Package, FORMAT_V1
+from package_reader import open_package
+from pack_app import build_package
+from dev_deploy import package_app, install_package
+
+DATA = b'sypnex compression ' * 5000
+
+ALGORITHMS = ['gzip', pytest.param('zstd', marks=pytest.mark.skipif(
+    compression._zstd() is None, reason='zstandard not installed'))]
+
+
+def test_resolve_compression(monkeypatch):
+    assert resolve_compression() == (None, None)
+    monkeypatch.setenv('SYPNEX_COMPRESSION', 'gzip')
+    assert resolve_compression() == ('gzip', 6)
+    monkeypatch.setenv('SYPNEX_COMPRESSION_LEVEL', '9')
+    assert resolve_compression() == ('gzip', 9)
+    assert resolve_compression('none') == (None, None)
+    with pytest.raises(ValueError):
+        resolve_compression('brotli')
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_chunks_round_trip_with_stats(algorithm):
+    stats = CompressionStats(algorithm, 3)
+    chunks = [DATA[offset:offset + 4096] for offset in range(0, len(DATA), 4096)]
+
+    compressed = b''.join(compress_chunks(chunks, algorithm, 3, stats))
+
+    assert decompress_bytes(compressed, algorithm) == DATA
+    assert compression.detect_compression(compressed) == algorithm
+    assert (stats.raw_bytes, stats.compressed_bytes) == (len(DATA), len(compressed))
+    assert stats.ratio < 0.1
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_compressed_v1_package_is_read_transparently(tmp_path, algorithm):
+    data = tmp_path / 'data.txt'
+    data.write_bytes(DATA)
+    package = Package('test_app', {'id': 'test_app'},
+                      {'format_version': FORMAT_V1, 'compression': {'algorithm': algorithm, 'level': 3}},
+                      [('test_app.html', b'<p>hi</p>')],
+                      [{'vfs_path': '/apps/test_app/data.txt', 'filename': 'data.txt', 'path': str(data),
+                        'size': len(DATA)}])
+    output = tmp_path / 'test_app_packaged.app'
+
+    _, size = package.write(str(output))
+
+    assert size < len(DATA) / 10
+    with open_package(str(output)) as reader:
+        assert reader.package_info['compression'] == {'algorithm': algorithm, 'level': 3}
+        assert reader.read_file('test_app.html') == b'<p>hi</p>'
+        assert reader.additional_file_bytes('/apps/test_app/data.txt') == DATA
+
+
+def test_v2_packages_only_take_gzip(validation_server, make_app, capsys):
+    pytest.importorskip('zstandard')
+    app_dir = make_app()
+
+    assert build_package(app_dir, format_version='2', compression='zstd') is None
+    assert 'only support gzip' in capsys.readouterr().out
+
+
+def test_install_body_is_compressed_on_the_wire(monkeypatch, dev_server, make_app):
+    url, data_dir = dev_server
+    monkeypatch.setenv('SYPNEX_SERVER_URL', url)
+    app_dir = make_app(additional_files={'data.txt': DATA})
+    package = package_app('test_app', app_dir)
+    received = []
+
+    def recording_decompress(data, algorithm):
+        received.append((algorithm, len(data)))
+        return decompress_bytes(data, algorithm)
+    monkeypatch.setattr(dev_server_module, 'decompress_bytes', recording_decompress)
+    monkeypatch.setenv('SYPNEX_COMPRESSION', 'gzip')
+
+    assert install_package('test_app', package, url) is True
+    assert received and received[0][0] == 'gzip' and received[0][1] < len(DATA) / 10
+    assert (data_dir / 'vfs' / 'apps' / 'test_app' / 'data.txt').read_bytes() == DATA
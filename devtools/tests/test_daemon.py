@@ -0,0 +1,108 @@
+"""The dev daemon runs each command in the client's environment and directory, then restores its own"""
+
+import os
+import json
+import time
+import shutil
+import socket
+import tempfile
+import threading
+
+import pytest
+
+import daemon
+
+pytestmark = pytest.mark.skipif(not daemon.supported(), reason='needs Unix domain sockets')
+
+
+def _run(server, request):
+    """Run one request through Daemon.run_command; returns the messages sent to the client"""
+    client, connection = socket.socketpair()
+    with client, connection:
+        server.run_command(connection, request)
+        connection.shutdown(socket.SHUT_WR)
+        with client.makefile('r', encoding='utf-8') as reader:
+            return [json.loads(line) for line in reader]
+
+
+@pytest.fixture
+def workdirs(tmp_path, monkeypatch):
+    (tmp_path / 'daemon').mkdir()
+    (tmp_path / 'client').mkdir()
+    monkeypatch.chdir(tmp_path / 'daemon')
+    return tmp_path / 'daemon', tmp_path / 'client'
+
+
+def test_command_sees_the_client_settings_and_they_do_not_leak(monkeypatch, workdirs):
+    daemon_dir, client_dir = workdirs
+    monkeypatch.setenv('SYPNEX_DAEMON_ONLY', '1')
+    seen = {}
+
+    def run_cli(argv, use_daemon=True):
+        seen.update(argv=argv, use_daemon=use_daemon, cwd=os.getcwd(),
+                    env={name: os.environ.get(name) for name in ('SYPNEX_CLIENT', 'SYPNEX_DAEMON_ONLY', 'SOURCE_DATE_EPOCH')})
+        print('packing')
+        os.environ['SYPNEX_LEAK'] = '1'
+        os.chdir('/')
+        raise SystemExit(2)
+
+    server = daemon.Daemon(run_cli, timeout=5)
+    messages = _run(server, {'argv': ['pack', 'my_app'], 'cwd': str(client_dir),
+                             'env': {'SYPNEX_CLIENT': 'yes', 'SOURCE_DATE_EPOCH': '5'}})
+
+    assert seen == {'argv': ['pack', 'my_app'], 'use_daemon': False, 'cwd': str(client_dir),
+                    'env': {'SYPNEX_CLIENT': 'yes', 'SYPNEX_DAEMON_ONLY': None, 'SOURCE_DATE_EPOCH': '5'}}
+    assert {'out': 'packing'} in messages and messages[-1] == {'exit': 2}
+    assert os.getcwd() == str(daemon_dir)
+    assert os.environ.get('SYPNEX_DAEMON_ONLY') == '1'
+    assert not {'SYPNEX_CLIENT', 'SYPNEX_LEAK', 'SOURCE_DATE_EPOCH'} & set(os.environ)
+    assert server.requests == 1
+
+
+def test_crashing_command_reports_exit_1_and_restores_state(workdirs):
+    daemon_dir, client_dir = workdirs
+
+    def run_cli(argv, use_daemon=True):
+        os.environ['SYPNEX_LEAK'] = '1'
+        os.chdir('/')
+        raise RuntimeError('boom')
+
+    messages = _run(daemon.Daemon(run_cli, timeout=5), {'argv': ['pack'], 'cwd': str(client_dir), 'env': {}})
+
+    assert messages[-1] == {'exit': 1}
+    assert any('RuntimeError: boom' in message.get('err', '') for message in messages)
+    assert os.getcwd() == str(daemon_dir)
+    assert 'SYPNEX_LEAK' not in os.environ
+
+
+def test_commands_are_forwarded_over_the_socket(monkeypatch, workdirs, capsys):
+    _, client_dir = workdirs
+    # Unix socket paths are limited to ~100 bytes, so not under tmp_path
+    socket_dir = tempfile.mkdtemp(prefix='sypnex-')
+    monkeypatch.setenv('SYPNEX_DAEMON_SOCKET', os.path.join(socket_dir, 'daemon.sock'))
+    calls = []
+
+    def run_cli(argv, use_daemon=True):
+        calls.append((argv, os.getcwd()))
+        print(f"ran {' '.join(argv)}")
+
+    server = daemon.Daemon(run_cli, timeout=5)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    try:
+        for _ in range(200):
+            if daemon.status():
+                break
+            time.sleep(0.01)
+        monkeypatch.chdir(client_dir)
+        assert daemon.forward(['deploy', 'app', 'one']) == 0
+        assert daemon.forward(['pack', 'two']) == 0
+        assert daemon.status()['requests'] == 2
+    finally:
+        daemon.stop()
+        thread.join(5)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+    assert calls == [(['deploy', 'app', 'one'], str(client_dir)), (['pack', 'two'], str(client_dir))]
+    assert 'ran deploy app one' in capsys.readouterr().out
+    assert not thread.is_alive()
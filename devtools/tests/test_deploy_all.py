@@ -0,0 +1,77 @@
+"""deploy all: pack pool into install pool, the summary and a single refresh"""
+
+import os
+import re
+import sys
+import subprocess
+
+import pytest
+
+import deploy_all
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(deploy_all, 'refresh_user_apps', calls.append)
+    return calls
+
+
+def summary_statuses(output):
+    """{app name: status} from the summary table"""
+    table = output.split('📊 Summary:')[1].split('\n\n')[0]
+    rows = [re.split(r'\s{2,}', line.strip()) for line in table.strip().splitlines()[2:]]
+    return {row[0]: row[1] for row in rows}
+
+
+def test_every_app_is_installed_with_one_refresh(monkeypatch, tmp_path, dev_server, make_app, refreshes, capsys):
+    url, data_dir = dev_server
+    monkeypatch.setenv('SYPNEX_SERVER_URL', url)
+    make_app('app_one')
+    make_app('app_two')
+
+    assert deploy_all.deploy_all(str(tmp_path / 'apps'), url, jobs=2, concurrency=2) is True
+    output = capsys.readouterr().out
+    assert refreshes == [url]
+    assert (data_dir / 'apps' / 'app_one' / 'app_one.html').exists()
+    assert (data_dir / 'apps' / 'app_two' / 'app_two.html').exists()
+    assert summary_statuses(output) == {'app_one': 'deployed', 'app_two': 'deployed'}
+    assert 'All 2 apps deployed successfully' in output
+
+
+def test_unchanged_apps_are_not_refreshed(monkeypatch, tmp_path, dev_server, make_app, refreshes, capsys):
+    url, _ = dev_server
+    monkeypatch.setenv('SYPNEX_SERVER_URL', url)
+    make_app('app_one')
+    make_app('app_two')
+    assert deploy_all.deploy_all(str(tmp_path / 'apps'), url, jobs=2) is True
+    capsys.readouterr()
+
+    assert deploy_all.deploy_all(str(tmp_path / 'apps'), url, jobs=2) is True
+    assert summary_statuses(capsys.readouterr().out) == {'app_one': 'unchanged', 'app_two': 'unchanged'}
+    assert refreshes == [url]
+
+
+def test_invalid_app_fails_the_run(monkeypatch, tmp_path, validation_server, dev_server, make_app, refreshes, capsys):
+    url, data_dir = dev_server
+    validation_server.valid = False
+    make_app('app_one')
+
+    assert deploy_all.deploy_all(str(tmp_path / 'apps'), url, jobs=1) is False
+    output = capsys.readouterr().out
+    assert summary_statuses(output) == {'app_one': 'invalid'}
+    assert '1 of 1 apps failed to deploy' in output
+    assert refreshes == []
+    assert not (data_dir / 'apps' / 'app_one').exists()
+
+
+def test_cli_exits_1_when_an_app_fails(tmp_path, validation_server, dev_server, make_app):
+    url, _ = dev_server
+    validation_server.valid = False
+    make_app('app_one')
+    sypnex = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sypnex.py')
+
+    result = subprocess.run([sys.executable, sypnex, 'deploy', 'all', str(tmp_path / 'apps'), '--server', url],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert '1 of 1 apps failed to deploy' in result.stdout
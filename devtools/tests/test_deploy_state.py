@@ -0,0 +1,42 @@
+"""Delta deploys: the deploy plan and deploy_changes against the local dev server"""
+
+import pytest
+
+import deploy_state
+from dev_deploy import package_app, deploy_changes
+
+MANIFEST = {'files': {'app.html': 'a'}, 'additional_files': {'/apps/x/data.json': 'd1'}}
+
+
+@pytest.mark.parametrize('record, expected', [
+    (None, (deploy_state.FULL_INSTALL, [])),
+    (MANIFEST, (deploy_state.UNCHANGED, [])),
+    (dict(MANIFEST, files={'app.html': 'old'}), (deploy_state.FULL_INSTALL, [])),
+    (dict(MANIFEST, additional_files={'/apps/x/data.json': 'd0'}),
+     (deploy_state.ADDITIONAL_ONLY, ['/apps/x/data.json'])),
+    (dict(MANIFEST, additional_files={}), (deploy_state.FULL_INSTALL, [])),
+])
+def test_plan_deploy(record, expected):
+    assert deploy_state.plan_deploy(MANIFEST, record) == expected
+
+
+def test_deploy_sends_only_what_changed(monkeypatch, tmp_path, dev_server, make_app):
+    url, data_dir = dev_server
+    monkeypatch.setenv('SYPNEX_SERVER_URL', url)
+    app_dir = make_app(additional_files={'data.json': b'{"v": 1}'})
+
+    def deploy():
+        return deploy_changes('test_app', package_app('test_app', app_dir), url)
+
+    assert deploy() == (True, deploy_state.FULL_INSTALL)
+    assert (data_dir / 'apps' / 'test_app' / 'test_app.html').exists()
+    assert deploy() == (True, deploy_state.UNCHANGED)
+
+    (tmp_path / 'apps' / 'test_app' / 'src' / 'data.json').write_bytes(b'{"v": 2}')
+    assert deploy() == (True, deploy_state.ADDITIONAL_ONLY)
+    assert (data_dir / 'vfs' / 'apps' / 'test_app' / 'data.json').read_bytes() == b'{"v": 2}'
+
+    with open(f"{app_dir}/src/script.js", 'a', encoding='utf-8') as f:
+        f.write('function other() {}\n')
+    assert deploy() == (True, deploy_state.FULL_INSTALL)
+    assert deploy_changes('test_app', package_app('test_app', app_dir), url, force=True) == (True, deploy_state.FULL_INSTALL)
@@ -0,0 +1,45 @@
+"""dev_deploy streams packages built in memory straight into the install upload"""
+
+import os
+
+from package_writer import Package, FORMAT_V1
+from dev_deploy import MultipartUpload, package_app, install_package
+
+
+def _package(package_info=None):
+    return Package('test_app', {'id': 'test_app'}, package_info or {'format_version': FORMAT_V1},
+                   [('test_app.html', b'<p>hi</p>' * 1000)])
+
+
+def test_multipart_body_streams_the_package_with_an_exact_length():
+    package = _package()
+    body = MultipartUpload('package', package)
+    chunks = list(body)
+
+    # The package's own chunks pass through one by one, never joined into one buffer
+    assert chunks[1:-1] == list(package.iter_chunks())
+    assert len(body) == len(b''.join(chunks))
+    assert chunks[0].startswith(f'--{body.boundary}\r\n'.encode('utf-8'))
+    assert b'filename="test_app_packaged.app"' in chunks[0]
+    assert body.content_type == f'multipart/form-data; boundary={body.boundary}'
+
+
+def test_compressed_package_has_no_content_length():
+    package = _package({'format_version': FORMAT_V1, 'compression': {'algorithm': 'gzip', 'level': 6}})
+
+    assert MultipartUpload('package', package).content_length is None
+
+
+def test_package_is_installed_without_writing_it_to_disk(monkeypatch, dev_server, make_app):
+    url, data_dir = dev_server
+    monkeypatch.setenv('SYPNEX_SERVER_URL', url)
+    app_dir = make_app(additional_files={'data.json': b'{"v": 1}'})
+    before = sorted(os.listdir(app_dir))
+
+    package = package_app('test_app', app_dir)
+    assert install_package('test_app', package, url) is True
+
+    assert sorted(os.listdir(app_dir)) == before
+    html = dict(package.files)['test_app.html']
+    assert (data_dir / 'apps' / 'test_app' / 'test_app.html').read_bytes() == html
+    assert (data_dir / 'vfs' / 'apps' / 'test_app' / 'data.json').read_bytes() == b'{"v": 1}'
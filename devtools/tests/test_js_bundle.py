@@ -0,0 +1,219 @@
+"""js_bundle: tokenizing, the roots that keep code alive, ES module resolution and the report"""
+
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+from js_bundle import bundle_scripts, tokenize, BundleError, NAME, PUNCT, REGEX, TEMPLATE
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from bench_js_bundle import load_official_apps
+
+
+def bundle(sources, order=None, html=''):
+    return bundle_scripts(order or list(sources), sources, html)
+
+
+def kinds(source):
+    return [(token.kind, token.value) for token in tokenize(source)]
+
+
+def dropped_names(result):
+    return {name for _, name in result['dropped']}
+
+
+# --- Tokenizing ---------------------------------------------------------
+
+def test_slash_after_an_operand_is_division():
+    assert kinds('a / b / c') == [(NAME, 'a'), (PUNCT, '/'), (NAME, 'b'), (PUNCT, '/'), (NAME, 'c')]
+    assert [kind for kind, _ in kinds('(a) / 2 / x[0] / y')].count(REGEX) == 0
+
+
+def test_slash_where_an_operand_is_expected_starts_a_regex():
+    assert (REGEX, '/b\\/c[/]/gi') in kinds('x = /b\\/c[/]/gi.test(s)')
+    assert (REGEX, '/x/') in kinds('function f() { return /x/; }')
+    assert (REGEX, '/y/') in kinds('if (ok && /y/.test(s)) {}')
+
+
+def test_division_statement_is_kept():
+    # Dividing may call valueOf, so the statement is not dropped even though r is unused
+    result = bundle({'script.js': 'const r = a / b / c;\n'})
+
+    assert 'const r = a / b / c;' in result['js']
+    assert result['dropped'] == []
+
+
+def test_pure_literal_arithmetic_is_still_dropped():
+    result = bundle({'script.js': "const MINUTE = 60 * 1000;\nconst LABEL = 'a' + 'b';\nconst NONE = -1;\n"})
+
+    assert dropped_names(result) == {'MINUTE', 'LABEL', 'NONE'}
+
+
+def test_template_literals_with_nested_braces():
+    source = 'const t = `a ${ {b: 1}.b } / not a regex ${`inner ${x}`} c`;\nrun(t);\n'
+    tokens = kinds(source)
+
+    assert REGEX not in [kind for kind, _ in tokens]
+    assert tokens[3] == (TEMPLATE, '`a ${')
+    assert (TEMPLATE, '} c`') in tokens
+    assert source.strip() in bundle({'script.js': source})['js']
+
+
+def test_names_inside_template_substitutions_are_references():
+    result = bundle({'script.js': 'function used() { return 1; }\nfunction unused() {}\nshow(`${used()}`);\n'})
+
+    assert dropped_names(result) == {'unused'}
+
+
+def test_unterminated_template_is_an_error():
+    with pytest.raises(BundleError, match='unterminated template literal'):
+        tokenize('const t = `abc', 'script.js')
+
+
+# --- Statements and ASI -------------------------------------------------
+
+def test_newlines_end_statements_without_semicolons():
+    result = bundle({'script.js': 'const unused = 1\nconst used = 2\nshow(used)\n'})
+
+    assert dropped_names(result) == {'unused'}
+    assert 'const used = 2;\nshow(used);' in result['js']
+
+
+def test_line_starting_with_a_bracket_continues_the_expression():
+    # No semicolon is inserted before ( so this is a call of g, which is kept
+    result = bundle({'script.js': 'const f = g\n(function () {})()\n'})
+
+    assert result['dropped'] == []
+    assert 'const f = g\n(function () {})();' in result['js']
+
+
+def test_increment_on_the_next_line_starts_a_new_statement():
+    result = bundle({'script.js': 'let a = 1\n++b\nfunction helper() {}\n'})
+
+    assert dropped_names(result) == {'a', 'helper'}
+    assert '++b;' in result['js']
+
+
+# --- Roots --------------------------------------------------------------
+
+def test_names_used_by_index_html_are_kept():
+    html = ('<button onclick="save()">Save</button>'
+            '<a href="javascript:openHelp()">?</a>'
+            '<script>boot();</script>')
+    source = 'function save() {}\nfunction openHelp() {}\nfunction boot() {}\nfunction unused() {}\n'
+
+    assert dropped_names(bundle({'script.js': source}, html=html)) == {'unused'}
+
+
+def test_names_passed_as_strings_are_kept():
+    source = ("function tick() {}\nfunction handler() {}\nfunction unused() {}\n"
+              "setTimeout('tick()', 10);\nwindow['handler'];\n")
+
+    assert dropped_names(bundle({'script.js': source})) == {'unused'}
+
+
+def test_keep_comment_keeps_a_statement():
+    result = bundle({'script.js': '// @keep\nfunction debugDump() {}\nfunction unused() {}\n'})
+
+    assert dropped_names(result) == {'unused'}
+    assert 'function debugDump() {}' in result['js']
+
+
+def test_later_function_declaration_shadows_earlier_ones():
+    result = bundle({'a.js': 'function render() { return 1; }\n',
+                     'b.js': 'function render() { return 2; }\nrender();\n'})
+
+    assert result['shadowed'] == [('a.js', 'render')]
+    assert 'return 1' not in result['js']
+
+
+# --- ES modules ---------------------------------------------------------
+
+MODULES = {
+    'main.js': "import { used } from './lib';\nimport * as util from './util/index.js';\nshow(used(), util.twice(2));\n",
+    'lib.js': "export function used() { return 'used'; }\nexport function unused() {}\n",
+    'util/index.js': "export { twice } from '../math.js';\n",
+    'math.js': "export const twice = (n) => n * 2;\nexport default function noop() {}\n",
+}
+
+
+def test_imports_are_resolved_and_unused_exports_dropped():
+    result = bundle(dict(MODULES), order=['main.js'])
+
+    assert result['modules'] == 4
+    assert ('lib.js', 'unused') in result['dropped']
+    assert 'function unused' not in result['js']
+    assert 'return { used };' in result['js']
+    # Dependencies come before the module that imports them
+    assert result['js'].index('Module: math.js') < result['js'].index('Module: util/index.js') \
+        < result['js'].index('Module: main.js')
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_bundled_modules_run():
+    result = bundle(dict(MODULES), order=['main.js'])
+    program = 'const show = (...values) => console.log(values.join(" "));\n' + result['js']
+
+    output = subprocess.run(['node', '-e', program], capture_output=True, text=True, check=True).stdout
+    assert output == 'used 4\n'
+
+
+def test_unresolved_import_is_an_error():
+    with pytest.raises(BundleError, match="main.js:1: cannot resolve import './nowhere.js'"):
+        bundle({'main.js': "import { x } from './nowhere.js';\nx();\n"})
+
+
+def test_missing_export_is_an_error():
+    sources = {'main.js': "import { missing } from './lib.js';\nmissing();\n",
+               'lib.js': 'export const present = 1;\n'}
+
+    with pytest.raises(BundleError, match="'lib.js' has no export named 'missing'"):
+        bundle(sources, order=['main.js'])
+
+
+def test_missing_reexport_is_an_error():
+    sources = {'main.js': "import { a } from './index.js';\na();\n",
+               'index.js': "export { a } from './lib.js';\n",
+               'lib.js': 'export const b = 1;\n'}
+
+    with pytest.raises(BundleError, match="'lib.js' has no export named 'a'"):
+        bundle(sources, order=['main.js'])
+
+
+def test_import_cycle_is_an_error():
+    sources = {'a.js': "import { b } from './b.js';\nexport const a = () => b;\n",
+               'b.js': "import { a } from './a.js';\nexport const b = () => a;\n"}
+
+    with pytest.raises(BundleError, match='import cycle: a.js -> b.js -> a.js'):
+        bundle(sources, order=['a.js'])
+
+
+def test_reassigned_export_is_reported():
+    sources = {'main.js': "import { count } from './lib.js';\nshow(count);\n",
+               'lib.js': 'export let count = 0;\nexport function bump() { count++; }\n'}
+
+    result = bundle(sources, order=['main.js'])
+    assert result['warnings'] == ["lib.js: 'count' is reassigned after export; importers keep its initial value"]
+
+
+# --- Report -------------------------------------------------------------
+
+def test_missing_scripts_are_reported():
+    result = bundle({'script.js': 'run();\n', 'gone.js': None}, order=['script.js', 'gone.js'])
+
+    assert result['missing'] == ['gone.js']
+    assert result['scripts'] == 1
+
+
+def test_text_editor_reports_its_missing_validation_script():
+    apps = {name: (order, sources, html) for name, order, sources, html in load_official_apps()}
+    if 'text_editor' not in apps:
+        pytest.skip('official text_editor app not available')
+    order, sources, html = apps['text_editor']
+
+    result = bundle_scripts(order, sources, html)
+    assert result['missing'] == ['js/code-validation.js']
+    assert result['bytes_out'] <= result['bytes_in'] + 100
@@ -0,0 +1,54 @@
+"""The minify stage of pack_app: minifiers, toggles, fallbacks and what validation sees"""
+
+import pack_app
+
+SCRIPT = '''// Greeting helper
+function greet(name) {
+    const message = `Hello,   ${name}  // not a comment`;
+    return message;
+}
+'''
+
+
+def test_js_minifier_keeps_template_literals():
+    minified = pack_app.minify_js(SCRIPT)
+
+    assert '// Greeting helper' not in minified
+    assert '`Hello,   ${name}  // not a comment`' in minified
+    assert len(minified) < len(SCRIPT)
+
+
+def test_css_and_html_minifiers():
+    assert pack_app.minify_css('p {\n    color: red;\n}\n/* note */\n') == 'p{color:red}'
+    html = pack_app.minify_html('<div>\n    <!-- note -->\n    <p>Hi</p>\n</div>\n')
+    assert '<!--' not in html and '<p>Hi</p>' in html
+
+
+def test_packed_app_is_minified_but_validated_as_written(monkeypatch, validation_server, make_app, capsys):
+    app_dir = make_app(script=SCRIPT)
+    validated = []
+    real_validate = pack_app.validate_files
+    monkeypatch.setattr(pack_app, 'validate_files', lambda files: validated.append(files) or real_validate(files))
+
+    html = pack_app.build_app_html('test_app', app_dir)
+
+    assert '// Greeting helper' not in html
+    assert '// Greeting helper' in validated[0]['script.js']
+    assert 'Minified JS' in capsys.readouterr().out
+
+
+def test_minify_toggles_are_part_of_the_build_key(monkeypatch, validation_server, make_app):
+    app_dir = make_app(script=SCRIPT)
+    minified_key = pack_app._prepare_build('test_app', app_dir)['cache_key']
+    monkeypatch.setenv('SYPNEX_MINIFY_JS', '0')
+
+    assert pack_app._prepare_build('test_app', app_dir)['cache_key'] != minified_key
+    assert '// Greeting helper' in pack_app.build_app_html('test_app', app_dir)
+
+
+def test_missing_minifier_leaves_sources_unchanged(monkeypatch, validation_server, make_app, capsys):
+    app_dir = make_app(script=SCRIPT)
+    monkeypatch.setitem(pack_app._minifiers, 'js', None)
+
+    assert '// Greeting helper' in pack_app.build_app_html('test_app', app_dir)
+    assert 'JS minifier not installed' in capsys.readouterr().out
@@ -0,0 +1,69 @@
+"""pack all: dirty detection through the source hash recorded in each release package"""
+
+import os
+
+import pack_all
+from package_reader import read_header
+
+
+def _pack(tmp_path, **kwargs):
+    return pack_all.pack_all(str(tmp_path / 'apps'), str(tmp_path / 'releases'), jobs=2, **kwargs)
+
+
+def _mtimes(tmp_path):
+    releases = tmp_path / 'releases'
+    return {name: (releases / name).stat().st_mtime_ns for name in os.listdir(releases)}
+
+
+def test_only_changed_apps_are_repacked(validation_server, make_app, tmp_path, capsys):
+    make_app('app_one')
+    app_two = make_app('app_two')
+    assert _pack(tmp_path) is True
+    assert '2 of 2 apps changed' in capsys.readouterr().out
+    package_file = tmp_path / 'releases' / 'app_two_packaged.app'
+    recorded = read_header(str(package_file), ('package_info',))['package_info']['source_hash']
+    assert recorded == pack_all.existing_source_hash(str(package_file))
+
+    before = _mtimes(tmp_path)
+    assert _pack(tmp_path) is True
+    assert '0 of 2 apps changed' in capsys.readouterr().out
+    assert _mtimes(tmp_path) == before
+
+    with open(os.path.join(app_two, 'src', 'script.js'), 'a', encoding='utf-8') as f:
+        f.write('function other() {}\n')
+    assert _pack(tmp_path) is True
+    output = capsys.readouterr().out
+    assert '1 of 2 apps changed' in output and '1 packed, 1 unchanged' in output
+    assert pack_all.existing_source_hash(str(package_file)) != recorded
+    after = _mtimes(tmp_path)
+    assert after['app_one_packaged.app'] == before['app_one_packaged.app']
+    assert after['app_two_packaged.app'] != before['app_two_packaged.app']
+
+
+def test_option_changes_and_force_repack_everything(monkeypatch, validation_server, make_app, tmp_path, capsys):
+    make_app('app_one')
+    make_app('app_two')
+    assert _pack(tmp_path) is True
+
+    monkeypatch.setenv('SYPNEX_MINIFY', '0')
+    assert _pack(tmp_path) is True
+    assert '2 of 2 apps changed' in capsys.readouterr().out
+
+    assert _pack(tmp_path, force=True) is True
+    assert '2 of 2 apps changed (forced)' in capsys.readouterr().out
+
+
+def test_packages_without_a_readable_hash_are_dirty(validation_server, make_app, tmp_path, capsys):
+    make_app('app_one')
+    make_app('app_two')
+    assert _pack(tmp_path) is True
+    releases = tmp_path / 'releases'
+    os.remove(releases / 'app_one_packaged.app.sha256')
+    (releases / 'app_two_packaged.app').write_bytes(b'{"app_metadata": {"id": "app_two"')
+    capsys.readouterr()
+
+    assert pack_all.existing_source_hash(str(releases / 'app_one_packaged.app')) is None
+    assert pack_all.existing_source_hash(str(releases / 'app_two_packaged.app')) is None
+    assert _pack(tmp_path) is True
+    assert '2 of 2 apps changed' in capsys.readouterr().out
+    assert (releases / 'app_one_packaged.app.sha256').exists()
@@ -0,0 +1,89 @@
+"""Streaming package output: v1 layout and single-pass hashing, v2 deflate levels and reproducible bytes"""
+
+import json
+import base64
+import hashlib
+import zipfile
+
+import pytest
+
+import package_writer
+from package_writer import Package, FORMAT_V1, FORMAT_V2, V2_HEADER_NAME
+from package_reader import open_package
+
+
+def _package(tmp_path, level):
+    data = tmp_path / 'data.txt'
+    data.write_bytes(b'sypnex ' * 20000)
+    package_info = {'format_version': FORMAT_V2}
+    if level is not None:
+        package_info['compression'] = {'algorithm': 'gzip', 'level': level}
+    return Package('test_app', {'id': 'test_app'}, package_info, [('test_app.html', b'<p>hi</p>' * 500)],
+                   [{'vfs_path': '/apps/test_app/data.txt', 'filename': 'data.txt', 'path': str(data),
+                     'size': data.stat().st_size}], canonical=True)
+
+
+@pytest.mark.parametrize('level', [None, 1, 9])
+def test_entries_use_the_requested_level(tmp_path, level):
+    path = tmp_path / 'test_app_packaged.app'
+    path.write_bytes(b''.join(_package(tmp_path, level).iter_chunks()))
+
+    expected = zipfile.ZIP_STORED if level is None else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(path) as zf:
+        assert {info.compress_type for info in zf.infolist()} == {expected}
+        assert {info.date_time for info in zf.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+        assert V2_HEADER_NAME in zf.namelist()
+    with open_package(str(path)) as reader:
+        assert reader.additional_file_bytes('/apps/test_app/data.txt') == b'sypnex ' * 20000
+
+
+def test_higher_level_is_smaller_and_output_is_reproducible(tmp_path):
+    fast = b''.join(_package(tmp_path, 1).iter_chunks())
+    best = b''.join(_package(tmp_path, 9).iter_chunks())
+
+    assert len(best) <= len(fast)
+    assert b''.join(_package(tmp_path, 9).iter_chunks()) == best
+
+
+def _v1_package(tmp_path, data):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+    return Package('test_app', {'id': 'test_app', 'name': 'Test'}, {'format_version': FORMAT_V1},
+                   [('test_app.app', b'{"id": "test_app"}'), ('test_app.html', b'<p>hi</p>')],
+                   [{'vfs_path': '/apps/test_app/data.bin', 'filename': 'data.bin', 'path': str(path),
+                     'size': len(data)}])
+
+
+def test_v1_output_matches_json_dump_and_its_hash(monkeypatch, tmp_path):
+    # Small chunks so the file is encoded across several reads
+    monkeypatch.setattr(package_writer, 'CHUNK_SIZE', 3 * 1024)
+    data = bytes(range(256)) * 41
+    package = _v1_package(tmp_path, data)
+    output = tmp_path / 'test_app_packaged.app'
+
+    checksum, size = package.write(str(output))
+
+    written = output.read_bytes()
+    assert (checksum, size) == (hashlib.sha256(written).hexdigest(), len(written))
+    assert package.size == size
+    expected = {
+        'app_metadata': {'id': 'test_app', 'name': 'Test'},
+        'package_info': {'format_version': FORMAT_V1},
+        'files': {'test_app.app': base64.b64encode(b'{"id": "test_app"}').decode('ascii'),
+                  'test_app.html': base64.b64encode(b'<p>hi</p>').decode('ascii')},
+        'additional_files': [{'vfs_path': '/apps/test_app/data.bin', 'filename': 'data.bin',
+                              'data': base64.b64encode(data).decode('ascii'), 'size': len(data)}]
+    }
+    assert written == json.dumps(expected, indent=2).encode('utf-8')
+
+
+def test_v1_external_files_are_referenced_by_hash(tmp_path):
+    data = b'large asset ' * 1000
+    package = _v1_package(tmp_path, data)
+    package.additional_files[0]['external'] = True
+
+    document = json.loads(b''.join(package.iter_chunks()))
+    entry = document['additional_files'][0]
+    assert entry == {'vfs_path': '/apps/test_app/data.bin', 'filename': 'data.bin',
+                     'sha256': hashlib.sha256(data).hexdigest(), 'external': True, 'size': len(data)}
+    assert package.size == len(b''.join(package.iter_chunks()))
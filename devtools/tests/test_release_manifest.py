@@ -0,0 +1,38 @@
+"""versions.json from packaged apps, and its cache"""
+
+import os
+import json
+
+import release_manifest
+from package_writer import Package, FORMAT_V1
+
+
+def _write_package(path, version):
+    """Write a v1 package through a temp file and rename, like pack does"""
+    metadata = {'id': 'test_app', 'name': 'Test', 'version': version, 'author': 'me', 'description': 'd', 'icon': 'i'}
+    package = Package('test_app', metadata, {'format_version': FORMAT_V1}, [('test_app.html', b'<p>hi</p>' * 100)])
+    package.write(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+
+def test_manifest_lists_every_package(tmp_path):
+    _write_package(tmp_path / 'test_app_packaged.app', '1.0.0')
+    output = tmp_path / 'versions.json'
+
+    manifest = release_manifest.write_manifest(str(tmp_path), str(output))
+
+    expected = {'test_app': {'name': 'Test', 'version': '1.0.0', 'author': 'me', 'description': 'd', 'icon': 'i'}}
+    assert manifest == expected
+    assert json.loads(output.read_text(encoding='utf-8')) == expected
+
+
+def test_rewritten_package_with_a_stale_sidecar_is_read_again(tmp_path):
+    package_file = tmp_path / 'test_app_packaged.app'
+    _write_package(package_file, '1.0.0')
+    (tmp_path / 'test_app_packaged.app.sha256').write_text(f"{'0' * 64}  test_app_packaged.app\n", encoding='utf-8')
+    assert release_manifest.build_manifest(str(tmp_path))['test_app']['version'] == '1.0.0'
+
+    # Same size, new content; the .sha256 file is left as it was
+    _write_package(package_file, '1.0.1')
+
+    assert release_manifest.build_manifest(str(tmp_path))['test_app']['version'] == '1.0.1'
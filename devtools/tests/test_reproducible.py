@@ -0,0 +1,39 @@
+"""Reproducible packages: identical sources give byte-identical output"""
+
+import os
+import shutil
+
+import pytest
+
+import pack_app
+
+
+def _package_bytes(app_dir, format_version, reproducible=True):
+    package = pack_app.build_package(app_dir, format_version=format_version, compression='none',
+                                     reproducible=reproducible)
+    return package, b''.join(package.iter_chunks())
+
+
+@pytest.mark.parametrize('format_version', ['1.0', '2.0'])
+def test_identical_sources_give_identical_packages(monkeypatch, tmp_path, validation_server, make_app, format_version):
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', '1735689600')
+    app_dir = make_app(additional_files={'b.txt': b'bee', 'a.txt': b'ay'})
+    first_package, first = _package_bytes(app_dir, format_version)
+
+    # Same sources in another directory, with other mtimes and a cold cache
+    copy_dir = str(tmp_path / 'copy' / 'test_app')
+    shutil.copytree(app_dir, copy_dir)
+    for root, _, files in os.walk(copy_dir):
+        for name in files:
+            os.utime(os.path.join(root, name), (1, 1))
+    monkeypatch.setenv('SYPNEX_CACHE_DIR', str(tmp_path / 'other-cache'))
+    _, second = _package_bytes(copy_dir, format_version)
+
+    assert second == first
+    assert 'source_directory' not in first_package.package_info
+    assert first_package.package_info['created_at'] == '2025-01-01T00:00:00'
+
+
+def test_default_packages_record_the_host(validation_server, make_app):
+    package, _ = _package_bytes(make_app(), '2.0', reproducible=False)
+    assert 'source_directory' in package.package_info
@@ -0,0 +1,48 @@
+"""Validation requests: batching, the result cache and an unavailable API"""
+
+import socket
+import threading
+
+import pack_app
+
+
+def test_accepted_files_are_not_sent_again(validation_server):
+    files = {'index.html': '<p>hi</p>', 'script.js': 'var a = 1;'}
+    assert pack_app.validate_files(files) is True
+    assert pack_app.validate_files(files) is True
+    assert validation_server.requests == 1
+
+    assert pack_app.validate_files(dict(files, **{'script.js': 'var a = 2;'})) is True
+    assert validation_server.requests == 2
+
+
+def test_rejected_files_are_not_cached(validation_server):
+    validation_server.valid = False
+    assert pack_app.validate_files({'script.js': 'bad();'}) is False
+    validation_server.valid = True
+    assert pack_app.validate_files({'script.js': 'bad();'}) is True
+    assert validation_server.requests == 2
+
+
+def test_unavailable_api_is_tried_once(monkeypatch):
+    # Accepts each connection and drops it, so every attempt is a connection error
+    listener = socket.create_server(('127.0.0.1', 0))
+    connections = []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            connections.append(conn)
+            conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    monkeypatch.setenv('SYPNEX_SERVER_URL', f"http://127.0.0.1:{listener.getsockname()[1]}")
+    monkeypatch.setenv('SYPNEX_HTTP_RETRIES', '3')
+    try:
+        assert pack_app.validate_files({'script.js': 'var a = 1;'}) is None
+    finally:
+        listener.close()
+    assert len(connections) == 1
@@ -0,0 +1,125 @@
+"""Shared vendor libraries: script split, VFS paths, the loader and the package contents"""
+
+import json
+import base64
+import shutil
+import hashlib
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import pack_app
+import vendor_store
+
+LIBRARY = b'var SharedLib = { answer: 42, origin: "vendor-body" };\n'
+SCRIPT = 'function init() { return SharedLib.answer; }\n'
+
+
+def library_record(content=LIBRARY, name='lib.js'):
+    sha256 = hashlib.sha256(content).hexdigest()
+    return {'name': name, 'sha256': sha256, 'vfs_path': vendor_store.shared_vfs_path(sha256, name)}
+
+
+@pytest.fixture
+def vendor_app(make_app, monkeypatch):
+    """An app whose .app file lists vendor/lib.js before its own script, with shared mode on"""
+    monkeypatch.setenv('SYPNEX_SHARED_VENDOR', '1')
+    app_dir = make_app(script=SCRIPT)
+    (Path(app_dir) / 'src' / 'vendor').mkdir()
+    (Path(app_dir) / 'src' / 'vendor' / 'lib.js').write_bytes(LIBRARY)
+    metadata_path = Path(app_dir) / 'test_app.app'
+    metadata = json.loads(metadata_path.read_text(encoding='utf-8'))
+    metadata['scripts'] = ['vendor/lib.js', 'script.js']
+    metadata_path.write_text(json.dumps(metadata), encoding='utf-8')
+    return app_dir
+
+
+def test_split_scripts_takes_scripts_in_vendor_directories():
+    order = ['vendor/three.min.js', 'script.js', 'js/vendor/chart.js', 'vendors/x.js', 'vendor.js', 'js\\vendor\\d3.js']
+
+    assert vendor_store.split_scripts(order) == (
+        ['vendor/three.min.js', 'js/vendor/chart.js', 'js\\vendor\\d3.js'],
+        ['script.js', 'vendors/x.js', 'vendor.js'])
+
+
+def test_shared_vfs_path_depends_only_on_content_and_file_name():
+    sha256 = 'ab' * 32
+
+    assert vendor_store.shared_vfs_path(sha256, 'js\\vendor\\chart.js') == f"/shared/vendor/{sha256}/chart.js"
+    assert vendor_store.shared_vfs_path(sha256, 'vendor/chart.js') == vendor_store.shared_vfs_path(sha256, 'chart.js')
+
+
+def test_loader_keeps_the_app_code_inline_and_stays_in_the_sandbox():
+    loader = vendor_store.loader_script([library_record()], SCRIPT)
+
+    assert SCRIPT in loader
+    assert 'sypnexAPI.readVirtualFileBlob' in loader
+    for forbidden in ('window', 'createElement', 'textContent', 'appendChild'):
+        assert forbidden not in loader
+
+
+def test_loader_escapes_closing_tags_in_library_names():
+    loader = vendor_store.loader_script([library_record(name='</script><b>.js')], '')
+
+    assert '</' not in loader
+    assert '<\\/script><b>.js' in loader
+
+
+def run_loader(tmp_path, libraries, files, code):
+    """Run the loader in node with a sypnexAPI that serves files ({vfs_path: bytes}); returns stdout + stderr"""
+    stub = 'const sypnexAPI = { readVirtualFileBlob: async (path) => new Blob([Buffer.from(%s[path], "base64")]) };\n' % (
+        json.dumps({path: base64.b64encode(data).decode('ascii') for path, data in files.items()}))
+    program = tmp_path / 'loader.js'
+    program.write_text(stub + vendor_store.loader_script(libraries, code), encoding='utf-8')
+    result = subprocess.run(['node', str(program)], capture_output=True, text=True, timeout=30)
+    return result.stdout + result.stderr
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_loader_runs_libraries_before_the_app_code(tmp_path):
+    first, second = library_record(), library_record(b'var Twice = SharedLib.answer * 2;\n', 'twice.js')
+    files = {first['vfs_path']: LIBRARY, second['vfs_path']: b'var Twice = SharedLib.answer * 2;\n'}
+
+    assert run_loader(tmp_path, [first, second], files, 'console.log(SharedLib.answer, Twice);') == '42 84\n'
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_loader_rejects_a_library_that_does_not_match_its_hash(tmp_path):
+    record = library_record()
+    output = run_loader(tmp_path, [record], {record['vfs_path']: b'var SharedLib = "tampered";\n'}, 'console.log("ran");')
+
+    assert 'does not match its hash' in output
+    assert 'ran' not in output
+
+
+def test_shared_mode_package_references_libraries_by_hash(vendor_app, validation_server, monkeypatch):
+    validated = []
+    real_validate = pack_app.validate_files
+    monkeypatch.setattr(pack_app, 'validate_files', lambda files: validated.append(files) or real_validate(files))
+
+    package = pack_app.build_package(vendor_app, external_threshold=1024 * 1024)
+
+    record = library_record()
+    assert [library['vfs_path'] for library in package.package_info['shared_libraries']] == [record['vfs_path']]
+    assert [(entry['vfs_path'], entry['external']) for entry in package.additional_files] == [(record['vfs_path'], True)]
+    html = dict(package.files)['test_app.html'].decode('utf-8')
+    assert 'readVirtualFileBlob' in html
+    assert 'vendor-body' not in html
+    # The loader is validated together with the unminified app code
+    assert 'readVirtualFileBlob' in validated[0]['script.js']
+    assert SCRIPT in validated[0]['script.js']
+
+
+def test_shared_mode_without_separate_uploads_fails(vendor_app, validation_server, capsys):
+    assert pack_app.build_package(vendor_app) is None
+    assert 'SYPNEX_LARGE_FILE_THRESHOLD' in capsys.readouterr().out
+
+
+def test_vendor_scripts_are_inlined_when_shared_mode_is_off(vendor_app, validation_server, monkeypatch):
+    monkeypatch.setenv('SYPNEX_SHARED_VENDOR', '0')
+
+    package = pack_app.build_package(vendor_app)
+
+    assert 'shared_libraries' not in package.package_info
+    assert 'vendor-body' in dict(package.files)['test_app.html'].decode('utf-8')
@@ -0,0 +1,84 @@
+"""verify: sha256sum-format checksum files, the digest cache and the JSON report"""
+
+import os
+import json
+import shutil
+import hashlib
+import subprocess
+
+import pytest
+
+import verify
+
+
+def _package(directory, name, data):
+    path = directory / name
+    path.write_bytes(data)
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.parametrize('separator', ['  ', ' *'])
+def test_parse_text_and_binary_mode_lines(tmp_path, separator):
+    digest = _package(tmp_path, 'my app.app', b'package')
+    checksum_file = tmp_path / 'SHA256SUMS.sha256'
+    checksum_file.write_text(f"\n{digest.upper()}{separator}my app.app\n", encoding='utf-8')
+
+    assert verify.parse_checksum_file(str(checksum_file)) == [(digest, str(tmp_path / 'my app.app'))]
+
+
+def test_parse_rejects_other_formats(tmp_path):
+    checksum_file = tmp_path / 'bad.sha256'
+    checksum_file.write_text('SHA256 (app.app) = abc\n', encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        verify.parse_checksum_file(str(checksum_file))
+
+
+@pytest.mark.skipif(shutil.which('sha256sum') is None, reason='sha256sum not installed')
+@pytest.mark.parametrize('mode', ['--text', '--binary'])
+def test_files_written_by_sha256sum_verify(tmp_path, mode):
+    _package(tmp_path, 'a_packaged.app', b'a' * 1000)
+    listing = subprocess.run(['sha256sum', mode, 'a_packaged.app'], cwd=tmp_path, capture_output=True, check=True).stdout
+    (tmp_path / 'a_packaged.app.sha256').write_bytes(listing)
+
+    assert [result['status'] for result in verify.verify_paths([str(tmp_path)])] == [verify.OK]
+
+
+def test_statuses(tmp_path):
+    digest = _package(tmp_path, 'good_packaged.app', b'good')
+    (tmp_path / 'good_packaged.app.sha256').write_text(f"{digest}  good_packaged.app\n", encoding='utf-8')
+    _package(tmp_path, 'bad_packaged.app', b'changed')
+    (tmp_path / 'bad_packaged.app.sha256').write_text(f"{digest}  bad_packaged.app\n", encoding='utf-8')
+    (tmp_path / 'gone_packaged.app.sha256').write_text(f"{digest}  gone_packaged.app\n", encoding='utf-8')
+    _package(tmp_path, 'bare_packaged.app', b'bare')
+
+    statuses = {os.path.basename(result['path']): result['status'] for result in verify.verify_paths([str(tmp_path)])}
+    assert statuses == {'good_packaged.app': verify.OK, 'bad_packaged.app': verify.MISMATCH,
+                        'gone_packaged.app': verify.MISSING, 'bare_packaged.app': verify.NO_CHECKSUM}
+
+
+def test_digests_are_cached_until_the_file_changes(tmp_path):
+    digest = _package(tmp_path, 'a_packaged.app', b'a' * 1000)
+    (tmp_path / 'a_packaged.app.sha256').write_text(f"{digest}  a_packaged.app\n", encoding='utf-8')
+
+    assert verify.verify_paths([str(tmp_path)])[0]['cached'] is False
+    assert verify.verify_paths([str(tmp_path)])[0]['cached'] is True
+    assert verify.verify_paths([str(tmp_path)], use_cache=False)[0]['cached'] is False
+
+    # Same size, new content, replaced the way pack writes packages
+    (tmp_path / 'new').write_bytes(b'b' * 1000)
+    os.replace(tmp_path / 'new', tmp_path / 'a_packaged.app')
+    result = verify.verify_paths([str(tmp_path)])[0]
+    assert (result['cached'], result['status']) == (False, verify.MISMATCH)
+
+
+def test_json_report(tmp_path, capsys):
+    digest = _package(tmp_path, 'a_packaged.app', b'a')
+    (tmp_path / 'a_packaged.app.sha256').write_text(f"{digest}  a_packaged.app\n", encoding='utf-8')
+    _package(tmp_path, 'b_packaged.app', b'b')
+
+    assert verify.verify([str(tmp_path)], as_json=True) is False
+    report = json.loads(capsys.readouterr().out)
+    assert (report['ok'], report['verified'], report['failed'], report['cached']) == (False, 1, 1, 0)
+    assert [(os.path.basename(r['path']), r['status'], r['actual']) for r in report['results']] == [
+        ('a_packaged.app', verify.OK, digest), ('b_packaged.app', verify.NO_CHECKSUM, None)]
@@ -0,0 +1,40 @@
+"""vfs_deploy.sync_directory against the local dev server"""
+
+import vfs_deploy
+
+
+def _tree(root):
+    (root / 'lib').mkdir(parents=True)
+    (root / 'main.py').write_text('print("hi")\n', encoding='utf-8')
+    (root / 'lib' / 'util.py').write_text('VALUE = 1\n', encoding='utf-8')
+    (root / 'lib' / 'blob.bin').write_bytes(bytes(range(256)) * 64)
+
+
+def test_sync_uploads_only_changed_files(tmp_path, dev_server, capsys):
+    url, data_dir = dev_server
+    local = tmp_path / 'scripts'
+    _tree(local)
+
+    assert vfs_deploy.sync_directory(str(local), '/scripts', url) is True
+    assert (data_dir / 'vfs' / 'scripts' / 'lib' / 'blob.bin').read_bytes() == bytes(range(256)) * 64
+    assert '3 uploaded' in capsys.readouterr().out
+
+    assert vfs_deploy.sync_directory(str(local), '/scripts', url) is True
+    assert '0 uploaded' in capsys.readouterr().out
+
+    (local / 'lib' / 'util.py').write_text('VALUE = 2\n', encoding='utf-8')
+    assert vfs_deploy.sync_directory(str(local), '/scripts', url) is True
+    assert '1 uploaded' in capsys.readouterr().out
+    assert (data_dir / 'vfs' / 'scripts' / 'lib' / 'util.py').read_text(encoding='utf-8') == 'VALUE = 2\n'
+
+
+def test_pending_uploads_hold_paths_not_contents(tmp_path, dev_server, monkeypatch):
+    url, _ = dev_server
+    local = tmp_path / 'scripts'
+    _tree(local)
+    sent = []
+    upload = vfs_deploy._upload_file
+    monkeypatch.setattr(vfs_deploy, '_upload_file', lambda *args: sent.append(args[3]) or upload(*args))
+
+    assert vfs_deploy.sync_directory(str(local), '/scripts', url) is True
+    assert sorted(sent) == sorted(str(path) for path in local.rglob('*') if path.is_file())
@@ -0,0 +1,40 @@
+"""Watch mode keeps running when a redeploy fails"""
+
+import os
+
+import watch
+
+
+class FakeWatcher:
+    """Reports one change to path, then stops the watch loop like Ctrl+C"""
+
+    def __init__(self, path):
+        self.events = [{path}, set()]
+
+    def wait(self, timeout=None):
+        if not self.events:
+            raise KeyboardInterrupt
+        return self.events.pop(0)
+
+    def close(self):
+        pass
+
+
+def test_failed_validation_does_not_exit(validation_server, make_app, capsys):
+    app_dir = make_app()
+    validation_server.valid = False
+
+    assert watch._redeploy('test_app', app_dir, validation_server.url) is False
+    assert 'waiting for the next change' in capsys.readouterr().out
+
+
+def test_watch_loop_survives_a_failed_redeploy(monkeypatch, validation_server, make_app, capsys):
+    app_dir = make_app()
+    validation_server.valid = False
+    monkeypatch.setattr(watch, 'create_watcher',
+                        lambda roots, poll_interval: FakeWatcher(os.path.join(app_dir, 'src', 'script.js')))
+
+    assert watch.watch_and_deploy([('test_app', app_dir)], validation_server.url, initial_deploy=False) is True
+    output = capsys.readouterr().out
+    assert 'Failed to pack test_app' in output
+    assert 'Stopped watching' in output
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Asset Optimization Module - Shrink additional files before they are packaged
+
+Each file listed in an app's additional_files is processed by its extension:
+
+    .png                     Recompressed losslessly (Pillow, optimize=True)
+    .jpg .jpeg               Re-encoded only at SYPNEX_ASSET_JPEG_QUALITY or when resized
+    .png .jpg .jpeg .webp    Scaled down to fit SYPNEX_ASSET_MAX_DIMENSION
+    .json                    Minified (whitespace removed, values unchanged)
+    .svg                     Comments and whitespace between tags removed
+
+Everything else (audio, fonts, archives...) is packaged as it is, and so is
+any output that is not smaller than the original. Images need Pillow
+(pip install Pillow); without it they are left unchanged with a warning.
+
+Results are cached by a hash of the file content, the options and this
+module, so unchanged assets are not processed again. The optimized bytes are
+stored under <cache>/asset-files/ and packages reference them by path like any
+other additional file.
+
+Configuration (environment / .env):
+    SYPNEX_OPTIMIZE_ASSETS       1 to optimize additional files (default 0, see pack_app)
+    SYPNEX_ASSET_MAX_DIMENSION   Largest image width/height in pixels (default: no limit)
+    SYPNEX_ASSET_JPEG_QUALITY    JPEG quality 1-95 (default: JPEGs are only re-encoded when resized, at 90)
+"""
+
+import os
+import re
+import io
+import sys
+import json
+import hashlib
+import tempfile
+import importlib
+from pathlib import Path
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_cache
+import tracing
+
+_IMAGE_FORMATS = {'.png': 'PNG', '.jpg': 'JPEG', '.jpeg': 'JPEG', '.webp': 'WEBP'}
+_TEXT_TYPES = ('.json', '.svg')
+
+# Quality for JPEGs that have to be re-encoded because they were resized
+_RESIZE_JPEG_QUALITY = 90
+
+# Comments are dropped; <text> elements and CDATA sections keep their whitespace
+_SVG_COMMENT_RE = re.compile(r'<!\[CDATA\[.*?\]\]>|<!--.*?-->', re.S)
+_SVG_PRESERVE_RE = re.compile(r'(<!\[CDATA\[.*?\]\]>|<text\b.*?</text>)', re.S)
+_SVG_GAP_RE = re.compile(r'>\s+<')
+
+_pillow = None
+_fingerprint = None
+
+
+def _int_setting(name, low, high):
+    value = os.getenv(name, '').strip()
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        print(f"⚠️  Warning: Ignoring invalid {name} '{value}'")
+        return None
+    if not low <= number <= high:
+        print(f"⚠️  Warning: Ignoring {name}={number} (expected {low}-{high})")
+        return None
+    return number
+
+
+def _image_module():
+    """PIL.Image, or False if Pillow is not installed (imported on first use)"""
+    global _pillow
+    if _pillow is None:
+        try:
+            _pillow = importlib.import_module('PIL.Image')
+        except ImportError:
+            _pillow = False
+    return _pillow
+
+
+def asset_options():
+    """Options that change the optimized output, as recorded in cache keys and release source hashes"""
+    image = _image_module()
+    return {
+        'max_dimension': _int_setting('SYPNEX_ASSET_MAX_DIMENSION', 1, 65535),
+        'jpeg_quality': _int_setting('SYPNEX_ASSET_JPEG_QUALITY', 1, 95),
+        'pillow': getattr(sys.modules.get('PIL'), '__version__', None) if image else None,
+        'tool': _tool_fingerprint()
+    }
+
+
+def _tool_fingerprint():
+    global _fingerprint
+    if _fingerprint is None:
+        # Normalise line endings so Windows and Linux checkouts agree
+        source = Path(__file__).read_bytes().replace(b'\r\n', b'\n')
+        _fingerprint = hashlib.sha256(source).hexdigest()[:16]
+    return _fingerprint
+
+
+def _blob_root():
+    root = build_cache.get_cache_root()
+    # With the build cache off, outputs still need a home while the package is written
+    return (root if root is not None else Path(tempfile.gettempdir()) / 'sypnex') / 'asset-files'
+
+
+def asset_path(sha256):
+    """Where the optimized asset with this content hash is stored"""
+    return _blob_root() / sha256[:2] / sha256
+
+
+def minify_json(data):
+    """JSON with insignificant whitespace removed"""
+    return json.dumps(json.loads(data.decode('utf-8-sig')), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def minify_svg(data):
+    """SVG with comments and whitespace between tags removed"""
+    text = _SVG_COMMENT_RE.sub(lambda match: '' if match.group().startswith('<!--') else match.group(),
+                               data.decode('utf-8-sig'))
+    parts = _SVG_PRESERVE_RE.split(text)
+    for index in range(0, len(parts), 2):
+        # Preserved parts start with < and end with >, so gaps next to them close too
+        parts[index] = _SVG_GAP_RE.sub('><', '>' + parts[index] + '<')[1:-1]
+    return ''.join(parts).strip().encode('utf-8')
+
+
+def optimize_image(data, image_format, options):
+    """Recompressed (and possibly scaled down) image bytes, or None if the image is left as it is"""
+    Image = _image_module()
+    image = Image.open(io.BytesIO(data))
+    if getattr(image, 'is_animated', False):
+        return None
+
+    resized = False
+    limit = options['max_dimension']
+    if limit and max(image.size) > limit:
+        image.thumbnail((limit, limit), Image.LANCZOS)
+        resized = True
+
+    save_options = {'optimize': True}
+    for key in ('icc_profile', 'exif'):
+        if image.info.get(key):
+            save_options[key] = image.info[key]
+    if image_format == 'JPEG':
+        if options['jpeg_quality'] is None and not resized:
+            # No lossless JPEG recompression in Pillow
+            return None
+        save_options['quality'] = options['jpeg_quality'] or _RESIZE_JPEG_QUALITY
+        save_options['progressive'] = True
+    elif image_format == 'WEBP':
+        if not resized:
+            return None
+        save_options['lossless'] = True
+
+    output = io.BytesIO()
+    image.save(output, image_format, **save_options)
+    return output.getvalue()
+
+
+def _process(data, extension, options):
+    if extension == '.json':
+        return minify_json(data)
+    if extension == '.svg':
+        return minify_svg(data)
+    return optimize_image(data, _IMAGE_FORMATS[extension], options)
+
+
+def is_optimizable(name):
+    """Whether files with this name are processed"""
+    extension = os.path.splitext(name)[1].lower()
+    return extension in _TEXT_TYPES or extension in _IMAGE_FORMATS
+
+
+@tracing.traced('optimize asset')
+def optimize_asset(path, label, options=None):
+    """Optimize the file at path; returns a dict with path, size, original_size and cached
+
+    path is the optimized copy, or the original when the file type is not
+    handled or processing did not make it smaller. Failures (invalid JSON,
+    unreadable images) are reported and leave the file unchanged.
+    """
+    original_size = os.path.getsize(path)
+    unchanged = {'path': path, 'size': original_size, 'original_size': original_size, 'cached': False}
+    extension = os.path.splitext(path)[1].lower()
+    if not is_optimizable(path):
+        return unchanged
+    if extension in _IMAGE_FORMATS and not _image_module():
+        print(f"⚠️  Warning: Pillow not installed - {label} left unoptimized")
+        return unchanged
+
+    options = options or asset_options()
+    sha256_hash = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8'))
+    sha256_hash.update(f"\n{extension}\n{build_cache.file_sha256(path)}".encode('utf-8'))
+    key = sha256_hash.hexdigest()
+
+    cached = build_cache.load_entry('assets', key)
+    if cached is not None and (cached['sha256'] is None or asset_path(cached['sha256']).exists()):
+        result = cached
+        hit = True
+    else:
+        hit = False
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            output = _process(data, extension, options)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not optimize {label}: {e}")
+            return unchanged
+        if output is None or len(output) >= len(data):
+            result = {'sha256': None, 'size': original_size}
+        else:
+            digest = hashlib.sha256(output).hexdigest()
+            target = asset_path(digest)
+            if not target.exists():
+                with build_cache.atomic_path(target) as tmp_path:
+                    with open(tmp_path, 'wb') as f:
+                        f.write(output)
+            result = {'sha256': digest, 'size': len(output)}
+        build_cache.store_entry('assets', key, result)
+
+    if result['sha256'] is None:
+        return dict(unchanged, cached=hit)
+    saved = 100 * (original_size - result['size']) / original_size if original_size else 0
+    print(f"✂️  Optimized {label}: {original_size:,} → {result['size']:,} bytes ({saved:.0f}% smaller)" + (" [cached]" if hit else ""))
+    return {'path': str(asset_path(result['sha256'])), 'size': result['size'], 'original_size': original_size,
+            'sha256': result['sha256'], 'cached': hit}
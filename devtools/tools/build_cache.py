@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Build Cache Module - Content-addressed on-disk cache for packing stages
+
+Every app build is keyed by a SHA256 over all of its inputs (ordered script and
+style lists, source file contents, raw .app metadata and the packer version).
+Stage outputs are stored under that key so an unchanged app repacks with no
+work, and the cache directory can be shared between machines (e.g. restored
+as a warm cache in CI).
+
+A long-running process (the dev daemon) can also keep the content-addressed
+namespaces in memory with enable_memory_cache(); entries there never change
+for a given key, so a memory hit is always current. Callers must treat
+loaded entries as read-only.
+
+Configuration (environment / .env):
+    SYPNEX_CACHE_DIR     Root cache directory (default: ~/.sypnex/cache)
+    SYPNEX_BUILD_CACHE   Set to 0/false/off to disable the build cache
+"""
+
+import os
+import sys
+import json
+import hashlib
+import mmap
+import contextlib
+from collections import OrderedDict
+from pathlib import Path
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import tracing
+
+# Bump when the packer output format changes in a way the source fingerprint
+# below would not catch (e.g. a dependency upgrade).
+PACKER_VERSION = "1.1.0"
+
+# Files whose contents change the packer output
+_TOOL_FILES = ('pack_app.py', 'build_cache.py', 'css_scope.py', 'js_bundle.py', 'vendor_store.py')
+
+# Files that change how packages are serialized (not the cached stages)
+_WRITER_FILES = ('package_writer.py', 'compression.py')
+
+_fingerprint = None
+_writer_fingerprint_value = None
+
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+# Namespaces keyed by a hash of everything that determines the entry
+_IMMUTABLE_NAMESPACES = frozenset(('build', 'minify', 'validation', 'verify', 'release-manifest', 'assets'))
+
+# Entry path -> (JSON size, data), least recently used first; None while disabled
+_memory = None
+_memory_limit = 0
+_memory_size = 0
+
+
+def get_cache_root():
+    """Get the root cache directory, or None if caching is disabled"""
+    if os.getenv('SYPNEX_BUILD_CACHE', '1').strip().lower() in ('0', 'false', 'off', 'no'):
+        return None
+    cache_dir = os.getenv('SYPNEX_CACHE_DIR')
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    return Path.home() / '.sypnex' / 'cache'
+
+
+def _hash_tool_files(names):
+    sha256_hash = hashlib.sha256(PACKER_VERSION.encode('utf-8'))
+    tools_dir = Path(__file__).parent
+    for name in names:
+        try:
+            # Normalise line endings so Windows and Linux checkouts agree
+            sha256_hash.update((tools_dir / name).read_bytes().replace(b'\r\n', b'\n'))
+        except OSError:
+            sha256_hash.update(b'missing:' + name.encode('utf-8'))
+    return f"{PACKER_VERSION}-{sha256_hash.hexdigest()[:16]}"
+
+
+def packer_fingerprint():
+    """Version string plus a hash of the packer sources, so tool upgrades invalidate the cache"""
+    global _fingerprint
+    if _fingerprint is None:
+        _fingerprint = _hash_tool_files(_TOOL_FILES)
+    return _fingerprint
+
+
+def _writer_fingerprint():
+    """Version string plus a hash of the package writer sources"""
+    global _writer_fingerprint_value
+    if _writer_fingerprint_value is None:
+        _writer_fingerprint_value = _hash_tool_files(_WRITER_FILES)
+    return _writer_fingerprint_value
+
+
+def _update_field(sha256_hash, label, value):
+    """Feed a length-prefixed field into the hash so field boundaries are unambiguous"""
+    if value is None:
+        sha256_hash.update(f"{label}:none\n".encode('utf-8'))
+        return
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    sha256_hash.update(f"{label}:{len(value)}\n".encode('utf-8'))
+    sha256_hash.update(value)
+
+
+def compute_build_key(app_id, app_file_bytes, script_order, style_order, sources, options=None):
+    """Compute the cache key for an app build
+
+    Args:
+        app_id: App ID from the .app metadata
+        app_file_bytes: Raw bytes of the .app file (None if there is none)
+        script_order: Ordered list of script paths
+        style_order: Ordered list of style paths
+        sources: Dict of relative source path -> file content (None if missing)
+        options: JSON-serializable build options that change the output (e.g. minify toggles)
+    """
+    sha256_hash = hashlib.sha256()
+    _update_field(sha256_hash, 'packer', packer_fingerprint())
+    _update_field(sha256_hash, 'app_id', app_id)
+    _update_field(sha256_hash, 'app_file', app_file_bytes)
+    _update_field(sha256_hash, 'scripts', json.dumps(list(script_order)))
+    _update_field(sha256_hash, 'styles', json.dumps(list(style_order)))
+    _update_field(sha256_hash, 'options', json.dumps(options or {}, sort_keys=True))
+    for name in sorted(sources):
+        _update_field(sha256_hash, 'source', name)
+        _update_field(sha256_hash, 'content', sources[name])
+    return sha256_hash.hexdigest()
+
+
+def _iter_source_files(source_dir):
+    """Every file of an app directory that goes into its package, in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != '__pycache__')
+        for name in sorted(filenames):
+            # Packaged outputs and their checksums are not sources
+            if name.startswith('.') or name.endswith('.pyc') or '_packaged' in name:
+                continue
+            path = os.path.join(dirpath, name)
+            yield os.path.relpath(path, source_dir).replace(os.sep, '/'), path
+
+
+def file_sha256(path):
+    """SHA256 hex digest of a file: memory-mapped when large, otherwise read in 1 MiB chunks
+
+    hashlib releases the GIL while hashing large buffers, so threads hashing
+    different files run in parallel.
+    """
+    with open(path, 'rb', buffering=0) as f:
+        if os.fstat(f.fileno()).st_size >= _HASH_BUFFER_SIZE:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return hashlib.sha256(mapped).hexdigest()
+            except (OSError, ValueError):
+                # Not mappable (e.g. a special file); fall back to reads
+                f.seek(0)
+        sha256_hash = hashlib.sha256()
+        buffer = bytearray(_HASH_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            sha256_hash.update(view[:count])
+        return sha256_hash.hexdigest()
+
+
+def compute_source_hash(source_dir, options=None):
+    """Hash every source file of an app plus the options and tools that shape its package
+
+    Used to tell whether a release package is stale. File hashes are kept in
+    the cache and reused while a file's size and mtime are unchanged, so only
+    edited files are read again.
+    """
+    source_dir = os.path.abspath(source_dir)
+    stat_key = hashlib.sha256(source_dir.encode('utf-8')).hexdigest()
+    known = load_entry('source-files', stat_key) or {}
+    current = {}
+
+    sha256_hash = hashlib.sha256()
+    _update_field(sha256_hash, 'packer', packer_fingerprint())
+    _update_field(sha256_hash, 'writer', _writer_fingerprint())
+    _update_field(sha256_hash, 'options', json.dumps(options or {}, sort_keys=True))
+    for relative_path, path in _iter_source_files(source_dir):
+        stat = os.stat(path)
+        entry = known.get(relative_path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            digest = entry[2]
+        else:
+            digest = file_sha256(path)
+        current[relative_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        _update_field(sha256_hash, 'source', relative_path)
+        _update_field(sha256_hash, 'sha256', digest)
+
+    if current != known:
+        store_entry('source-files', stat_key, current)
+    return sha256_hash.hexdigest()
+
+
+def _entry_path(namespace, key):
+    root = get_cache_root()
+    if root is None:
+        return None
+    return root / namespace / key[:2] / f"{key}.json"
+
+
+def _trace_label(namespace, key):
+    # Stage entries are keyed "<build key>/<stage>"
+    return f"{namespace}/{key.split('/', 1)[1]}" if '/' in key else namespace
+
+
+def enable_memory_cache(max_bytes):
+    """Keep content-addressed entries in memory too, up to max_bytes of their JSON size"""
+    global _memory, _memory_limit, _memory_size
+    _memory = OrderedDict()
+    _memory_limit = max_bytes
+    _memory_size = 0
+
+
+def memory_cache_stats():
+    """Entries and bytes held in memory, or None if the memory cache is off"""
+    if _memory is None:
+        return None
+    return {'entries': len(_memory), 'bytes': _memory_size, 'limit': _memory_limit}
+
+
+def _remember(namespace, path, size, data):
+    global _memory_size
+    if _memory is None or namespace not in _IMMUTABLE_NAMESPACES or size > _memory_limit:
+        return
+    previous = _memory.pop(str(path), None)
+    if previous is not None:
+        _memory_size -= previous[0]
+    _memory[str(path)] = (size, data)
+    _memory_size += size
+    while _memory_size > _memory_limit:
+        _memory_size -= _memory.popitem(last=False)[1][0]
+
+
+def load_entry(namespace, key):
+    """Load a cached entry, or None on a miss"""
+    with tracing.span(f"cache {_trace_label(namespace, key)}", 'cache', key=key[:12]) as span:
+        path = _entry_path(namespace, key)
+        remembered = _memory.get(str(path)) if _memory is not None and path is not None else None
+        if remembered is not None:
+            _memory.move_to_end(str(path))
+            span.set(hit=True, memory=True)
+            return remembered[1]
+        if path is None or not path.exists():
+            span.set(hit=False)
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            size = path.stat().st_size
+            span.set(hit=True, bytes=size)
+            _remember(namespace, path, size, data)
+            return data
+        except Exception as e:
+            print(f"⚠️  Warning: Ignoring unreadable cache entry {path}: {e}")
+            span.set(hit=False)
+            return None
+
+
+def store_entry(namespace, key, data):
+    """Store an entry atomically so concurrent builds never see partial entries"""
+    path = _entry_path(namespace, key)
+    if path is None:
+        return False
+    try:
+        write_json_atomic(path, data)
+        if _memory is not None:
+            _remember(namespace, path, path.stat().st_size, data)
+        return True
+    except Exception as e:
+        print(f"⚠️  Warning: Could not write cache entry {path}: {e}")
+        return False
+
+
+def load_stage(key, stage):
+    """Load a cached stage output for a build key, or None on a miss"""
+    return load_entry('build', f"{key}/{stage}")
+
+
+def store_stage(key, stage, data):
+    """Store a stage output for a build key"""
+    return store_entry('build', f"{key}/{stage}", data)
+
+
+@contextlib.contextmanager
+def atomic_path(path, suffix=''):
+    """Yield a temp path in the target directory; it replaces path if the block succeeds
+
+    Readers see either the old file or the complete new one, never a partial write.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Named rather than created with mkstemp so the file gets the usual (umask) permissions
+    tmp_path = str(path.parent / f".tmp-{os.urandom(8).hex()}{suffix}")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_text_atomic(path, text):
+    """Write a text file atomically"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def write_json_atomic(path, data, indent=None, ensure_ascii=True):
+    """Write JSON to a temp file in the target directory and rename it into place"""
+    with atomic_path(path, suffix='.json') as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
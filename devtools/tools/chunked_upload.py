@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Chunked Upload Module - Resumable uploads of large additional files
+
+Additional files at or above the size threshold are left out of deploy
+packages (the package references them by sha256) and are uploaded on their
+own before the install, one chunk per request:
+
+    POST /api/user-apps/uploads          {sha256, size, filename}
+                                         -> {upload_id, offset, complete}
+    GET  /api/user-apps/uploads/<id>     -> {upload_id, offset, size, complete}
+    PUT  /api/user-apps/uploads/<id>     one chunk, Content-Range: bytes a-b/size
+                                         -> {offset, complete}
+
+The server keeps the bytes received so far, so an interrupted upload resumes
+from the server's offset instead of starting over - within one run after a
+dropped connection, and across runs because the upload ID is remembered in
+the build cache directory. Blobs the server already has complete immediately,
+so a shared library (see vendor_store) is only sent once per server.
+tools/dev_server.py implements these endpoints for local testing. Deploys
+first check that the server has them (deploy_threshold) and embed every file
+when it does not.
+
+Configuration (environment / .env):
+    SYPNEX_LARGE_FILE_THRESHOLD  Size in bytes from which additional files are
+                                 uploaded separately (default 0 = never; the
+                                 server must implement the uploads endpoint)
+    SYPNEX_UPLOAD_CHUNK_SIZE     Chunk size in bytes (default 4 MiB)
+"""
+
+import os
+import sys
+import time
+import hashlib
+import threading
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_cache
+import http_client
+import tracing
+
+# Off by default: only servers that implement /api/user-apps/uploads can take external files
+DEFAULT_THRESHOLD = 0
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Consecutive failed chunks (after the HTTP client's own retries) before giving up
+MAX_RESUMES = 5
+
+# One lock per blob (by _session_key), so concurrent installs never upload the same bytes twice
+_blob_locks = {}
+_blob_locks_lock = threading.Lock()
+
+# server_url -> whether it implements /api/user-apps/uploads (asked once per run)
+_upload_support = {}
+
+
+def large_file_threshold():
+    """Size in bytes from which additional files are uploaded separately, or None to embed everything"""
+    try:
+        threshold = int(os.getenv('SYPNEX_LARGE_FILE_THRESHOLD', DEFAULT_THRESHOLD))
+    except ValueError:
+        threshold = DEFAULT_THRESHOLD
+    return threshold if threshold > 0 else None
+
+
+def server_supports_uploads(server_url, headers):
+    """Whether server_url implements the uploads endpoint
+
+    An empty upload request is rejected as invalid (400) by servers that
+    have the endpoint and with 404/405 by servers that do not. An
+    unreachable server counts as supporting it; the deploy reports that.
+    """
+    if server_url not in _upload_support:
+        try:
+            response = http_client.post(f"{server_url}/api/user-apps/uploads", json={}, headers=headers, retries=0)
+        except http_client.RequestException:
+            return True
+        _upload_support[server_url] = response.status_code not in (404, 405)
+    return _upload_support[server_url]
+
+
+def deploy_threshold(server_url, headers):
+    """large_file_threshold() for deploys to server_url: None if that server cannot take separate uploads"""
+    threshold = large_file_threshold()
+    if threshold is None or server_supports_uploads(server_url, headers):
+        return threshold
+    print(f"⚠️  Warning: {server_url} has no /api/user-apps/uploads endpoint - "
+          f"embedding large files in the package (SYPNEX_LARGE_FILE_THRESHOLD ignored)")
+    return None
+
+
+def upload_chunk_size():
+    try:
+        return max(64 * 1024, int(os.getenv('SYPNEX_UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)))
+    except ValueError:
+        return DEFAULT_CHUNK_SIZE
+
+
+def _session_key(server_url, sha256):
+    return hashlib.sha256(f"{server_url.rstrip('/')}|{sha256}".encode('utf-8')).hexdigest()
+
+
+def _open_session(server_url, headers, sha256, size, filename):
+    """Resume a remembered upload or start a new one; returns the session status dict"""
+    key = _session_key(server_url, sha256)
+    remembered = build_cache.load_entry('uploads', key)
+    if remembered:
+        response = http_client.get(f"{server_url}/api/user-apps/uploads/{remembered['upload_id']}", headers=headers)
+        if response.status_code == 200:
+            return response.json()
+
+    response = http_client.post(
+        f"{server_url}/api/user-apps/uploads",
+        json={'sha256': sha256, 'size': size, 'filename': filename},
+        headers=headers
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"could not start upload ({response.status_code}: {response.text[:200]})")
+    status = response.json()
+    if not status.get('complete'):
+        build_cache.store_entry('uploads', key, {'upload_id': status['upload_id']})
+    return status
+
+
+def _read_chunk(path, offset, length):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def _report_progress(filename, offset, size, start):
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    print(f"📤 {filename}: {offset / (1024 * 1024):.1f}/{size / (1024 * 1024):.1f} MB "
+          f"({100 * offset / size if size else 100:.0f}%, {offset / elapsed / (1024 * 1024):.1f} MB/s)")
+
+
+@tracing.traced('chunked upload')
+def upload_file(server_url, headers, path, sha256, size, filename):
+    """Upload one file in resumable chunks; returns True once the server holds the complete blob"""
+    chunk_size = upload_chunk_size()
+    start = time.perf_counter()
+    try:
+        status = _open_session(server_url, headers, sha256, size, filename)
+    except (http_client.RequestException, RuntimeError) as e:
+        print(f"❌ Could not start upload of {filename}: {e}")
+        return False
+
+    if status.get('complete'):
+        print(f"⏭️  {filename} is already on the server")
+        return True
+
+    upload_url = f"{server_url}/api/user-apps/uploads/{status['upload_id']}"
+    offset = int(status.get('offset', 0))
+    if offset:
+        print(f"↪️  Resuming {filename} at {offset / (1024 * 1024):.1f} MB")
+
+    failures = 0
+    while True:
+        try:
+            if offset >= size:
+                # Every byte is there but the server has not confirmed completion
+                response = http_client.get(upload_url, headers=headers)
+            else:
+                chunk = _read_chunk(path, offset, chunk_size)
+                chunk_headers = dict(headers)
+                chunk_headers['Content-Type'] = 'application/octet-stream'
+                chunk_headers['Content-Range'] = f"bytes {offset}-{offset + len(chunk) - 1}/{size}"
+                with tracing.http_span('PUT', upload_url, offset=offset, bytes_sent=len(chunk)) as span:
+                    response = http_client.request('PUT', upload_url, data=chunk, headers=chunk_headers)
+                    span.set(status=response.status_code)
+            if response.status_code == 404:
+                # Usually the server completed the upload and the reply to the last chunk was lost
+                raise RuntimeError("upload session not found on the server")
+            if response.status_code == 409:
+                # Offset mismatch: continue from wherever the server actually is
+                offset = int(response.json().get('offset', offset))
+                continue
+            if response.status_code == 422:
+                # The assembled bytes do not hash to sha256 (file changed mid-upload?)
+                build_cache.store_entry('uploads', _session_key(server_url, sha256), {})
+                print(f"❌ Upload of {filename} was rejected: {response.json().get('error', 'checksum mismatch')}")
+                return False
+            if response.status_code != 200:
+                raise RuntimeError(f"server returned {response.status_code}: {response.text[:200]}")
+            result = response.json()
+            if not result.get('complete') and offset >= size and int(result.get('offset', offset)) >= size:
+                raise RuntimeError("server has every byte but has not completed the upload")
+        except (http_client.RequestException, RuntimeError, ValueError) as e:
+            failures += 1
+            if failures > MAX_RESUMES:
+                print(f"❌ Upload of {filename} failed at {offset / (1024 * 1024):.1f} MB: {e}")
+                print(f"   Run the deploy again to resume from there")
+                return False
+            delay = http_client.backoff_delay(failures, http_client.client_settings()['backoff'])
+            print(f"🔁 Chunk of {filename} failed ({e}) - resuming in {delay:.1f}s ({failures}/{MAX_RESUMES})")
+            time.sleep(delay)
+            try:
+                # Asks after the remembered session, or by hash once that session is gone
+                status = _open_session(server_url, headers, sha256, size, filename)
+            except (http_client.RequestException, RuntimeError, ValueError):
+                continue
+            if status.get('complete'):
+                build_cache.store_entry('uploads', _session_key(server_url, sha256), {})
+                _report_progress(filename, size, size, start)
+                return True
+            upload_url = f"{server_url}/api/user-apps/uploads/{status['upload_id']}"
+            offset = int(status.get('offset', offset))
+            continue
+
+        failures = 0
+        offset = int(result.get('offset', offset))
+        if result.get('complete'):
+            build_cache.store_entry('uploads', _session_key(server_url, sha256), {})
+            _report_progress(filename, size, size, start)
+            return True
+        _report_progress(filename, offset, size, start)
+
+
+def external_files_for(reader, source_dir):
+    """External additional files of a package on disk, with their source paths resolved under source_dir/src"""
+    sources = {
+        entry.get('vfs_path'): entry.get('source_file')
+        for entry in reader.app_metadata.get('additional_files', []) + reader.package_info.get('shared_libraries', [])
+    }
+    # Optimized assets (see asset_optimize) are uploaded from the cached copy the package was built from
+    optimized = {entry['vfs_path'] for entry in reader.package_info.get('optimized_assets', [])}
+    files = []
+    for entry in reader.additional_files:
+        if entry.get('external'):
+            if entry['vfs_path'] in optimized:
+                import asset_optimize
+                path = str(asset_optimize.asset_path(entry['sha256']))
+            else:
+                path = os.path.join(source_dir, 'src', sources[entry['vfs_path']])
+            files.append(dict(entry, path=path))
+    return files
+
+
+def _blob_lock(key):
+    with _blob_locks_lock:
+        return _blob_locks.setdefault(key, threading.Lock())
+
+
+def upload_external_files(server_url, headers, files):
+    """Upload each external additional file (dicts with path, sha256, size, filename); True if all succeed
+
+    Installs running in parallel that reference the same blob (a shared
+    library used by several apps) take turns: the first uploads it, and the
+    others find it complete on the server without sending it again.
+    """
+    for entry in files:
+        with _blob_lock(_session_key(server_url, entry['sha256'])):
+            print(f"📤 Uploading {entry['filename']} ({entry['size'] / (1024 * 1024):.1f} MB) in resumable chunks...")
+            if not upload_file(server_url, headers, entry['path'], entry['sha256'], entry['size'], entry['filename']):
+                return False
+    return True
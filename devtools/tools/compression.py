@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Compression Module - Optional gzip/zstd compression for packages and uploads
+
+Packaged output can be compressed at rest (recorded in package_info) and
+request bodies sent to the server can be compressed on the wire with a
+matching Content-Encoding header.
+
+Configuration (environment / .env):
+    SYPNEX_COMPRESSION         gzip, zstd or none (default: none)
+    SYPNEX_COMPRESSION_LEVEL   Compression level (default: 6 for gzip, 3 for zstd)
+
+zstd support requires the optional 'zstandard' package.
+"""
+
+import os
+import time
+import zlib
+
+ALGORITHMS = ('gzip', 'zstd')
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 3}
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+_zstandard = False
+
+
+def _zstd():
+    """The zstandard module, or None if it is not installed (imported on first use)"""
+    global _zstandard
+    if _zstandard is False:
+        try:
+            import zstandard
+            _zstandard = zstandard
+        except ImportError:
+            _zstandard = None
+    return _zstandard
+
+
+def resolve_compression(algorithm=None, level=None):
+    """Resolve (algorithm, level) from arguments or SYPNEX_COMPRESSION settings
+
+    Returns (None, None) when compression is disabled. Pass algorithm='none'
+    to disable compression regardless of the environment.
+    """
+    algorithm = (algorithm or os.getenv('SYPNEX_COMPRESSION', 'none')).strip().lower()
+    if algorithm in ('', 'none', 'off', '0'):
+        return None, None
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported compression '{algorithm}' (supported: {', '.join(ALGORITHMS)})")
+    if algorithm == 'zstd' and _zstd() is None:
+        raise ValueError("zstd compression requires the 'zstandard' package: pip install zstandard")
+
+    if level is None:
+        level = os.getenv('SYPNEX_COMPRESSION_LEVEL')
+    level = int(level) if level not in (None, '') else DEFAULT_LEVELS[algorithm]
+    return algorithm, level
+
+
+def _compressor(algorithm, level):
+    if algorithm == 'gzip':
+        # wbits=31 writes a gzip header/trailer
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+    return _zstd().ZstdCompressor(level=level).compressobj()
+
+
+def detect_compression(head):
+    """Detect gzip/zstd from the leading bytes of a file or stream"""
+    if head.startswith(_GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(_ZSTD_MAGIC):
+        return 'zstd'
+    return None
+
+
+def open_decompressed(path):
+    """Open a file for binary reading, transparently decompressing gzip/zstd"""
+    with open(path, 'rb') as f:
+        algorithm = detect_compression(f.read(4))
+    if algorithm == 'gzip':
+        import gzip
+        return gzip.open(path, 'rb')
+    if algorithm == 'zstd':
+        if _zstd() is None:
+            raise ValueError("Package is zstd-compressed; install the 'zstandard' package to read it")
+        return _zstd().ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+class CompressionStats:
+    """Byte counts and time spent compressing one stream"""
+
+    def __init__(self, algorithm=None, level=None):
+        self.algorithm = algorithm
+        self.level = level
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def ratio(self):
+        return self.compressed_bytes / self.raw_bytes if self.raw_bytes else 1.0
+
+    def report(self, label):
+        """Print a one-line summary of the compression result"""
+        if not self.algorithm:
+            return
+        saved = 100 * (1 - self.ratio)
+        print(
+            f"🗜️  {label}: {self.raw_bytes / 1024:.1f} KB → {self.compressed_bytes / 1024:.1f} KB "
+            f"({self.algorithm} level {self.level}, ratio {self.ratio:.2f}, {saved:.0f}% saved, {self.seconds * 1000:.0f} ms)"
+        )
+
+
+def compress_chunks(chunks, algorithm, level, stats=None):
+    """Compress an iterable of byte chunks into a stream of compressed chunks"""
+    stats = stats if stats is not None else CompressionStats(algorithm, level)
+    compressor = _compressor(algorithm, level)
+    for chunk in chunks:
+        stats.raw_bytes += len(chunk)
+        start = time.perf_counter()
+        data = compressor.compress(chunk)
+        stats.seconds += time.perf_counter() - start
+        if data:
+            stats.compressed_bytes += len(data)
+            yield data
+    start = time.perf_counter()
+    data = compressor.flush()
+    stats.seconds += time.perf_counter() - start
+    if data:
+        stats.compressed_bytes += len(data)
+        yield data
+
+
+def compress_bytes(data, algorithm, level, stats=None):
+    """Compress a single bytes payload"""
+    return b''.join(compress_chunks([data], algorithm, level, stats))
+
+
+def decompress_bytes(data, algorithm):
+    """Decompress a single gzip/zstd payload (e.g. a request body sent with Content-Encoding)"""
+    if algorithm == 'gzip':
+        # wbits=47 accepts a gzip or zlib header
+        return zlib.decompress(data, 47)
+    if algorithm == 'zstd':
+        if _zstd() is None:
+            raise ValueError("zstd decompression requires the 'zstandard' package: pip install zstandard")
+        return _zstd().ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Unsupported compression '{algorithm}' (supported: {', '.join(ALGORITHMS)})")
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+CSS Scope Module - Scope an app's styles to its root element
+
+A single-pass tokenizer prefixes every selector with [data-appid="<id>"],
+including rules nested in @media/@supports/@container/@layer, and renames
+@keyframes to <id>-<name> together with the animation and animation-name
+references to them. A lightweight html.parser pass finds the fragment's
+<style> blocks and root elements. The source text is edited in place, so no
+DOM or CSSOM is built and everything else passes through untouched.
+"""
+
+import re
+from html.parser import HTMLParser
+
+# At-rules whose blocks hold nested rules that must be scoped too
+GROUPING_AT_RULES = {'media', 'supports', 'container', 'layer', 'document', '-moz-document', 'scope'}
+
+# Selectors that address the document root and map to the app container
+ROOT_SELECTORS = {'html', 'body', ':root'}
+
+ANIMATION_PROPERTIES = {
+    prefix + name
+    for prefix in ('', '-webkit-', '-moz-', '-o-')
+    for name in ('animation', 'animation-name')
+}
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+# Comments, strings, block delimiters and runs of everything else
+_TOKEN_RE = re.compile(
+    r"""/\*.*?(?:\*/|\Z)|"(?:[^"\\\n]|\\.)*"?|'(?:[^'\\\n]|\\.)*'?|[{};]|[^{};/"']+|/""",
+    re.S
+)
+# An identifier; escapes like "\31 " (hex digits and one optional space) are part of it
+_ESCAPE = r'\\(?:[0-9a-fA-F]{1,6}[ \t]?|[^0-9a-fA-F\n])'
+_IDENT = rf'-?(?:[_a-zA-Z]|{_ESCAPE})(?:[\w-]|{_ESCAPE})*'
+_KEYFRAMES_RE = re.compile(rf'@(?:-[a-z]+-)?keyframes\s+({_IDENT})', re.I)
+# Parenthesised groups, comments, strings and numbers are skipped; group 1 is an identifier
+_VALUE_TOKEN_RE = re.compile(
+    rf"""\([^()]*\)|/\*.*?\*/|"[^"]*"|'[^']*'|[\d.]+[\w%]*|({_IDENT})""",
+    re.S
+)
+_DECLARATION_RE = re.compile(r'(\s*)([-\w]+)(\s*:)(.*)', re.S)
+
+
+def _is_comment(token):
+    return token.startswith('/*')
+
+
+def escape_ident(name):
+    """Escape a leading digit so name is a valid CSS identifier"""
+    if name[:1].isdigit():
+        return f"\\3{name[0]} {name[1:]}"
+    if name[:1] == '-' and name[1:2].isdigit():
+        return f"-\\3{name[1]} {name[2:]}"
+    return name
+
+
+def find_keyframes(css):
+    """Names of all @keyframes rules defined in css"""
+    text = ''.join(t for t in _TOKEN_RE.findall(css) if not _is_comment(t))
+    return {m.group(1) for m in _KEYFRAMES_RE.finditer(text)}
+
+
+def keyframes_map(names, appid):
+    """Map keyframes names to their app-scoped names"""
+    return {name: escape_ident(f"{appid}-{name}") for name in names}
+
+
+def split_selectors(selector):
+    """Split a selector list on top-level commas (ignoring those in parentheses, brackets and strings)"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    i = 0
+    while i < len(selector):
+        char = selector[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth = max(0, depth - 1)
+        elif char == ',' and depth == 0:
+            parts.append(selector[start:i])
+            start = i + 1
+        i += 1
+    parts.append(selector[start:])
+    return parts
+
+
+def scope_selector(selector, prefix):
+    """Prefix every selector in a selector list; root selectors become the prefix itself"""
+    scoped = []
+    for part in split_selectors(selector):
+        part = part.strip()
+        if not part:
+            continue
+        if part.lower() in ROOT_SELECTORS:
+            scoped.append(prefix)
+        else:
+            scoped.append(f"{prefix} {part}")
+    return ', '.join(scoped)
+
+
+class _CSSScoper:
+    """Rewrites one stylesheet in a single pass over its tokens"""
+
+    def __init__(self, css, prefix, keyframes):
+        self._tokens = _TOKEN_RE.findall(css)
+        self._pos = 0
+        self._prefix = prefix
+        self._keyframes = keyframes
+
+    def run(self):
+        out = []
+        self._rule_list(out, nested=False)
+        return ''.join(out)
+
+    def _next(self):
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def _rule_list(self, out, nested):
+        """Process rules until the end of input or, when nested, the closing brace"""
+        prelude = []
+        while self._pos < len(self._tokens):
+            token = self._next()
+            if token == '{':
+                self._rule(prelude, out)
+                prelude = []
+            elif token == ';':
+                out.append(''.join(prelude) + ';')
+                prelude = []
+            elif token == '}':
+                out.append(''.join(prelude))
+                if nested:
+                    out.append('}')
+                    return
+                out.append('}')
+                prelude = []
+            else:
+                prelude.append(token)
+        out.append(''.join(prelude))
+
+    def _rule(self, prelude, out):
+        # Keep leading whitespace and comments where they are
+        index = 0
+        while index < len(prelude) and (_is_comment(prelude[index]) or not prelude[index].strip()):
+            index += 1
+        head = ''.join(t for t in prelude[index:] if not _is_comment(t))
+        stripped = head.strip()
+        leading = ''.join(prelude[:index]) + head[:len(head) - len(head.lstrip())]
+        trailing = head[len(head.rstrip()):]
+        out.append(leading)
+
+        if stripped.startswith('@'):
+            match = re.match(r'@([-\w]+)', stripped)
+            name = match.group(1).lower() if match else ''
+            if name.endswith('keyframes'):
+                out.append(self._rename_keyframes_prelude(stripped) + trailing + '{')
+                out.append(self._raw_block())
+            elif name in GROUPING_AT_RULES:
+                out.append(stripped + trailing + '{')
+                self._rule_list(out, nested=True)
+                return
+            else:
+                # @font-face, @page, @property, ... hold declarations, not selectors
+                out.append(stripped + trailing + '{')
+                out.append(self._raw_block())
+        else:
+            out.append(scope_selector(stripped, self._prefix) + trailing + '{')
+            out.append(self._declarations())
+        out.append('}')
+
+    def _rename_keyframes_prelude(self, prelude):
+        match = re.match(r'(@[-\w]+\s+)(\S+)(.*)', prelude, re.S)
+        if not match or match.group(2) not in self._keyframes:
+            return prelude
+        return match.group(1) + self._keyframes[match.group(2)] + match.group(3)
+
+    def _raw_block(self):
+        """Consume a block verbatim up to (not including) its closing brace"""
+        out = []
+        depth = 0
+        while self._pos < len(self._tokens):
+            token = self._next()
+            if token == '}':
+                if depth == 0:
+                    break
+                depth -= 1
+            elif token == '{':
+                depth += 1
+            out.append(token)
+        return ''.join(out)
+
+    def _declarations(self):
+        """Consume a declaration block, renaming keyframes referenced by animation properties"""
+        out = []
+        declaration = []
+        depth = 0
+        while self._pos < len(self._tokens):
+            token = self._next()
+            if token in '{};':
+                out.append(self._rename_animation(''.join(declaration)))
+                declaration = []
+                if token == '}':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif token == '{':
+                    depth += 1
+                out.append(token)
+            else:
+                declaration.append(token)
+        else:
+            out.append(self._rename_animation(''.join(declaration)))
+        return ''.join(out)
+
+    def _rename_animation(self, declaration):
+        if not self._keyframes:
+            return declaration
+        match = _DECLARATION_RE.match(declaration)
+        if not match or match.group(2).lower() not in ANIMATION_PROPERTIES:
+            return declaration
+
+        def rename(token):
+            name = token.group(1)
+            if name is None:
+                return token.group(0)
+            return self._keyframes.get(name, name)
+
+        return match.group(1) + match.group(2) + match.group(3) + _VALUE_TOKEN_RE.sub(rename, match.group(4))
+
+
+def scope_css(css, appid, keyframes=None):
+    """Scope a stylesheet to [data-appid="<appid>"]
+
+    Args:
+        css: Stylesheet text
+        appid: App ID used for the attribute selector and keyframes prefix
+        keyframes: Optional map of keyframes name -> scoped name shared by
+            several stylesheets (default: built from this stylesheet)
+    """
+    if keyframes is None:
+        keyframes = keyframes_map(find_keyframes(css), appid)
+    return _CSSScoper(css, f'[data-appid="{appid}"]', keyframes).run()
+
+
+class _FragmentScanner(HTMLParser):
+    """Record the spans of <style> elements and top-level elements in an HTML fragment"""
+
+    def __init__(self, html):
+        super().__init__(convert_charrefs=False)
+        self._html = html
+        self._line_offsets = [0]
+        for match in re.finditer('\n', html):
+            self._line_offsets.append(match.end())
+        self._stack = []
+        self.styles = []  # (start, content_start, content_end, end)
+        self.roots = []   # (start, start_tag_end, end)
+
+    def _offset(self):
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def _close(self, tag, start, start_tag_end, content_end, end):
+        if tag == 'style':
+            self.styles.append((start, start_tag_end, content_end, end))
+        elif not self._stack and tag != 'script':
+            self.roots.append((start, start_tag_end, end))
+
+    def handle_starttag(self, tag, attrs):
+        start = self._offset()
+        start_tag_end = start + len(self.get_starttag_text())
+        if tag in VOID_ELEMENTS:
+            self._close(tag, start, start_tag_end, start_tag_end, start_tag_end)
+        else:
+            self._stack.append((tag, start, start_tag_end))
+
+    def handle_startendtag(self, tag, attrs):
+        start = self._offset()
+        start_tag_end = start + len(self.get_starttag_text())
+        self._close(tag, start, start_tag_end, start_tag_end, start_tag_end)
+
+    def handle_endtag(self, tag):
+        start = self._offset()
+        end = self._html.find('>', start) + 1 or len(self._html)
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        # Elements left open inside this one end where it ends
+        while self._stack:
+            open_tag, open_start, open_tag_end = self._stack.pop()
+            if open_tag == tag:
+                self._close(open_tag, open_start, open_tag_end, start, end)
+                return
+            self._close(open_tag, open_start, open_tag_end, start, start)
+
+    def finish(self):
+        self.close()
+        while self._stack:
+            tag, start, start_tag_end = self._stack.pop()
+            self._close(tag, start, start_tag_end, len(self._html), len(self._html))
+
+
+def _tag_root(start_tag, appid):
+    """Set data-appid on a start tag, replacing any existing value"""
+    attribute = f'data-appid="{appid}"'
+    existing = re.compile(r'''(\sdata-appid\s*=\s*)("[^"]*"|'[^']*'|[^\s>]+)''', re.I)
+    if existing.search(start_tag):
+        return existing.sub(lambda m: ' ' + attribute, start_tag, count=1)
+    close = len(start_tag) - (2 if start_tag.endswith('/>') else 1)
+    return start_tag[:close].rstrip() + ' ' + attribute + start_tag[close:]
+
+
+def scope_app_styles(payload, appid):
+    """Scope an app's HTML fragment: rewrite its styles and tag its root element
+
+    All non-empty <style> blocks are scoped and merged into a single <style>
+    at the top. A single root element gets data-appid; multiple roots are
+    wrapped in a <div data-appid="...">. Returns "" if the fragment cannot
+    be processed.
+    """
+    if not payload or not appid:
+        return payload
+
+    try:
+        scanner = _FragmentScanner(payload)
+        scanner.feed(payload)
+        scanner.finish()
+
+        styles = [span for span in scanner.styles if payload[span[1]:span[2]].strip()]
+        sheets = [payload[content_start:content_end] for _, content_start, content_end, _ in styles]
+        keyframes = keyframes_map(set().union(*map(find_keyframes, sheets)), appid)
+        scoped_css = [scope_css(sheet, appid, keyframes) for sheet in sheets]
+        removed = [(start, end) for start, _, _, end in styles]
+
+        def cut(start, end, edits=()):
+            """payload[start:end] with style blocks removed and (offset, old_end, text) edits applied"""
+            spans = sorted(
+                [(s, e, '') for s, e in removed if start <= s and e <= end] + list(edits)
+            )
+            pieces = []
+            position = start
+            for span_start, span_end, text in spans:
+                if span_start < position:
+                    # Nested inside a span that was already replaced
+                    continue
+                pieces.append(payload[position:span_start])
+                pieces.append(text)
+                position = span_end
+            pieces.append(payload[position:end])
+            return ''.join(pieces)
+
+        roots = [root for root in scanner.roots if not any(s <= root[0] < e for s, e in removed)]
+        if len(roots) == 1:
+            start, start_tag_end, _ = roots[0]
+            tagged = _tag_root(payload[start:start_tag_end], appid)
+            body = cut(0, len(payload), [(start, start_tag_end, tagged)])
+        elif len(roots) > 1:
+            wrapped = ''.join(cut(start, end) for start, _, end in roots)
+            rest = cut(0, len(payload), [(start, end, '') for start, _, end in roots])
+            body = f'<div data-appid="{appid}">{wrapped}</div>{rest}'
+        else:
+            body = cut(0, len(payload))
+
+        if scoped_css:
+            return '<style type="text/css">' + '\n\n'.join(scoped_css) + '</style>' + body
+        return body
+
+    except Exception as e:
+        print(f"Failed to process app styles for appid {appid}: {e}")
+        return ""
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Daemon Module - Opt-in background process that keeps the toolchain warm
+
+`sypnex.py daemon start` runs one long-lived process listening on a Unix
+socket. It has the packer, the deploy modules and the minifiers already
+imported, keeps its pooled HTTP connections to the server open between
+commands and holds the content-addressed build cache entries in memory.
+
+While a daemon is running, `pack` and `deploy` commands are forwarded to it by
+the CLI: the client sends its arguments, working directory and SYPNEX_*
+environment, and the daemon runs the command and streams the output and exit
+status back. Without a daemon (or with SYPNEX_DAEMON=0) the CLI runs commands
+in-process as before.
+
+Commands run one at a time. The daemon exits after SYPNEX_DAEMON_IDLE_TIMEOUT
+seconds without a request, and when the devtools sources change under it (the
+command is then run in-process and the next `daemon start` picks up the new
+code).
+
+Protocol: one JSON object per line. The client sends {"command": "run" |
+"status" | "stop", ...}; a run is answered with {"out": text} and
+{"err": text} messages and a final {"exit": code}.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import contextlib
+from pathlib import Path
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_IDLE_TIMEOUT = 600
+DEFAULT_MEMORY_CACHE_MB = 256
+START_TIMEOUT = 15.0
+
+DEVTOOLS_DIR = Path(__file__).resolve().parent.parent
+
+# Environment variables the client sends with each command
+_FORWARDED_ENV = ('SOURCE_DATE_EPOCH',)
+
+
+def supported():
+    """Whether this platform has Unix domain sockets"""
+    return hasattr(socket, 'AF_UNIX')
+
+
+def socket_path():
+    """Socket the daemon listens on (SYPNEX_DAEMON_SOCKET, default ~/.sypnex/daemon.sock)"""
+    path = os.getenv('SYPNEX_DAEMON_SOCKET')
+    if path:
+        return str(Path(path).expanduser())
+    return str(Path.home() / '.sypnex' / 'daemon.sock')
+
+
+def idle_timeout():
+    """Seconds without a request before the daemon exits"""
+    try:
+        return float(os.getenv('SYPNEX_DAEMON_IDLE_TIMEOUT', DEFAULT_IDLE_TIMEOUT))
+    except ValueError:
+        return float(DEFAULT_IDLE_TIMEOUT)
+
+
+def enabled():
+    """Whether the CLI should forward commands to a running daemon (SYPNEX_DAEMON, default on)"""
+    return supported() and os.getenv('SYPNEX_DAEMON', '1').strip().lower() not in ('0', 'false', 'off', 'no')
+
+
+def _is_forwarded_env(name):
+    return name.startswith('SYPNEX_') or name in _FORWARDED_ENV
+
+
+def _code_stamp():
+    """Newest modification time of the devtools sources the daemon has loaded"""
+    newest = 0
+    for directory in (DEVTOOLS_DIR, DEVTOOLS_DIR / 'tools', DEVTOOLS_DIR / 'config'):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.py'):
+                        newest = max(newest, entry.stat().st_mtime_ns)
+        except OSError:
+            pass
+    return newest
+
+
+def _send(connection, message):
+    connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def _connect():
+    """Connected socket to the running daemon, or None if there is none"""
+    path = socket_path()
+    if not supported() or not os.path.exists(path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+        return connection
+    except OSError:
+        connection.close()
+        return None
+
+
+def _request(message):
+    """Send a control message and return the daemon's single reply, or None if no daemon answers"""
+    connection = _connect()
+    if connection is None:
+        return None
+    with connection, connection.makefile('r', encoding='utf-8') as reader:
+        try:
+            _send(connection, message)
+            line = reader.readline()
+            return json.loads(line) if line else None
+        except (OSError, ValueError):
+            return None
+
+
+def status():
+    """Status dict of the running daemon, or None"""
+    return _request({'command': 'status'})
+
+
+def stop():
+    """Ask the running daemon to exit; returns True if one was running"""
+    return _request({'command': 'stop'}) is not None
+
+
+def forward(argv):
+    """Run a CLI command in the daemon, streaming its output
+
+    Returns the command's exit code, or None if no daemon took the command
+    and it should run in-process.
+    """
+    connection = _connect()
+    if connection is None:
+        return None
+    env = {name: value for name, value in os.environ.items() if _is_forwarded_env(name)}
+    with connection, connection.makefile('r', encoding='utf-8') as reader:
+        try:
+            _send(connection, {'command': 'run', 'argv': list(argv), 'cwd': os.getcwd(), 'env': env})
+            for line in reader:
+                message = json.loads(line)
+                if 'out' in message:
+                    sys.stdout.write(message['out'])
+                    sys.stdout.flush()
+                elif 'err' in message:
+                    sys.stderr.write(message['err'])
+                    sys.stderr.flush()
+                elif 'exit' in message:
+                    return message['exit']
+                elif message.get('stale'):
+                    # The daemon is running old code and is exiting; run this one here
+                    return None
+        except (OSError, ValueError) as e:
+            print(f"❌ Lost connection to the daemon: {e}", file=sys.stderr)
+            return 1
+    print("❌ The daemon exited before the command finished", file=sys.stderr)
+    return 1
+
+
+def start(timeout=None):
+    """Start a daemon in the background and wait until it answers; returns True on success"""
+    if not supported():
+        print("❌ The daemon needs Unix domain sockets, which this platform does not have")
+        return False
+    running = status()
+    if running:
+        print(f"✅ Daemon already running (pid {running['pid']}) on {running['socket']}")
+        return True
+
+    import subprocess
+    path = socket_path()
+    log_path = os.path.splitext(path)[0] + '.log'
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    command = [sys.executable, str(DEVTOOLS_DIR / 'sypnex.py'), 'daemon', 'run']
+    if timeout is not None:
+        command += ['--idle-timeout', str(timeout)]
+    with open(log_path, 'a', encoding='utf-8') as log:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                                   cwd=str(DEVTOOLS_DIR), start_new_session=True)
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        running = status()
+        if running:
+            print(f"✅ Daemon started (pid {running['pid']}) on {running['socket']}")
+            print(f"   Exits after {running['idle_timeout']:.0f}s idle; log: {log_path}")
+            return True
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    print(f"❌ Daemon did not start; see {log_path}")
+    return False
+
+
+class _StreamWriter:
+    """File-like object that sends everything written to it to the client"""
+
+    encoding = 'utf-8'
+
+    def __init__(self, connection, stream):
+        self.connection = connection
+        self.stream = stream
+        self.closed = False
+
+    def write(self, text):
+        if text and not self.closed:
+            try:
+                _send(self.connection, {self.stream: text})
+            except OSError:
+                # The client went away (e.g. Ctrl+C); finish the command quietly
+                self.closed = True
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+def _exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def warm_up():
+    """Import everything forwarded commands need and open the HTTP pool for the default server"""
+    import importlib
+    for name in ('tools.pack_app', 'tools.pack_all', 'tools.dev_deploy', 'tools.deploy_all', 'tools.vfs_deploy'):
+        importlib.import_module(name)
+    import pack_app
+    import http_client
+    minifiers = pack_app.load_minifiers()
+    http_client.get_session(os.getenv('SYPNEX_SERVER_URL', 'http://localhost:5000'))
+    return minifiers
+
+
+class Daemon:
+    """Accepts one connection at a time and runs CLI commands in this process"""
+
+    def __init__(self, run_cli, timeout):
+        self.run_cli = run_cli
+        self.timeout = timeout
+        self.path = socket_path()
+        self.started = time.time()
+        self.code_stamp = _code_stamp()
+        self.requests = 0
+        self.running = True
+
+    def status(self):
+        import build_cache
+        return {
+            'pid': os.getpid(),
+            'socket': self.path,
+            'uptime': round(time.time() - self.started, 1),
+            'requests': self.requests,
+            'idle_timeout': self.timeout,
+            'memory_cache': build_cache.memory_cache_stats()
+        }
+
+    def run_command(self, connection, request):
+        """Run one CLI command with the client's directory and environment"""
+        argv = request.get('argv') or []
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        start = time.perf_counter()
+        code = 0
+        try:
+            for name in [name for name in os.environ if _is_forwarded_env(name)]:
+                del os.environ[name]
+            os.environ.update(request.get('env') or {})
+            os.chdir(request.get('cwd') or saved_cwd)
+            out = _StreamWriter(connection, 'out')
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(_StreamWriter(connection, 'err')):
+                try:
+                    self.run_cli(argv, use_daemon=False)
+                except SystemExit as e:
+                    code = _exit_code(e.code)
+                except Exception:
+                    import traceback
+                    traceback.print_exc()
+                    code = 1
+        finally:
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+        self.requests += 1
+        print(f"▶️  {' '.join(argv)} (exit {code}, {time.perf_counter() - start:.3f}s)", flush=True)
+        if not out.closed:
+            _send(connection, {'exit': code})
+
+    def handle(self, connection):
+        with connection.makefile('r', encoding='utf-8') as reader:
+            line = reader.readline()
+        if not line:
+            return
+        request = json.loads(line)
+        command = request.get('command')
+        if command == 'status':
+            _send(connection, self.status())
+        elif command == 'stop':
+            self.running = False
+            _send(connection, {'stopping': True})
+        elif command == 'run':
+            if _code_stamp() != self.code_stamp:
+                print("🔄 Devtools sources changed - exiting so the next start loads them", flush=True)
+                self.running = False
+                _send(connection, {'stale': True})
+                return
+            self.run_command(connection, request)
+        else:
+            _send(connection, {'error': f"unknown command {command!r}"})
+
+    def bind(self):
+        """Listening socket, or None if another daemon already owns the path"""
+        if _connect() is not None:
+            return None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)  # left behind by a daemon that was killed
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        server.listen()
+        server.settimeout(self.timeout)
+        return server
+
+    def serve(self):
+        server = self.bind()
+        if server is None:
+            print(f"❌ A daemon is already listening on {self.path}")
+            return False
+        identity = os.stat(self.path).st_ino
+        print(f"🛰️  Daemon listening on {self.path} (pid {os.getpid()}, exits after {self.timeout:.0f}s idle)", flush=True)
+        try:
+            while self.running:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    print(f"💤 Idle for {self.timeout:.0f}s - exiting", flush=True)
+                    break
+                with connection:
+                    connection.settimeout(None)
+                    try:
+                        self.handle(connection)
+                    except (OSError, ValueError) as e:
+                        print(f"⚠️  Warning: Dropped a request: {e}", flush=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            # Only remove the socket if a newer daemon has not replaced it
+            with contextlib.suppress(OSError):
+                if os.stat(self.path).st_ino == identity:
+                    os.remove(self.path)
+        print(f"👋 Daemon stopped after {self.requests} commands", flush=True)
+        return True
+
+
+def run_daemon(run_cli, timeout=None):
+    """Warm up and serve commands in the foreground until idle, stopped or interrupted
+
+    Args:
+        run_cli: Callable taking (argv, use_daemon=False) that runs one CLI command
+        timeout: Idle timeout in seconds (default: SYPNEX_DAEMON_IDLE_TIMEOUT)
+    """
+    if not supported():
+        print("❌ The daemon needs Unix domain sockets, which this platform does not have")
+        return False
+    import signal
+    import build_cache
+    # SIGTERM (e.g. from kill) exits through the cleanup in serve()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    start = time.perf_counter()
+    minifiers = warm_up()
+    try:
+        cache_mb = float(os.getenv('SYPNEX_DAEMON_CACHE_MB', DEFAULT_MEMORY_CACHE_MB))
+    except ValueError:
+        cache_mb = DEFAULT_MEMORY_CACHE_MB
+    build_cache.enable_memory_cache(int(cache_mb * 1024 * 1024))
+    loaded = ', '.join(kind for kind, available in minifiers.items() if available) or 'none'
+    print(f"🔥 Warmed up in {time.perf_counter() - start:.2f}s (minifiers: {loaded}; memory cache: {cache_mb:.0f} MB)", flush=True)
+    return Daemon(run_cli, idle_timeout() if timeout is None else timeout).serve()
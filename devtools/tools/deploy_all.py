@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Deploy All Module - Pack and install every app under a directory in parallel
+
+Apps are packed on a process pool, installed to /api/user-apps/install with a
+bounded number of concurrent uploads, and /api/user-apps/refresh is called
+once at the end. Apps unchanged since their last deploy to the same server
+are skipped (see deploy_state).
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# Add current directory to path for sibling module imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+from pack_app import pack_app, prevalidate_apps, discover_apps
+from dev_deploy import deploy_changes, refresh_user_apps, get_auth_headers
+from package_writer import PackageFile
+from package_reader import open_package
+import deploy_state
+import chunked_upload
+import tracing
+import http_client
+
+
+def _pack_worker(app_id, app_dir, output_dir, external_threshold):
+    """Pack one app in a worker process, capturing its output and trace spans"""
+    output_file = os.path.join(output_dir, f"{app_id}_packaged.app")
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log), tracing.span('pack worker', app_id=app_id):
+            # Compression is applied on the wire by install_package instead, and
+            # large additional files are uploaded separately in resumable chunks
+            success = pack_app(app_dir, output_file, compression='none', external_threshold=external_threshold)
+    except Exception as e:
+        log.write(f"❌ Error packing app: {e}\n")
+        success = False
+    return success, time.perf_counter() - start, output_file, log.getvalue(), tracing.drain()
+
+
+def _install_worker(app_id, package_file, app_dir, server_url, force=False):
+    """Install one packaged app if it changed, returning (success, action, seconds)"""
+    start = time.perf_counter()
+    with tracing.span('install', app_id=app_id), open_package(package_file) as contents:
+        external_files = chunked_upload.external_files_for(contents, app_dir)
+        success, action = deploy_changes(app_id, PackageFile(package_file, app_id), server_url, force, contents,
+                                          external_files)
+    return success, action, time.perf_counter() - start
+
+
+def print_summary(results):
+    """Print a per-app summary table"""
+    name_width = max([len('App')] + [len(r['name']) for r in results])
+    print(f"\n📊 Summary:")
+    print(f"   {'App':<{name_width}}  {'Status':<10}  {'Pack':>8}  {'Install':>8}  {'Size':>10}")
+    print(f"   {'-' * name_width}  {'-' * 10}  {'-' * 8}  {'-' * 8}  {'-' * 10}")
+    for r in results:
+        pack_time = f"{r['pack_time']:.2f}s" if r['pack_time'] is not None else '-'
+        install_time = f"{r['install_time']:.2f}s" if r['install_time'] is not None else '-'
+        size = f"{r['size'] / 1024:.1f} KB" if r['size'] is not None else '-'
+        print(f"   {r['name']:<{name_width}}  {r['status']:<10}  {pack_time:>8}  {install_time:>8}  {size:>10}")
+
+
+@tracing.traced()
+def deploy_all(root_dir, server_url="http://127.0.0.1:5000", jobs=None, concurrency=4, force=False):
+    """Pack every app under root_dir in parallel and install them with bounded concurrency
+
+    Args:
+        root_dir: Directory to search for apps
+        server_url: Target Sypnex OS server
+        jobs: Number of pack worker processes (default: CPU count)
+        concurrency: Maximum number of simultaneous install uploads
+        force: Reinstall every app even if it is unchanged since its last deploy
+
+    Returns:
+        True if every app was packed and installed successfully
+    """
+    apps = discover_apps(root_dir)
+    if not apps:
+        print(f"❌ Error: No apps found under {root_dir}")
+        return False
+
+    jobs = jobs or os.cpu_count() or 1
+    concurrency = max(1, concurrency)
+    print(f"🚀 Deploy All: {len(apps)} apps from {root_dir}")
+    print(f"🌐 Server: {server_url}")
+    print(f"⚙️  Pack workers: {jobs}, install concurrency: {concurrency}")
+
+    # Validate all apps in one batched request; the packers then hit the cache
+    print(f"\n🔍 Validating {len(apps)} apps...")
+    app_dirs = {app_id: app_dir for app_id, _, app_dir in apps}
+    validation = prevalidate_apps(app_dirs)
+
+    results = {
+        app_id: {'name': name, 'status': 'pending', 'pack_time': None, 'install_time': None, 'size': None}
+        for app_id, name, _ in apps
+    }
+    for app_id, result in validation.items():
+        if result is False:
+            results[app_id]['status'] = 'invalid'
+
+    # Asked once here: every worker packs for the same server
+    external_threshold = chunked_upload.deploy_threshold(server_url, get_auth_headers())
+
+    output_dir = tempfile.mkdtemp(prefix='sypnex-deploy-')
+    total_start = time.perf_counter()
+    try:
+        print(f"\n📦 Packing and installing...")
+        with ProcessPoolExecutor(max_workers=jobs) as pack_pool, \
+                ThreadPoolExecutor(max_workers=concurrency) as install_pool:
+            pack_futures = {
+                pack_pool.submit(_pack_worker, app_id, app_dir, output_dir, external_threshold): app_id
+                for app_id, _, app_dir in apps
+                if results[app_id]['status'] == 'pending'
+            }
+
+            # Start each install as soon as its pack finishes
+            install_futures = {}
+            for future in as_completed(pack_futures):
+                app_id = pack_futures[future]
+                result = results[app_id]
+                try:
+                    success, pack_time, package_file, log, events = future.result()
+                    tracing.extend(events)
+                except Exception as e:
+                    success, pack_time, package_file, log = False, None, None, f"❌ Worker error: {e}\n"
+                result['pack_time'] = pack_time
+                if not success:
+                    result['status'] = 'pack failed'
+                    print(f"❌ Failed to pack {result['name']}:")
+                    print(log.rstrip())
+                    continue
+                result['size'] = os.path.getsize(package_file)
+                print(f"✅ Packed {result['name']} in {pack_time:.2f}s")
+                install_futures[install_pool.submit(_install_worker, app_id, package_file, app_dirs[app_id], server_url, force)] = app_id
+
+            for future in as_completed(install_futures):
+                app_id = install_futures[future]
+                result = results[app_id]
+                try:
+                    success, action, install_time = future.result()
+                except Exception as e:
+                    print(f"❌ Error installing {result['name']}: {e}")
+                    success, action, install_time = False, None, None
+                result['install_time'] = install_time
+                if not success:
+                    result['status'] = 'install failed'
+                else:
+                    result['status'] = {
+                        deploy_state.UNCHANGED: 'unchanged',
+                        deploy_state.ADDITIONAL_ONLY: 'updated'
+                    }.get(action, 'deployed')
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    deployed = [app_id for app_id, r in results.items() if r['status'] in ('deployed', 'updated', 'unchanged')]
+    if any(results[app_id]['status'] == 'deployed' for app_id in deployed):
+        print(f"\n🔄 Refreshing user apps...")
+        refresh_user_apps(server_url)
+
+    ordered = [results[app_id] for app_id, _, _ in apps]
+    print_summary(ordered)
+
+    failed = len(apps) - len(deployed)
+    print(f"\n⏱️  Total time: {time.perf_counter() - total_start:.2f}s")
+    http_client.report_latency()
+    if failed:
+        print(f"❌ {failed} of {len(apps)} apps failed to deploy")
+        return False
+
+    print(f"🎉 All {len(apps)} apps deployed successfully!")
+    return True
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Deploy State Module - Local record of what was last deployed to each server
+
+After a successful deploy the per-file content hashes of the package are
+stored under the build cache directory, keyed by server URL and app ID. The
+next deploy compares against that record to decide whether it can skip the
+install entirely, push only changed additional files to the VFS, or must
+reinstall the app.
+
+The record only knows about deploys made from this machine; use --force to
+reinstall when the server may have changed behind its back.
+"""
+
+import os
+import sys
+import hashlib
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_cache
+
+# Plan actions
+UNCHANGED = 'unchanged'
+ADDITIONAL_ONLY = 'additional'
+FULL_INSTALL = 'install'
+
+
+def _record_key(server_url, app_id):
+    return hashlib.sha256(f"{server_url.rstrip('/')}|{app_id}".encode('utf-8')).hexdigest()
+
+
+def load_record(server_url, app_id):
+    """Manifest last deployed to server_url for app_id, or None"""
+    return build_cache.load_entry('deploy-state', _record_key(server_url, app_id))
+
+
+def store_record(server_url, app_id, manifest):
+    """Remember manifest as the current deployed state"""
+    return build_cache.store_entry('deploy-state', _record_key(server_url, app_id), manifest)
+
+
+def plan_deploy(manifest, record):
+    """Compare a package manifest with the deployed record
+
+    Returns (action, changed_vfs_paths):
+        UNCHANGED        nothing to send
+        ADDITIONAL_ONLY  app files are identical; only the listed additional
+                         files changed and can be written to the VFS directly
+        FULL_INSTALL     the package must be installed
+    """
+    if not record:
+        return FULL_INSTALL, []
+    if manifest['files'] != record.get('files'):
+        return FULL_INSTALL, []
+
+    deployed = record.get('additional_files', {})
+    current = manifest['additional_files']
+    if set(current) != set(deployed):
+        # Added or removed files change what the installer lays out
+        return FULL_INSTALL, []
+
+    changed = sorted(path for path, digest in current.items() if deployed[path] != digest)
+    if not changed:
+        return UNCHANGED, []
+    return ADDITIONAL_ONLY, changed
@@ -6,14 +6,19 @@ Called programmatically by sypnex.py CLI
 
 import os
 import sys
-import json
-import requests
+import uuid
 from pathlib import Path
 
 # Add current directory to path for pack_app import
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
-from pack_app import pack_app
+from pack_app import build_package
+from compression import CompressionStats, compress_chunks, resolve_compression
+import tracing
+import http_client
+import deploy_state
+import chunked_upload
+from vfs_deploy import upload_binary_file, write_text_file
 
 # Add parent directory to path for config import
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -29,86 +34,131 @@ except ImportError:
     sys.exit(1)
 
 
-def dev_deploy(app_id, source_dir, server_url="http://127.0.0.1:5000"):
-    """Quick pack and deploy an app for development"""
+class MultipartUpload:
+    """Streaming multipart/form-data body for a single package field
     
-    print(f"🚀 Dev Deploy: {app_id}")
-    print(f"📁 Source: {source_dir}")
-    print(f"🌐 Server: {server_url}")
+    Iterating yields the multipart framing around the package's own chunk
+    stream. When the package size is known up front, len() gives the exact
+    body size so the request is sent with a Content-Length; otherwise it is
+    sent with chunked transfer encoding. Either way nothing is buffered.
+    """
     
-    # Step 1: Pack the app using pack_app.py
-    print(f"\n📦 Step 1: Packaging {app_id}...")
+    def __init__(self, field_name, package):
+        self.boundary = uuid.uuid4().hex
+        self._package = package
+        self._head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{package.filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode('utf-8')
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
     
-    # Create output file path
-    package_file = os.path.join(source_dir, f"{app_id}_packaged.app")
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
     
-    # Call pack_app function with new signature
-    success = pack_app(source_dir, package_file)
-    if not success:
-        return False
+    def __iter__(self):
+        yield self._head
+        yield from self._package.iter_chunks()
+        yield self._tail
     
-    # Read the packaged .app file that was created
-    if not os.path.exists(package_file):
-        print(f"❌ Error: Package file {package_file} not found")
-        return False
+    @property
+    def content_length(self):
+        package_size = self._package.size
+        if package_size is None:
+            return None
+        return len(self._head) + package_size + len(self._tail)
     
-    try:
-        with open(package_file, 'r', encoding='utf-8') as f:
-            package = json.load(f)
-    except Exception as e:
-        print(f"❌ Error reading package file: {e}")
-        return False
+    def __len__(self):
+        return self.content_length
+
+
+def _counted(chunks, counter):
+    """Pass chunks through while adding their sizes to counter['bytes']"""
+    for chunk in chunks:
+        counter['bytes'] += len(chunk)
+        yield chunk
+
+
+@tracing.traced()
+def package_app(app_id, source_dir, server_url=None):
+    """Build an app package in memory, ready to be streamed to the server
     
-    # Clean up the temporary package file
-    try:
-        os.remove(package_file)
-        print(f"🧹 Cleaned up temporary file: {package_file}")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not clean up temporary file {package_file}: {e}")
+    The package itself is left uncompressed; install_package() compresses the
+    upload on the wire instead. Large additional files are referenced by hash
+    and uploaded separately by install_package(), unless server_url is given
+    and that server has no uploads endpoint.
+    """
+    if server_url:
+        threshold = chunked_upload.deploy_threshold(server_url, get_auth_headers())
+    else:
+        threshold = chunked_upload.large_file_threshold()
+    package = build_package(source_dir, compression='none', external_threshold=threshold)
+    if package is None:
+        return None
     
-    # Step 2: Install via API
-    print(f"\n🚀 Step 2: Installing {app_id}...")
+    if package.app_id != app_id:
+        print(f"⚠️  Warning: Package ID {package.app_id} does not match expected ID {app_id}")
+    
+    if package.size is not None:
+        print(f"📊 Package size: {package.size / 1024:.1f} KB")
+    return package
+
+
+def install_package(app_id, package, server_url="http://127.0.0.1:5000", external_files=None):
+    """Install a package via the install API, streaming it as the request body
     
+    Args:
+        package: A Package from build_package() or a PackageFile on disk
+        external_files: Additional files the package references by hash
+            (defaults to package.external_files() for a Package); they are
+            uploaded in resumable chunks before the install
+    
+    When SYPNEX_COMPRESSION is set the request body is compressed on the fly
+    and sent with a matching Content-Encoding.
+    """
     try:
-        # Create multipart form data with the package as a binary file
-        package_bytes = json.dumps(package).encode('utf-8')
-        files = {
-            'package': (f'{app_id}_packaged.app', package_bytes, 'application/octet-stream')
-        }
+        if external_files is None and hasattr(package, 'external_files'):
+            external_files = package.external_files()
+        if external_files and not chunked_upload.upload_external_files(server_url, get_auth_headers(), external_files):
+            return False
         
-        # Get auth headers but remove Content-Type since requests will set it for multipart
+        # Stream the package as multipart form data
+        body = MultipartUpload('package', package)
+        
+        # Get auth headers with the multipart Content-Type instead of JSON
         auth_headers = get_auth_headers()
-        if 'Content-Type' in auth_headers:
-            del auth_headers['Content-Type']
+        auth_headers['Content-Type'] = body.content_type
+        
+        algorithm, level = resolve_compression()
+        if algorithm:
+            auth_headers['Content-Encoding'] = algorithm
+        
+        # Built again for each retry so the stream restarts from the beginning.
+        # A bare generator is sent chunked.
+        upload = {}
+        def make_body():
+            upload['sent'] = {'bytes': 0}
+            upload['stats'] = CompressionStats(algorithm, level)
+            if algorithm:
+                return _counted(compress_chunks(body, algorithm, level, upload['stats']), upload['sent'])
+            return body if body.content_length is not None else _counted(body, upload['sent'])
         
         # Send to install API with authentication
-        install_response = requests.post(
-            f'{server_url}/api/user-apps/install', 
-            files=files,
-            headers=auth_headers
-        )
+        install_url = f'{server_url}/api/user-apps/install'
+        with tracing.http_span('POST', install_url, app_id=app_id, content_encoding=algorithm) as span:
+            install_response = http_client.post(
+                install_url, 
+                data=make_body,
+                headers=auth_headers
+            )
+            span.set(status=install_response.status_code, bytes_sent=upload['sent']['bytes'] or body.content_length)
+        upload['stats'].report(f"Upload of {app_id}")
         
         if install_response.status_code == 200:
             install_result = install_response.json()
             print(f"✅ Success: {install_result.get('message', 'App installed successfully')}")
             print(f"📱 App Name: {install_result.get('app_name', app_id)}")
-            
-            # Step 3: Auto-refresh user apps
-            print(f"\n🔄 Step 3: Refreshing user apps...")
-            try:
-                refresh_response = requests.post(
-                    f'{server_url}/api/user-apps/refresh',
-                    headers=get_auth_headers()
-                )
-                if refresh_response.status_code == 200:
-                    refresh_result = refresh_response.json()
-                    print(f"✅ User apps refreshed successfully")
-                    print(f"📊 Total apps: {refresh_result.get('total', 'Unknown')}")
-                else:
-                    print(f"⚠️  Warning: Could not refresh user apps (status: {refresh_response.status_code})")
-            except Exception as e:
-                print(f"⚠️  Warning: Could not refresh user apps: {e}")
-            
             return True
         else:
             try:
@@ -118,10 +168,121 @@ def dev_deploy(app_id, source_dir, server_url="http://127.0.0.1:5000"):
                 print(f"❌ Installation failed: {install_response.status_code} - {install_response.text}")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except http_client.ConnectionError:
         print("❌ Error: Could not connect to server")
         print(f" Make sure your Sypnex OS server is running at {server_url}")
         return False
     except Exception as e:
         print(f"❌ Error during deployment: {e}")
-        return False 
\ No newline at end of file
+        return False
+
+
+def refresh_user_apps(server_url="http://127.0.0.1:5000"):
+    """Ask the server to rescan installed user apps"""
+    try:
+        refresh_url = f'{server_url}/api/user-apps/refresh'
+        with tracing.http_span('POST', refresh_url) as span:
+            refresh_response = http_client.post(
+                refresh_url,
+                headers=get_auth_headers()
+            )
+            span.set(status=refresh_response.status_code)
+        if refresh_response.status_code == 200:
+            refresh_result = refresh_response.json()
+            print(f"✅ User apps refreshed successfully")
+            print(f"📊 Total apps: {refresh_result.get('total', 'Unknown')}")
+            return True
+        else:
+            print(f"⚠️  Warning: Could not refresh user apps (status: {refresh_response.status_code})")
+            return False
+    except Exception as e:
+        print(f"⚠️  Warning: Could not refresh user apps: {e}")
+        return False
+
+
+def push_additional_files(app_id, contents, vfs_paths, server_url="http://127.0.0.1:5000"):
+    """Write changed additional files straight to their VFS paths instead of reinstalling the app"""
+    for vfs_path in vfs_paths:
+        data = contents.additional_file_bytes(vfs_path)
+        parent_path, filename = os.path.split(vfs_path)
+        try:
+            response = write_text_file(server_url, parent_path or '/', filename, data.decode('utf-8'))
+        except UnicodeDecodeError:
+            response = upload_binary_file(server_url, parent_path or '/', filename, data)
+        if response.status_code != 200:
+            print(f"❌ Failed to update {vfs_path}: {response.status_code}")
+            return False
+        print(f"✅ Updated {vfs_path} ({len(data) / 1024:.1f} KB)")
+    return True
+
+
+@tracing.traced()
+def deploy_changes(app_id, package, server_url="http://127.0.0.1:5000", force=False, contents=None,
+                   external_files=None):
+    """Send only what changed since the last deploy of this app to this server
+    
+    Args:
+        package: Package or PackageFile to stream if a full install is needed
+        force: Ignore the deploy record and always install
+        contents: Object providing manifest() and additional_file_bytes()
+            (defaults to package; pass a PackageReader for a PackageFile)
+        external_files: Passed to install_package()
+    
+    Returns:
+        (success, action) where action is one of the deploy_state plan actions.
+        Only a FULL_INSTALL needs a user app refresh afterwards.
+    """
+    contents = contents or package
+    manifest = contents.manifest()
+    if force:
+        action, changed = deploy_state.FULL_INSTALL, []
+    else:
+        action, changed = deploy_state.plan_deploy(manifest, deploy_state.load_record(server_url, app_id))
+    
+    external_paths = {entry['vfs_path'] for entry in getattr(contents, 'additional_files', None) or [] if entry.get('external')}
+    if action == deploy_state.ADDITIONAL_ONLY and external_paths.intersection(changed):
+        # Large files go through the resumable upload, which only the install path uses
+        action = deploy_state.FULL_INSTALL
+    
+    if action == deploy_state.UNCHANGED:
+        print(f"⏭️  {app_id} is unchanged since the last deploy to {server_url} - skipping install (use --force to reinstall)")
+        return True, action
+    
+    if action == deploy_state.ADDITIONAL_ONLY:
+        print(f"📁 Only {len(changed)} additional file(s) of {app_id} changed - updating them in the VFS")
+        success = push_additional_files(app_id, contents, changed, server_url)
+    else:
+        success = install_package(app_id, package, server_url, external_files)
+    
+    if success:
+        deploy_state.store_record(server_url, app_id, manifest)
+    return success, action
+
+
+@tracing.traced()
+def dev_deploy(app_id, source_dir, server_url="http://127.0.0.1:5000", force=False):
+    """Quick pack and deploy an app for development"""
+    
+    print(f"🚀 Dev Deploy: {app_id}")
+    print(f"📁 Source: {source_dir}")
+    print(f"🌐 Server: {server_url}")
+    
+    # Step 1: Pack the app using pack_app.py
+    print(f"\n📦 Step 1: Packaging {app_id}...")
+    package = package_app(app_id, source_dir, server_url)
+    if package is None:
+        return False
+    
+    # Step 2: Install via API, or send only what changed since the last deploy
+    print(f"\n🚀 Step 2: Installing {app_id}...")
+    success, action = deploy_changes(app_id, package, server_url, force)
+    if not success:
+        return False
+    if action != deploy_state.FULL_INSTALL:
+        return True
+    
+    # Step 3: Auto-refresh user apps
+    print(f"\n🔄 Step 3: Refreshing user apps...")
+    refresh_user_apps(server_url)
+    
+    return True
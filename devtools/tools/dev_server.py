@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Dev Server Module - Local stand-in for the Sypnex OS endpoints the devtools use
+
+Serves just enough of the server API to deploy against without a running
+Sypnex OS instance, backed by a plain directory:
+
+    POST /api/dev/validate-app                 every app is valid
+    POST /api/user-apps/install                unpacks the package into <data>/apps/<id>/
+                                               and its additional files into <data>/vfs/
+    POST /api/user-apps/refresh                counts installed apps
+    POST/GET/PUT /api/user-apps/uploads[/id]   resumable chunked uploads (see chunked_upload)
+    GET  /api/virtual-files/list?path=         VFS listing with sizes and sha256
+    POST /api/virtual-files/create-folder | create-file | upload-file
+
+Packages that reference external additional files are rejected unless every
+referenced blob has been uploaded. drop_rate makes the server drop a share of
+upload chunks mid-request, to exercise resumption over a flaky link.
+"""
+
+import os
+import sys
+import json
+import uuid
+import random
+import shutil
+import hashlib
+import tempfile
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compression import decompress_bytes
+from package_reader import open_package
+
+
+class DevStore:
+    """Directory-backed state: uploads, blobs, installed apps and the VFS"""
+
+    def __init__(self, data_dir):
+        self.root = os.path.abspath(data_dir)
+        self.lock = threading.Lock()
+        for name in ('uploads', 'blobs', 'apps', 'vfs'):
+            os.makedirs(os.path.join(self.root, name), exist_ok=True)
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def vfs_path(self, vfs_path):
+        """Map a VFS path onto the data directory, refusing paths that escape it"""
+        base = self.path('vfs')
+        target = os.path.normpath(os.path.join(base, vfs_path.lstrip('/')))
+        if target != base and not target.startswith(base + os.sep):
+            raise ValueError(f"Invalid VFS path: {vfs_path}")
+        return target
+
+    def blob_path(self, sha256):
+        if len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256):
+            raise ValueError(f"Invalid sha256: {sha256}")
+        return self.path('blobs', sha256)
+
+    # Uploads
+
+    def _upload_meta(self, upload_id):
+        try:
+            with open(self.path('uploads', f"{upload_id}.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _upload_status(self, upload_id, meta):
+        part = self.path('uploads', f"{upload_id}.part")
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        return {'upload_id': upload_id, 'offset': offset, 'size': meta['size'], 'complete': False}
+
+    def start_upload(self, sha256, size, filename):
+        with self.lock:
+            if os.path.exists(self.blob_path(sha256)):
+                return {'upload_id': None, 'offset': size, 'size': size, 'complete': True}
+            # Resume an unfinished upload of the same content
+            for name in os.listdir(self.path('uploads')):
+                if name.endswith('.json'):
+                    upload_id = name[:-5]
+                    meta = self._upload_meta(upload_id)
+                    if meta and meta['sha256'] == sha256 and meta['size'] == size:
+                        return self._upload_status(upload_id, meta)
+            upload_id = uuid.uuid4().hex
+            with open(self.path('uploads', f"{upload_id}.json"), 'w', encoding='utf-8') as f:
+                json.dump({'sha256': sha256, 'size': size, 'filename': filename}, f)
+            open(self.path('uploads', f"{upload_id}.part"), 'wb').close()
+            return self._upload_status(upload_id, {'size': size})
+
+    def upload_status(self, upload_id):
+        meta = self._upload_meta(upload_id)
+        return self._upload_status(upload_id, meta) if meta else None
+
+    def append_chunk(self, upload_id, start, data):
+        """Append a chunk at start; returns (status code, body)"""
+        with self.lock:
+            meta = self._upload_meta(upload_id)
+            if meta is None:
+                return 404, {'error': 'Unknown upload'}
+            status = self._upload_status(upload_id, meta)
+            if start != status['offset']:
+                return 409, dict(status, error='Offset mismatch')
+            if start + len(data) > meta['size']:
+                return 400, {'error': 'Chunk runs past the declared size'}
+
+            part = self.path('uploads', f"{upload_id}.part")
+            with open(part, 'ab') as f:
+                f.write(data)
+            offset = start + len(data)
+            if offset < meta['size']:
+                return 200, dict(status, offset=offset)
+
+            sha256_hash = hashlib.sha256()
+            with open(part, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha256_hash.update(chunk)
+            os.remove(self.path('uploads', f"{upload_id}.json"))
+            if sha256_hash.hexdigest() != meta['sha256']:
+                os.remove(part)
+                return 422, {'error': 'Checksum mismatch - upload discarded'}
+            os.replace(part, self.blob_path(meta['sha256']))
+            return 200, dict(status, offset=offset, complete=True)
+
+    # Apps
+
+    def install(self, package_bytes):
+        """Unpack a package; returns (status code, body)"""
+        fd, tmp_path = tempfile.mkstemp(suffix='.app')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(package_bytes)
+            with open_package(tmp_path) as package:
+                app_metadata = package.app_metadata
+                app_id = app_metadata.get('id')
+                if not app_id:
+                    return 400, {'error': 'Package has no app id'}
+
+                missing = [
+                    entry['vfs_path'] for entry in package.additional_files
+                    if entry.get('external') and not os.path.exists(self.blob_path(entry['sha256']))
+                ]
+                if missing:
+                    return 400, {'error': f"Referenced files were not uploaded: {', '.join(missing)}"}
+
+                app_dir = self.path('apps', app_id)
+                shutil.rmtree(app_dir, ignore_errors=True)
+                os.makedirs(app_dir)
+                for name in package.file_names():
+                    with open(os.path.join(app_dir, os.path.basename(name)), 'wb') as f:
+                        f.write(package.read_file(name))
+
+                for index, entry in enumerate(package.additional_files):
+                    target = self.vfs_path(entry['vfs_path'])
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    if entry.get('external'):
+                        shutil.copyfile(self.blob_path(entry['sha256']), target)
+                    else:
+                        with open(target, 'wb') as f:
+                            f.write(package.read_additional_file(index))
+
+            return 200, {'message': f"App {app_id} installed", 'app_name': app_metadata.get('name', app_id)}
+        except (ValueError, KeyError, OSError) as e:
+            return 400, {'error': f"Invalid package: {e}"}
+        finally:
+            os.remove(tmp_path)
+
+    def app_count(self):
+        return len(os.listdir(self.path('apps')))
+
+    # VFS
+
+    def list_folder(self, vfs_path):
+        folder = self.vfs_path(vfs_path)
+        if not os.path.isdir(folder):
+            return None
+        items = []
+        for name in sorted(os.listdir(folder)):
+            full = os.path.join(folder, name)
+            if os.path.isdir(full):
+                items.append({'name': name, 'is_directory': True})
+            else:
+                with open(full, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                items.append({'name': name, 'is_directory': False, 'size': os.path.getsize(full), 'sha256': digest})
+        return items
+
+    def write_vfs_file(self, parent_path, name, data):
+        target = self.vfs_path(os.path.join(parent_path, name))
+        if not os.path.isdir(os.path.dirname(target)):
+            raise FileNotFoundError(f"Folder not found: {parent_path}")
+        with open(target, 'wb') as f:
+            f.write(data)
+        return '/' + os.path.relpath(target, self.path('vfs')).replace(os.sep, '/')
+
+
+def _make_handler(store, drop_rate):
+
+    class DevServerHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _read_body(self):
+            if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        break
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+                body = b''.join(chunks)
+            else:
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            encoding = self.headers.get('Content-Encoding')
+            return decompress_bytes(body, encoding) if encoding else body
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self):
+            if self.headers.get('X-Session-Token'):
+                return True
+            self._send(401, {'error': 'Missing X-Session-Token'})
+            return False
+
+        def _multipart(self, body):
+            """Return {field name: (filename, bytes)} for a multipart/form-data body"""
+            message = BytesParser(policy=default_policy).parsebytes(
+                f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode('utf-8') + body
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param('name', header='content-disposition')
+                fields[name] = (part.get_filename(), part.get_payload(decode=True))
+            return fields
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            url = urlsplit(self.path)
+            if url.path.startswith('/api/user-apps/uploads/'):
+                status = store.upload_status(url.path.rsplit('/', 1)[1])
+                return self._send(200, status) if status else self._send(404, {'error': 'Unknown upload'})
+            if url.path == '/api/virtual-files/list':
+                items = store.list_folder(parse_qs(url.query).get('path', ['/'])[0])
+                return self._send(200, {'items': items}) if items is not None else self._send(404, {'error': 'Not found'})
+            if url.path.startswith('/api/virtual-files/info/'):
+                target = store.vfs_path(url.path[len('/api/virtual-files/info/'):])
+                if not os.path.exists(target):
+                    return self._send(404, {'error': 'Not found'})
+                return self._send(200, {'is_directory': os.path.isdir(target)})
+            self._send(404, {'error': 'Not found'})
+
+        def do_PUT(self):
+            if not self._authorized():
+                return
+            url = urlsplit(self.path)
+            if not url.path.startswith('/api/user-apps/uploads/'):
+                return self._send(404, {'error': 'Not found'})
+            if drop_rate and random.random() < drop_rate:
+                # Simulate a dropped connection partway through the chunk
+                self.rfile.read(int(self.headers.get('Content-Length') or 0) // 2)
+                self.close_connection = True
+                self.connection.close()
+                return
+            try:
+                start = int(self.headers.get('Content-Range', '').split(' ', 1)[1].split('-', 1)[0])
+            except (IndexError, ValueError):
+                return self._send(400, {'error': 'Missing or invalid Content-Range'})
+            status, payload = store.append_chunk(url.path.rsplit('/', 1)[1], start, self._read_body())
+            self._send(status, payload)
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            url = urlsplit(self.path)
+            body = self._read_body()
+            try:
+                if url.path == '/api/dev/validate-app':
+                    return self._send(200, {'validation_results': {'is_valid': True, 'errors': []}})
+                if url.path == '/api/user-apps/refresh':
+                    return self._send(200, {'message': 'Refreshed', 'total': store.app_count()})
+                if url.path == '/api/user-apps/uploads':
+                    request = json.loads(body)
+                    return self._send(200, store.start_upload(request['sha256'], int(request['size']), request.get('filename')))
+                if url.path == '/api/user-apps/install':
+                    fields = self._multipart(body)
+                    if 'package' not in fields:
+                        return self._send(400, {'error': 'No package uploaded'})
+                    return self._send(*store.install(fields['package'][1]))
+                if url.path == '/api/virtual-files/create-folder':
+                    request = json.loads(body)
+                    os.makedirs(store.vfs_path(os.path.join(request.get('parent_path', '/'), request['name'])), exist_ok=True)
+                    return self._send(200, {'message': 'Folder created'})
+                if url.path == '/api/virtual-files/create-file':
+                    request = json.loads(body)
+                    path = store.write_vfs_file(request.get('parent_path', '/'), request['name'], request.get('content', '').encode('utf-8'))
+                    return self._send(200, {'message': 'File written', 'path': path})
+                if url.path == '/api/virtual-files/upload-file':
+                    fields = self._multipart(body)
+                    parent_path = fields.get('parent_path', (None, b'/'))[1].decode('utf-8')
+                    filename, data = fields['file']
+                    path = store.write_vfs_file(parent_path, filename, data)
+                    return self._send(200, {'message': 'File uploaded', 'path': path})
+            except FileNotFoundError as e:
+                return self._send(404, {'error': str(e)})
+            except (ValueError, KeyError) as e:
+                return self._send(400, {'error': str(e)})
+            self._send(404, {'error': 'Not found'})
+
+    return DevServerHandler
+
+
+def create_dev_server(data_dir, host='127.0.0.1', port=5000, drop_rate=0.0):
+    """Create (but do not start) a dev server; port 0 picks a free port"""
+    return ThreadingHTTPServer((host, port), _make_handler(DevStore(data_dir), drop_rate))
+
+
+def run_dev_server(data_dir, host='127.0.0.1', port=5000, drop_rate=0.0):
+    """Serve until interrupted"""
+    server = create_dev_server(data_dir, host, port, drop_rate)
+    print(f"🧪 Dev server listening on http://{host}:{server.server_address[1]}")
+    print(f"📁 Data directory: {os.path.abspath(data_dir)}")
+    if drop_rate:
+        print(f"⚠️  Dropping {drop_rate:.0%} of upload chunks to simulate a flaky link")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n👋 Dev server stopped")
+    finally:
+        server.server_close()
+    return True
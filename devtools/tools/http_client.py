@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+HTTP Client Module - Shared pooled HTTP client for all devtools commands
+
+Every request to a Sypnex OS server goes through request(). One
+requests.Session is kept per server (and per process), so connections are
+reused with keep-alive instead of paying TCP/TLS setup on every call.
+Requests get connect/read timeouts, and connection errors, timeouts and 5xx
+responses are retried with jittered exponential backoff.
+
+Streaming request bodies can only be sent once, so pass a body factory (a
+callable returning a fresh body) as data= to make such a request retryable.
+A bare generator is sent on a single attempt.
+
+Latency of every request is recorded; latency_summary() and
+report_latency() summarize it per endpoint.
+
+requests is imported on the first request rather than with this module, so
+commands that never talk to a server do not pay for it at startup. Its
+exception classes are available here as http_client.ConnectionError,
+http_client.Timeout and http_client.RequestException for except clauses.
+"""
+
+import os
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+import tracing
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+
+# 501 Not Implemented will not change on a retry
+RETRY_STATUSES = frozenset(status for status in range(500, 600) if status != 501)
+
+_sessions = {}
+_metrics = []
+_lock = threading.Lock()
+
+# requests exception classes re-exported (lazily) through __getattr__
+_REQUESTS_EXCEPTIONS = ('ConnectionError', 'Timeout', 'RequestException')
+
+
+def __getattr__(name):
+    if name in _REQUESTS_EXCEPTIONS:
+        import requests
+        return getattr(requests.exceptions, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def client_settings():
+    """Timeouts and retry policy from the environment"""
+    return {
+        'connect_timeout': _env_float('SYPNEX_HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        'read_timeout': _env_float('SYPNEX_HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT),
+        'retries': max(0, int(_env_float('SYPNEX_HTTP_RETRIES', DEFAULT_RETRIES))),
+        'backoff': max(0.0, _env_float('SYPNEX_HTTP_BACKOFF', DEFAULT_BACKOFF)),
+        'pool_size': max(1, int(_env_float('SYPNEX_HTTP_POOL_SIZE', 10)))
+    }
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url):
+    """Return the pooled session for the server that url points to
+
+    Sessions are keyed by process too: a forked worker must not share its
+    parent's sockets.
+    """
+    key = (os.getpid(), _origin(url))
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            pool_size = client_settings()['pool_size']
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[key] = session
+    return session
+
+
+def close_sessions():
+    """Close every pooled connection opened by this process"""
+    pid = os.getpid()
+    with _lock:
+        for key in [key for key in _sessions if key[0] == pid]:
+            _sessions.pop(key).close()
+
+
+def backoff_delay(attempt, backoff=DEFAULT_BACKOFF):
+    """Full-jitter exponential backoff: a random delay up to backoff * 2^attempt"""
+    return random.uniform(0, min(MAX_BACKOFF, backoff * (2 ** attempt)))
+
+
+def _retry_after(response):
+    """Seconds requested by a Retry-After header, if any (capped at MAX_BACKOFF)"""
+    value = response.headers.get('Retry-After')
+    try:
+        return min(MAX_BACKOFF, max(0.0, float(value))) if value else None
+    except ValueError:
+        return None
+
+
+def request(method, url, data=None, timeout=None, retries=None, **kwargs):
+    """Send an HTTP request through the shared pooled session, retrying transient failures
+
+    Args:
+        method: HTTP method
+        url: Full request URL
+        data: Request body, or a callable returning a fresh body for each attempt
+        timeout: Seconds, or a (connect, read) tuple; defaults come from client_settings()
+        retries: Retry count override; defaults come from client_settings()
+        **kwargs: Passed through to requests (headers, json, params, ...)
+
+    Returns:
+        The final requests.Response. A 5xx response is returned once retries run
+        out; a connection error or timeout is raised.
+    """
+    import requests
+    settings = client_settings()
+    if timeout is None:
+        timeout = (settings['connect_timeout'], settings['read_timeout'])
+    if retries is None:
+        retries = settings['retries']
+
+    body_factory = data if callable(data) else None
+    if body_factory is None and data is not None and not isinstance(data, (bytes, str, dict, list, tuple)):
+        # A one-shot stream cannot be replayed
+        retries = 0
+
+    session = get_session(url)
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        body = body_factory() if body_factory else data
+        try:
+            response = session.request(method, url, data=body, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= retries:
+                _record(method, url, None, start, attempt)
+                raise
+            delay = backoff_delay(attempt, settings['backoff'])
+            reason = type(e).__name__
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                _record(method, url, response.status_code, start, attempt)
+                return response
+            retry_after = _retry_after(response)
+            delay = retry_after if retry_after is not None else backoff_delay(attempt, settings['backoff'])
+            reason = f"HTTP {response.status_code}"
+            response.close()
+
+        attempt += 1
+        print(f"🔁 {method} {urlsplit(url).path} failed ({reason}), retry {attempt}/{retries} in {delay:.1f}s")
+        tracing.instant('http retry', 'http', url=url, attempt=attempt, reason=reason)
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def _record(method, url, status, start, retries):
+    with _lock:
+        _metrics.append({
+            'method': method,
+            'path': urlsplit(url).path,
+            'status': status,
+            'seconds': time.perf_counter() - start,
+            'retries': retries
+        })
+
+
+def request_metrics():
+    """Per-request metrics recorded by this process: method, path, status, seconds, retries"""
+    with _lock:
+        return list(_metrics)
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_summary():
+    """Latency per endpoint: {'METHOD /path': {count, p50, p95, max, retries, failures}}"""
+    grouped = {}
+    for metric in request_metrics():
+        grouped.setdefault(f"{metric['method']} {metric['path']}", []).append(metric)
+
+    summary = {}
+    for endpoint, metrics in grouped.items():
+        seconds = sorted(metric['seconds'] for metric in metrics)
+        summary[endpoint] = {
+            'count': len(metrics),
+            'p50': _percentile(seconds, 0.5),
+            'p95': _percentile(seconds, 0.95),
+            'max': seconds[-1],
+            'retries': sum(metric['retries'] for metric in metrics),
+            'failures': sum(1 for metric in metrics if metric['status'] is None or metric['status'] >= 400)
+        }
+    return summary
+
+
+def report_latency():
+    """Print the per-endpoint latency summary"""
+    summary = latency_summary()
+    if not summary:
+        return
+    print(f"🌐 HTTP latency:")
+    for endpoint, stats in sorted(summary.items()):
+        extra = ''
+        if stats['retries']:
+            extra += f", {stats['retries']} retries"
+        if stats['failures']:
+            extra += f", {stats['failures']} failed"
+        print(
+            f"   {endpoint}: {stats['count']} requests, p50 {stats['p50'] * 1000:.0f} ms, "
+            f"p95 {stats['p95'] * 1000:.0f} ms, max {stats['max'] * 1000:.0f} ms{extra}"
+        )
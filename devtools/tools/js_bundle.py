@@ -0,0 +1,1191 @@
+#!/usr/bin/env python3
+"""
+JS Bundle Module - Bundle an app's scripts with dead-code elimination
+
+The scripts listed in an app's .app metadata are classic scripts sharing one
+global scope, run in declared order. Any of them may also be an ES module
+(it has top-level import/export); its imports are resolved relative to it
+inside src/ and pulled into the bundle even if they are not listed.
+
+A tokenizer splits every file into top-level statements and records which
+names each statement declares and references. Everything with possible side
+effects is kept, along with whatever it references, transitively. The roots
+are also names used by inline handlers and <script> blocks in index.html,
+names passed around as strings (setTimeout('fn()'), window['fn']) and
+statements marked with an @keep comment. Unreachable function, class and
+variable declarations with side-effect-free initializers are dropped. So are
+function declarations shadowed by a later one of the same name.
+
+ES modules are emitted in dependency order, each wrapped in a function that
+returns only the exports something imports. Imports are bound when the
+importing module runs, so reassigning an exported let/var afterwards is not
+seen by importers (reported as a warning).
+
+Unresolved imports, missing exports, import cycles and import.meta raise
+BundleError. Scripts listed in the .app metadata that do not exist are
+reported as missing.
+
+Property reads and identifier references are assumed to have no side
+effects, so an unused `const x = a.b;` is dropped. Operators that convert
+their operands (arithmetic, comparisons, in, instanceof) may call valueOf or a
+proxy trap, so they only count as pure when every operand is a literal.
+"""
+
+import os
+import re
+import json
+import posixpath
+
+# Token kinds
+NAME = 'name'
+NUMBER = 'number'
+STRING = 'string'
+TEMPLATE = 'template'
+REGEX = 'regex'
+PUNCT = 'punct'
+PRIVATE = 'private'
+
+_IDENT = r'[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*'
+_IDENT_RE = re.compile(_IDENT)
+_PUNCT = (
+    r'>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?=|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.(?!\d)'
+    r'|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|\*\*|<<|>>|[{}()\[\];,<>+\-*/%&|^!~?:=.@]'
+)
+_PUNCT_RE = re.compile(_PUNCT)
+# One token (or a run of whitespace and comments); `, } and / depend on context and are finished by hand
+_TOKEN_RE = re.compile(
+    r'(?P<skip>(?:[ \t\f\v\ufeff\u00a0\n\r\u2028\u2029]+|//[^\n\r\u2028\u2029]*|/\*.*?\*/)+)'
+    r'|(?P<name>' + _IDENT + r')'
+    r'|(?P<number>0[xX][\da-fA-F_]+n?|0[oO][0-7_]+n?|0[bB][01_]+n?'
+    r'|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d[\d_]*)?n?)'
+    r'|(?P<string>"(?:[^"\\\n\r]|\\(?:\r\n|[\s\S]))*"|\'(?:[^\'\\\n\r]|\\(?:\r\n|[\s\S]))*\')'
+    r'|(?P<private>#' + _IDENT + r')'
+    r'|(?P<special>[`}/])'
+    r'|(?P<punct>' + _PUNCT + r')',
+    re.S
+)
+_NEWLINE_RE = re.compile(r'[\n\r\u2028\u2029]')
+_NEWLINES = '\n\r\u2028\u2029'
+_TEMPLATE_SPECIAL_RE = re.compile(r'[`\\$]')
+
+# After these keywords a / starts a regular expression rather than a division
+_REGEX_AFTER = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await'
+}
+# Keywords that cannot end an expression (a newline after them never ends a statement)
+_NOT_EXPRESSION_END = _REGEX_AFTER | {'extends', 'let', 'const', 'var', 'export', 'import', 'default'}
+# Tokens that continue the previous line's expression, so no semicolon is inserted before them
+_CONTINUATION = {
+    '.', '?.', ',', '(', '[', '=>', '?', ':', '=', '+', '-', '*', '/', '%', '**', '==', '===', '!=', '!==',
+    '<', '>', '<=', '>=', '&&', '||', '??', '&', '|', '^', '<<', '>>', '>>>', '+=', '-=', '*=', '/=', '%=',
+    '**=', '<<=', '>>=', '>>>=', '&=', '|=', '^=', '&&=', '||=', '??='
+}
+_ASSIGNMENTS = {
+    '=', '+=', '-=', '*=', '/=', '%=', '**=', '<<=', '>>=', '>>>=', '&=', '|=', '^=', '&&=', '||=', '??='
+}
+# Operators that may call valueOf/toString/Symbol.toPrimitive on their operands
+_COERCING = {
+    '+', '-', '*', '/', '%', '**', '<', '>', '<=', '>=', '==', '!=', '<<', '>>', '>>>', '&', '|', '^', '~',
+    'in', 'instanceof'
+}
+# Keywords whose evaluation has (or may have) side effects
+_IMPURE_KEYWORDS = {'new', 'await', 'yield', 'delete', 'import', 'super', 'throw'}
+# Objects whose properties are globals, so window.fn refers to a top-level fn
+_GLOBAL_OBJECTS = {'window', 'globalThis', 'self', 'this', 'top', 'parent', 'frames'}
+
+# Strings that name a function: 'fn' or 'fn(...)'
+_NAMED_STRING_RE = re.compile(r'\s*([A-Za-z_$][\w$]*)\s*(?:\(.*\))?\s*;?\s*$', re.S)
+_HANDLER_RE = re.compile(r'''\son[a-z]+\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.I)
+_INLINE_SCRIPT_RE = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.I | re.S)
+_JAVASCRIPT_URL_RE = re.compile(r'''javascript:([^"']*)''', re.I)
+# Import/export specifiers, found without tokenizing (used to build the cache key)
+_SPECIFIER_RE = re.compile(
+    r'''(?:^|[;\s}])(?:import|export)\s*(?:[\w$*{}\s,]*?\sfrom\s*)?(["'])([^"'\n]+)\1''', re.M
+)
+
+DEFAULT_EXPORT_LOCAL = '__sypnex_default'
+MODULE_PREFIX = '__sypnex_mod_'
+
+
+class BundleError(ValueError):
+    """The scripts cannot be bundled (unresolved import, missing export, import cycle, ...)"""
+
+
+class Token:
+    __slots__ = ('kind', 'value', 'start', 'end', 'newline')
+
+    def __init__(self, kind, value, start, end, newline):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+        self.newline = newline  # a line break precedes this token
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r})"
+
+
+def _line(source, offset):
+    return source.count('\n', 0, offset) + 1
+
+
+def _regex_allowed(previous):
+    if previous is None:
+        return True
+    if previous.kind == NAME:
+        return previous.value in _REGEX_AFTER
+    if previous.kind == TEMPLATE:
+        return previous.value.endswith('${')
+    if previous.kind == PUNCT:
+        return previous.value not in (')', ']', '}', '++', '--')
+    return False
+
+
+def _scan_template(source, position, path):
+    """Scan template text from position; returns (end, opens_substitution)"""
+    i = position
+    while True:
+        match = _TEMPLATE_SPECIAL_RE.search(source, i)
+        if match is None:
+            raise BundleError(f"{path}:{_line(source, position)}: unterminated template literal")
+        char = match.group()
+        if char == '\\':
+            i = match.end() + 1
+        elif char == '`':
+            return match.end(), False
+        elif source.startswith('${', match.start()):
+            return match.start() + 2, True
+        else:
+            i = match.end()
+
+
+def _scan_regex(source, position):
+    """End of the regular expression literal at position, or None if it is not one"""
+    i = position + 1
+    length = len(source)
+    in_class = False
+    while i < length:
+        char = source[i]
+        if char in _NEWLINES:
+            return None
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < length and (source[i].isalnum() or source[i] in '_$'):
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def tokenize(source, path='<script>'):
+    """Split JavaScript source into tokens (comments and whitespace are skipped)"""
+    tokens = []
+    braces = []  # '{' or '${' for every open brace, so '}' knows when a template resumes
+    position = 0
+    length = len(source)
+    newline = False
+    if source.startswith('#!'):
+        position = source.find('\n') if '\n' in source else length
+
+    while position < length:
+        match = _TOKEN_RE.match(source, position)
+        if match is None:
+            char = source[position]
+            if char in '"\'':
+                raise BundleError(f"{path}:{_line(source, position)}: unterminated string")
+            raise BundleError(f"{path}:{_line(source, position)}: unexpected character {char!r}")
+        kind = match.lastgroup
+        start = position
+        end = match.end()
+        if kind == 'skip':
+            if not newline and _NEWLINE_RE.search(source, start, end):
+                newline = True
+            position = end
+            continue
+        if kind == 'special':
+            char = match.group()
+            if char == '`':
+                end, opens = _scan_template(source, position + 1, path)
+                kind = TEMPLATE
+                if opens:
+                    braces.append('${')
+            elif char == '}' and braces and braces[-1] == '${':
+                braces.pop()
+                end, opens = _scan_template(source, position + 1, path)
+                kind = TEMPLATE
+                if opens:
+                    braces.append('${')
+            else:
+                if source.startswith('/*', position):
+                    raise BundleError(f"{path}:{_line(source, position)}: unterminated comment")
+                if char == '/' and _regex_allowed(tokens[-1] if tokens else None):
+                    end = _scan_regex(source, position)
+                    kind = REGEX
+                if kind != REGEX or end is None:
+                    kind, end = PUNCT, _PUNCT_RE.match(source, position).end()
+                    if char == '}' and braces:
+                        braces.pop()
+        elif kind == PUNCT and source[start] == '{':
+            braces.append('{')
+
+        tokens.append(Token(kind, source[start:end], start, end, newline))
+        newline = False
+        position = end
+    return tokens
+
+
+def _depth_change(token):
+    if token.kind == PUNCT:
+        if token.value in '([{':
+            return 1
+        if token.value in ')]}':
+            return -1
+    elif token.kind == TEMPLATE:
+        return (1 if token.value.endswith('${') else 0) - (1 if token.value.startswith('}') else 0)
+    return 0
+
+
+def _ends_expression(token):
+    if token.kind == NAME:
+        return token.value not in _NOT_EXPRESSION_END
+    if token.kind == PUNCT:
+        return token.value in (')', ']', '}', '++', '--')
+    if token.kind == TEMPLATE:
+        return not token.value.endswith('${')
+    return True
+
+
+def _continues(token):
+    if token.kind == PUNCT:
+        return token.value in _CONTINUATION
+    if token.kind == NAME:
+        return token.value in ('in', 'instanceof')
+    return token.kind == TEMPLATE and token.value.startswith('`')
+
+
+class Statement:
+    """A top-level statement: tokens [start, end) and what it declares"""
+
+    __slots__ = ('start', 'end', 'kind', 'names', 'name_tokens', 'pure', 'keep', 'refs', 'info')
+
+    def __init__(self, start, end, kind='other', names=(), name_tokens=(), pure=False):
+        self.start = start
+        self.end = end
+        self.kind = kind          # function, class, var, import, export, other
+        self.names = list(names)  # top-level names it declares
+        self.name_tokens = set(name_tokens)
+        self.pure = pure          # evaluating it has no side effects
+        self.keep = False
+        self.refs = set()
+        self.info = None
+
+
+class _Parser:
+    """Splits a file into top-level statements"""
+
+    def __init__(self, source, path):
+        self.source = source
+        self.path = path
+        self.tokens = tokenize(source, path)
+        self.is_module = False
+
+    def error(self, index, message):
+        offset = self.tokens[min(index, len(self.tokens) - 1)].start if self.tokens else 0
+        raise BundleError(f"{self.path}:{_line(self.source, offset)}: {message}")
+
+    def is_name(self, index, value):
+        return index < len(self.tokens) and self.tokens[index].kind == NAME and self.tokens[index].value == value
+
+    def is_punct(self, index, value):
+        return index < len(self.tokens) and self.tokens[index].kind == PUNCT and self.tokens[index].value == value
+
+    def skip_balanced(self, index):
+        """Index after the bracket group opening at index"""
+        if index >= len(self.tokens) or _depth_change(self.tokens[index]) <= 0:
+            self.error(index, "expected an opening bracket")
+        depth = 0
+        for i in range(index, len(self.tokens)):
+            depth += _depth_change(self.tokens[i])
+            if depth == 0:
+                return i + 1
+        self.error(index, "unbalanced brackets")
+
+    def expression_end(self, index):
+        """End of a statement that runs to a semicolon or an inserted one"""
+        tokens = self.tokens
+        depth = 0
+        for i in range(index, len(tokens)):
+            token = tokens[i]
+            if depth == 0 and i > index:
+                if token.newline and _ends_expression(tokens[i - 1]) and not _continues(token):
+                    return i
+            if depth == 0 and token.kind == PUNCT and token.value == ';':
+                return i + 1
+            change = _depth_change(token)
+            if change < 0 and depth == 0:
+                return i
+            depth += change
+        return len(tokens)
+
+    def function_end(self, index):
+        i = index + (2 if self.is_name(index, 'async') else 1)
+        if self.is_punct(i, '*'):
+            i += 1
+        if i < len(self.tokens) and self.tokens[i].kind == NAME:
+            i += 1
+        if not self.is_punct(i, '('):
+            self.error(i, "expected function parameters")
+        i = self.skip_balanced(i)
+        if not self.is_punct(i, '{'):
+            self.error(i, "expected function body")
+        return self.skip_balanced(i)
+
+    def class_end(self, index):
+        i = index + 1
+        while i < len(self.tokens) and not self.is_punct(i, '{'):
+            i = self.skip_balanced(i) if _depth_change(self.tokens[i]) > 0 else i + 1
+        return self.skip_balanced(i)
+
+    def is_function_start(self, index):
+        if self.is_name(index, 'function'):
+            return True
+        return (self.is_name(index, 'async') and self.is_name(index + 1, 'function')
+                and not self.tokens[index + 1].newline)
+
+    def statement_end(self, index):
+        tokens = self.tokens
+        token = tokens[index]
+        if token.kind == PUNCT:
+            if token.value == '{':
+                return self.skip_balanced(index)
+            if token.value == ';':
+                return index + 1
+            return self.expression_end(index)
+        if token.kind != NAME:
+            return self.expression_end(index)
+
+        value = token.value
+        if self.is_function_start(index):
+            return self.function_end(index)
+        if value == 'class':
+            return self.class_end(index)
+        if value in ('if', 'for', 'while', 'with'):
+            i = index + 1
+            if value == 'for' and self.is_name(i, 'await'):
+                i += 1
+            i = self.statement_end(self.skip_balanced(i))
+            if value == 'if' and self.is_name(i, 'else'):
+                i = self.statement_end(i + 1)
+            return i
+        if value == 'do':
+            i = self.statement_end(index + 1)
+            if not self.is_name(i, 'while'):
+                self.error(i, "expected while after do")
+            i = self.skip_balanced(i + 1)
+            return i + 1 if self.is_punct(i, ';') else i
+        if value == 'try':
+            i = self.skip_balanced(index + 1)
+            if self.is_name(i, 'catch'):
+                i += 1
+                if self.is_punct(i, '('):
+                    i = self.skip_balanced(i)
+                i = self.skip_balanced(i)
+            if self.is_name(i, 'finally'):
+                i = self.skip_balanced(i + 1)
+            return i
+        if value == 'switch':
+            return self.skip_balanced(self.skip_balanced(index + 1))
+        if value == 'export':
+            i = index + (2 if self.is_name(index + 1, 'default') else 1)
+            if self.is_function_start(i) or self.is_name(i, 'class'):
+                return self.statement_end(i)
+            return self.expression_end(index)
+        if self.is_punct(index + 1, ':') and value not in _NOT_EXPRESSION_END:
+            return self.statement_end(index + 2)  # labelled statement
+        return self.expression_end(index)
+
+    def parse(self):
+        statements = []
+        index = 0
+        tokens = self.tokens
+        while index < len(tokens):
+            end = self.statement_end(index)
+            statements.append(self.classify(index, end))
+            index = end
+        for statement in statements:
+            statement.refs = self.references(statement)
+        return statements
+
+    # --- Classification -------------------------------------------------
+
+    def classify(self, start, end):
+        tokens = self.tokens
+        token = tokens[start]
+        if token.kind != NAME:
+            return Statement(start, end)
+        value = token.value
+        if self.is_function_start(start):
+            return self.classify_function(start, end)
+        if value == 'class':
+            return self.classify_class(start, end)
+        if value in ('var', 'const') or (value == 'let' and start + 1 < end and (
+                tokens[start + 1].kind == NAME or self.is_punct(start + 1, '[') or self.is_punct(start + 1, '{'))):
+            return self.classify_var(start, end)
+        if value == 'import' and not (self.is_punct(start + 1, '(') or self.is_punct(start + 1, '.')):
+            self.is_module = True
+            return self.classify_import(start, end)
+        if value == 'export':
+            self.is_module = True
+            return self.classify_export(start, end)
+        return Statement(start, end)
+
+    def classify_function(self, start, end):
+        i = start + (2 if self.is_name(start, 'async') else 1)
+        if self.is_punct(i, '*'):
+            i += 1
+        if self.tokens[i].kind != NAME:
+            return Statement(start, end, 'function', pure=True)
+        return Statement(start, end, 'function', [self.tokens[i].value], [i], pure=True)
+
+    def class_is_pure(self, start, end):
+        """A class definition is pure unless it has static initializers or a computed base class"""
+        tokens = self.tokens
+        i = start + 1
+        if i < end and tokens[i].kind == NAME and tokens[i].value != 'extends':
+            i += 1
+        if self.is_name(i, 'extends'):
+            i += 1
+            while i < end and not self.is_punct(i, '{'):
+                if tokens[i].kind != NAME and not self.is_punct(i, '.'):
+                    return False
+                i += 1
+        depth = 0
+        for j in range(i, end):
+            token = tokens[j]
+            if depth == 1 and token.kind == NAME and token.value == 'static':
+                if self.is_punct(j + 1, '{'):
+                    return False
+                # static fields are evaluated with the class; static methods are not
+                k = j + 1
+                while k < end and not (tokens[k].kind == PUNCT and tokens[k].value in ('(', '=', ';', '}')):
+                    if tokens[k].kind == PUNCT and tokens[k].value == '[':
+                        return False
+                    k += 1
+                if not self.is_punct(k, '('):
+                    return False
+            elif depth == 1 and self.is_punct(j, '['):
+                return False  # computed member name
+            depth += _depth_change(token)
+        return True
+
+    def classify_class(self, start, end):
+        pure = self.class_is_pure(start, end)
+        name_index = start + 1
+        if self.tokens[name_index].kind == NAME and self.tokens[name_index].value != 'extends':
+            return Statement(start, end, 'class', [self.tokens[name_index].value], [name_index], pure=pure)
+        return Statement(start, end, 'class', pure=pure)
+
+    def split_top_level(self, start, end, separator=','):
+        """Split tokens [start, end) at separators outside brackets"""
+        parts = []
+        depth = 0
+        part_start = start
+        for i in range(start, end):
+            token = self.tokens[i]
+            if depth == 0 and token.kind == PUNCT and token.value == separator:
+                parts.append((part_start, i))
+                part_start = i + 1
+            depth += _depth_change(token)
+        if part_start < end:
+            parts.append((part_start, end))
+        return parts
+
+    def classify_var(self, start, end):
+        body_end = end - 1 if self.is_punct(end - 1, ';') else end
+        statement = Statement(start, end, 'var', pure=True)
+        statement.info = {'keyword': self.tokens[start].value, 'patterns': False}
+        for first, last in self.split_top_level(start + 1, body_end):
+            token = self.tokens[first]
+            if token.kind == NAME:
+                statement.names.append(token.value)
+                statement.name_tokens.add(first)
+                if last > first + 1 and not (self.is_punct(first + 1, '=') and self.is_pure(first + 2, last)):
+                    statement.pure = False
+            else:
+                # Destructuring evaluates its source and may run getters
+                statement.pure = False
+                statement.info['patterns'] = True
+        return statement
+
+    def skip_expression(self, index, end):
+        """End of the expression starting at index: the next comma or closing bracket at its depth"""
+        depth = 0
+        for i in range(index, end):
+            token = self.tokens[i]
+            if depth == 0 and token.kind == PUNCT and token.value in (',', ';'):
+                return i
+            change = _depth_change(token)
+            if change < 0 and depth == 0:
+                return i
+            depth += change
+        return end
+
+    def is_pure(self, start, end):
+        """Whether evaluating the expression in tokens [start, end) can have side effects"""
+        tokens = self.tokens
+        i = start
+        while i < end:
+            token = tokens[i]
+            if token.kind == NAME:
+                if token.value == 'function':
+                    i = self.function_end(i)
+                    continue
+                if token.value == 'class':
+                    class_end = self.class_end(i)
+                    if not self.class_is_pure(i, class_end):
+                        return False
+                    i = class_end
+                    continue
+                if token.value in _IMPURE_KEYWORDS:
+                    return False
+                if token.value in _COERCING and not self.literal_operands(i, start, end):
+                    return False
+                if self.is_punct(i + 1, '=>'):
+                    i = self.skip_arrow_body(i + 2, end)
+                    continue
+            elif token.kind == PUNCT:
+                if token.value == '(':
+                    close = self.skip_balanced(i)
+                    if self.is_punct(close, '=>'):
+                        i = self.skip_arrow_body(close + 1, end)
+                        continue
+                    if self.is_punct(close, '{'):
+                        # Method definition: the body runs when called
+                        i = self.skip_balanced(close)
+                        continue
+                    if i > start and _ends_expression(tokens[i - 1]):
+                        return False  # call
+                elif token.value in _ASSIGNMENTS or token.value in ('++', '--'):
+                    return False
+                elif token.value in _COERCING and not self.literal_operands(i, start, end):
+                    return False
+            elif token.kind == TEMPLATE and token.value.startswith('`') and i > start \
+                    and _ends_expression(tokens[i - 1]):
+                return False  # tagged template
+            i += 1
+        return True
+
+    def literal_operands(self, index, start, end):
+        """Whether the operator at index only has literal operands (so converting them runs no code)"""
+        operands = [index + 1]
+        if index > start and _ends_expression(self.tokens[index - 1]):
+            operands.append(index - 1)  # binary
+        for i in operands:
+            token = self.tokens[i] if i < end else None
+            if token is None or not (token.kind in (NUMBER, STRING) or token.kind == TEMPLATE
+                                     and token.value.startswith('`') and token.value.endswith('`')):
+                return False
+        return True
+
+    def skip_arrow_body(self, index, end):
+        if self.is_punct(index, '{'):
+            return self.skip_balanced(index)
+        return self.skip_expression(index, end)
+
+    def string_value(self, index):
+        token = self.tokens[index]
+        if token.kind != STRING:
+            self.error(index, "expected a module specifier string")
+        try:
+            return json.loads('"' + token.value[1:-1].replace('"', '\\"').replace("\\'", "'") + '"')
+        except ValueError:
+            return token.value[1:-1]
+
+    def export_name(self, index):
+        token = self.tokens[index]
+        return self.string_value(index) if token.kind == STRING else token.value
+
+    def parse_specifiers(self, start, end):
+        """[(imported or local name, alias)] from tokens inside { }"""
+        specifiers = []
+        for first, last in self.split_top_level(start, end):
+            if last - first == 1:
+                name = self.export_name(first)
+                specifiers.append((name, name))
+            elif last - first == 3 and self.is_name(first + 1, 'as'):
+                specifiers.append((self.export_name(first), self.export_name(first + 2)))
+            else:
+                self.error(first, "cannot parse import/export list")
+        return specifiers
+
+    def classify_import(self, start, end):
+        tokens = self.tokens
+        body_end = end - 1 if self.is_punct(end - 1, ';') else end
+        statement = Statement(start, end, 'import')
+        bindings = []  # (kind, imported name, local name)
+        i = start + 1
+        if tokens[i].kind != STRING:
+            if tokens[i].kind == NAME and tokens[i].value != 'from' or self.is_name(i, 'from') and self.is_name(i + 1, 'from'):
+                bindings.append(('named', 'default', tokens[i].value))
+                statement.name_tokens.add(i)
+                i += 1
+                if self.is_punct(i, ','):
+                    i += 1
+            if self.is_punct(i, '*'):
+                if not self.is_name(i + 1, 'as'):
+                    self.error(i, "expected 'as' in namespace import")
+                bindings.append(('namespace', None, tokens[i + 2].value))
+                statement.name_tokens.add(i + 2)
+                i += 3
+            elif self.is_punct(i, '{'):
+                close = self.skip_balanced(i)
+                for imported, local in self.parse_specifiers(i + 1, close - 1):
+                    bindings.append(('named', imported, local))
+                statement.name_tokens.update(range(i, close))
+                i = close
+            if not self.is_name(i, 'from'):
+                self.error(i, "expected 'from' in import")
+            i += 1
+        if i != body_end - 1:
+            self.error(i, "cannot parse import")
+        statement.info = {'specifier': self.string_value(i), 'bindings': bindings}
+        statement.names = [local for _, _, local in bindings]
+        return statement
+
+    def classify_export(self, start, end):
+        body_end = end - 1 if self.is_punct(end - 1, ';') else end
+        i = start + 1
+        if self.is_name(i, 'default'):
+            i += 1
+            if self.is_function_start(i) or self.is_name(i, 'class'):
+                inner = self.classify(i, end)
+                if inner.names:
+                    inner.start = start
+                    inner.info = {'export': 'declaration', 'exports': [('default', inner.names[0])], 'strip': i}
+                    return inner
+            statement = Statement(start, end, 'export', [DEFAULT_EXPORT_LOCAL], pure=self.is_pure(i, body_end))
+            statement.info = {'export': 'default', 'exports': [('default', DEFAULT_EXPORT_LOCAL)], 'strip': i}
+            return statement
+        if self.is_function_start(i) or self.is_name(i, 'class') or self.is_name(i, 'var') \
+                or self.is_name(i, 'let') or self.is_name(i, 'const'):
+            inner = self.classify(i, end)
+            if inner.kind == 'var' and inner.info['patterns']:
+                self.error(i, "destructuring exports are not supported when bundling")
+            inner.start = start
+            inner.info = dict(inner.info or {}, export='declaration', exports=[(name, name) for name in inner.names], strip=i)
+            return inner
+        statement = Statement(start, end, 'export')
+        if self.is_punct(i, '*'):
+            if self.is_name(i + 1, 'as'):
+                statement.info = {'export': 'namespace', 'name': self.export_name(i + 2),
+                                  'specifier': self.string_value(i + 4)}
+            else:
+                statement.info = {'export': 'star', 'specifier': self.string_value(i + 2)}
+            return statement
+        if self.is_punct(i, '{'):
+            close = self.skip_balanced(i)
+            specifiers = self.parse_specifiers(i + 1, close - 1)
+            if self.is_name(close, 'from'):
+                statement.info = {'export': 'reexport', 'specifiers': specifiers,
+                                  'specifier': self.string_value(close + 1)}
+            else:
+                # export { local as name } references its locals
+                statement.info = {'export': 'list', 'exports': [(name, local) for local, name in specifiers]}
+                statement.name_tokens.update(range(i, close))
+            return statement
+        self.error(i, "cannot parse export")
+
+    # --- References -----------------------------------------------------
+
+    def references(self, statement):
+        """Names a statement may refer to (over-approximated: shadowing is ignored)"""
+        tokens = self.tokens
+        refs = set()
+        for i in range(statement.start, statement.end):
+            token = tokens[i]
+            if token.kind != NAME or i in statement.name_tokens:
+                continue
+            if i > 0 and tokens[i - 1].kind == PUNCT and tokens[i - 1].value in ('.', '?.'):
+                # a.b only reaches a top-level b through a global object (window.b)
+                if i < 2 or tokens[i - 2].kind != NAME or tokens[i - 2].value not in _GLOBAL_OBJECTS:
+                    continue
+            refs.add(token.value)
+        return refs
+
+    def string_references(self):
+        """Names mentioned as strings: 'fn', 'fn()' or a template's text"""
+        names = set()
+        for token in self.tokens:
+            if token.kind == STRING:
+                match = _NAMED_STRING_RE.match(token.value[1:-1])
+                if match:
+                    names.add(match.group(1))
+        return names
+
+    def keep_comments(self, statements):
+        """Mark statements preceded by an @keep comment"""
+        previous_end = 0
+        for statement in statements:
+            start = self.tokens[statement.start].start
+            if '@keep' in self.source[previous_end:start]:
+                statement.keep = True
+            previous_end = self.tokens[statement.end - 1].end
+
+    def text(self, statement, previous_end):
+        """Source of a statement with the comments and whitespace before it"""
+        return self.source[previous_end:self.tokens[statement.end - 1].end]
+
+    def needs_semicolon(self, statement):
+        last = self.tokens[statement.end - 1]
+        return statement.kind not in ('function', 'class') and not (last.kind == PUNCT and last.value == ';')
+
+
+def html_references(html):
+    """Names used by inline event handlers, javascript: URLs and inline scripts in index.html"""
+    code = [a or b for a, b in _HANDLER_RE.findall(html or '')]
+    code += _INLINE_SCRIPT_RE.findall(html or '')
+    code += _JAVASCRIPT_URL_RE.findall(html or '')
+    names = set()
+    for snippet in code:
+        names.update(_IDENT_RE.findall(snippet))
+    return names
+
+
+def _normalize(path):
+    return posixpath.normpath(path.replace('\\', '/')).lstrip('/')
+
+
+def resolve_specifier(importer, specifier, exists):
+    """Path of the file an import refers to, or None if it cannot be resolved inside src/"""
+    if not specifier.startswith(('./', '../', '/')):
+        return None  # bare specifiers would need a package manager
+    base = '' if specifier.startswith('/') else posixpath.dirname(importer)
+    target = posixpath.normpath(posixpath.join(base, specifier.lstrip('/') if not base else specifier))
+    if target.startswith('..'):
+        return None
+    for candidate in (target, target + '.js', target + '.mjs', posixpath.join(target, 'index.js')):
+        if exists(candidate):
+            return candidate
+    return None
+
+
+def module_dependencies(src_dir, script_order, sources):
+    """Read files imported (transitively) by the listed scripts but not listed themselves
+
+    Import statements are found with a regular expression, so this is cheap
+    enough to run for every build; anything it over-reports is just hashed too.
+    Returns {path: content}.
+    """
+    def exists(path):
+        return path in sources or path in found or os.path.isfile(os.path.join(src_dir, path))
+
+    found = {}
+    pending = [(_normalize(name), sources.get(name)) for name in script_order]
+    while pending:
+        path, content = pending.pop()
+        if not content:
+            continue
+        for _, specifier in _SPECIFIER_RE.findall(content):
+            target = resolve_specifier(path, specifier, exists)
+            if target is None or target in sources or target in found:
+                continue
+            try:
+                with open(os.path.join(src_dir, target), 'r', encoding='utf-8') as f:
+                    found[target] = f.read()
+            except OSError:
+                continue
+            pending.append((target, found[target]))
+    return found
+
+
+class _Module:
+    """An ES module in the bundle"""
+
+    def __init__(self, path, parser, statements):
+        self.path = path
+        self.parser = parser
+        self.statements = statements
+        self.exports = {}        # export name -> ('local', name) | ('reexport', module, name) | ('namespace', module)
+        self.stars = []          # modules re-exported with export *
+        self.imports = []        # (statement, module, kind, imported, local)
+        self.dependencies = []   # modules in import order
+        self.used_exports = set()
+        self.used_locals = set()
+        self.live = None
+        self.variable = None
+
+    def export_names(self, seen=None):
+        seen = seen if seen is not None else set()
+        if self.path in seen:
+            return set()
+        seen.add(self.path)
+        names = set(self.exports)
+        for target in self.stars:
+            names |= {name for name in target.export_names(seen) if name != 'default'}
+        return names
+
+
+def _live_statements(statements, roots):
+    """Indices of statements that are kept: side effects, roots and everything they reference"""
+    declared = {}
+    for index, statement in enumerate(statements):
+        if statement.kind != 'import':
+            for name in statement.names:
+                declared.setdefault(name, []).append(index)
+
+    live = set()
+    stack = [index for index, statement in enumerate(statements)
+             if statement.keep or (not statement.pure and statement.kind != 'import')]
+    for name in roots:
+        stack.extend(declared.get(name, ()))
+    while stack:
+        index = stack.pop()
+        if index in live:
+            continue
+        live.add(index)
+        for name in statements[index].refs:
+            stack.extend(i for i in declared.get(name, ()) if i not in live)
+    return live
+
+
+def _property(name, value):
+    key = name if _IDENT_RE.fullmatch(name) else json.dumps(name)
+    return key if key == value else f"{key}: {value}"
+
+
+class _Bundler:
+    def __init__(self, script_order, sources, html):
+        self.sources = {_normalize(path): content for path, content in sources.items()}
+        self.entries = []
+        for name in script_order:
+            path = _normalize(name)
+            if path not in self.entries:
+                self.entries.append(path)
+        self.html = html
+        self.modules = {}
+        self.classic = []   # (path, parser, statements)
+        self.report = {'missing': [], 'dropped': [], 'shadowed': [], 'warnings': []}
+
+    def exists(self, path):
+        return self.sources.get(path) is not None
+
+    def load_module(self, path, parser=None):
+        if path in self.modules:
+            return self.modules[path]
+        if parser is None:
+            parser = _Parser(self.sources[path], path)
+        statements = parser.parse()
+        parser.keep_comments(statements)
+        module = _Module(path, parser, statements)
+        self.modules[path] = module
+
+        def resolve(statement):
+            specifier = statement.info['specifier']
+            target = resolve_specifier(path, specifier, self.exists)
+            if target is None:
+                parser.error(statement.start, f"cannot resolve import '{specifier}'")
+            dependency = self.load_module(target)
+            if dependency not in module.dependencies:
+                module.dependencies.append(dependency)
+            return dependency
+
+        for statement in statements:
+            if any(parser.is_name(i, 'import') and parser.is_punct(i + 1, '.')
+                   for i in range(statement.start, statement.end)):
+                parser.error(statement.start, "import.meta cannot be bundled")
+            info = statement.info or {}
+            if statement.kind == 'import':
+                dependency = resolve(statement)
+                for kind, imported, local in info['bindings']:
+                    module.imports.append((statement, dependency, kind, imported, local))
+            elif 'export' in info:
+                if info['export'] in ('declaration', 'default', 'list'):
+                    for name, local in info['exports']:
+                        module.exports[name] = ('local', local)
+                elif info['export'] == 'reexport':
+                    dependency = resolve(statement)
+                    for imported, name in info['specifiers']:
+                        module.exports[name] = ('reexport', dependency, imported)
+                elif info['export'] == 'namespace':
+                    module.exports[info['name']] = ('namespace', resolve(statement))
+                elif info['export'] == 'star':
+                    module.stars.append(resolve(statement))
+        return module
+
+    def check_imports(self):
+        for module in self.modules.values():
+            for statement, dependency, kind, imported, local in module.imports:
+                if kind == 'named' and imported not in dependency.export_names():
+                    module.parser.error(statement.start, f"'{dependency.path}' has no export named '{imported}'")
+            for name, export in module.exports.items():
+                if export[0] == 'reexport' and export[2] not in export[1].export_names():
+                    self.error_in(module, f"'{export[1].path}' has no export named '{export[2]}'")
+
+    def error_in(self, module, message):
+        raise BundleError(f"{module.path}: {message}")
+
+    def use_export(self, module, name):
+        """Mark an export as imported somewhere; returns True if that changed anything"""
+        if name in module.used_exports:
+            return False
+        module.used_exports.add(name)
+        export = module.exports.get(name)
+        if export is None:
+            for target in module.stars:
+                if name in target.export_names():
+                    self.use_export(target, name)
+        elif export[0] == 'local':
+            module.used_locals.add(export[1])
+        elif export[0] == 'reexport':
+            self.use_export(export[1], export[2])
+        else:
+            for target_name in export[1].export_names():
+                self.use_export(export[1], target_name)
+        return True
+
+    def shake_modules(self):
+        """Find live statements and used exports of every module, to a fixed point"""
+        changed = True
+        while changed:
+            changed = False
+            for module in self.modules.values():
+                module.live = _live_statements(module.statements, module.used_locals)
+                refs = set()
+                for index in module.live:
+                    refs |= module.statements[index].refs
+                for statement, dependency, kind, imported, local in module.imports:
+                    if local not in refs:
+                        continue
+                    names = dependency.export_names() if kind == 'namespace' else [imported]
+                    for name in names:
+                        changed |= self.use_export(dependency, name)
+
+    def module_free_names(self):
+        """Names live module code uses without declaring or importing them (globals)"""
+        names = set()
+        for module in self.modules.values():
+            declared = set()
+            for statement in module.statements:
+                declared.update(statement.names)
+            for index in module.live:
+                names |= module.statements[index].refs - declared
+        return names
+
+    def shake_classic(self, extra_roots):
+        """Live statements of the classic scripts, which share one global scope"""
+        combined = []
+        for path, parser, statements in self.classic:
+            combined.extend(statements)
+        roots = set(extra_roots) | html_references(self.html)
+        for path, parser, statements in self.classic:
+            roots |= parser.string_references()
+        for module in self.modules.values():
+            roots |= module.parser.string_references()
+
+        # A later function declaration replaces every earlier one with the same name
+        kinds = {}
+        for statement in combined:
+            for name in statement.names:
+                kinds.setdefault(name, set()).add(statement.kind)
+        last = {}
+        for index, statement in enumerate(combined):
+            if statement.kind == 'function' and statement.names and kinds[statement.names[0]] == {'function'}:
+                last[statement.names[0]] = index
+        shadowed = set()
+        for index, statement in enumerate(combined):
+            if statement.kind == 'function' and statement.names and last.get(statement.names[0], index) != index:
+                shadowed.add(index)
+
+        visible = [Statement(0, 0) if index in shadowed else statement for index, statement in enumerate(combined)]
+        for index in shadowed:
+            visible[index].pure = True
+        live = _live_statements(visible, roots) - shadowed
+        return live, shadowed
+
+    def emit_module(self, module, parts, emitted, stack):
+        if module.path in emitted:
+            return
+        if module.path in stack:
+            cycle = ' -> '.join(stack[stack.index(module.path):] + [module.path])
+            raise BundleError(f"import cycle: {cycle}")
+        stack.append(module.path)
+        for dependency in module.dependencies:
+            self.emit_module(dependency, parts, emitted, stack)
+        stack.pop()
+        emitted.add(module.path)
+        module.variable = f"{MODULE_PREFIX}{len(emitted) - 1}"
+
+        parser = module.parser
+        refs = set()
+        for index in module.live:
+            refs |= module.statements[index].refs
+        body = []
+        for statement in module.statements:
+            if statement.kind != 'import':
+                continue
+            named = []
+            for imported_statement, dependency, kind, imported, local in module.imports:
+                if imported_statement is not statement or local not in refs:
+                    continue
+                if kind == 'namespace':
+                    body.append(f"const {local} = {dependency.variable};")
+                elif imported == 'default' and not named:
+                    body.append(f"const {local} = {dependency.variable}.default;")
+                else:
+                    named.append(_property(imported, local))
+                    source_variable = dependency.variable
+            if named:
+                body.append(f"const {{ {', '.join(named)} }} = {source_variable};")
+
+        previous_end = 0
+        mutated = self.reassigned_exports(module)
+        for index, statement in enumerate(module.statements):
+            end = parser.tokens[statement.end - 1].end
+            info = statement.info or {}
+            if statement.kind == 'import' or info.get('export') in ('list', 'reexport', 'namespace', 'star'):
+                previous_end = end
+                continue
+            if index not in module.live:
+                self.report['dropped'].extend((module.path, name) for name in statement.names)
+                previous_end = end
+                continue
+            text = parser.text(statement, previous_end)
+            if 'strip' in info:
+                leading = parser.source[previous_end:parser.tokens[statement.start].start]
+                rest = parser.source[parser.tokens[info['strip']].start:end]
+                if info['export'] == 'default':
+                    rest = rest.rstrip(';')
+                    text = f"{leading}const {DEFAULT_EXPORT_LOCAL} = {rest}"
+                else:
+                    text = leading + rest
+            body.append(text + (';' if parser.needs_semicolon(statement) or info.get('export') == 'default' else ''))
+            previous_end = end
+
+        exported = []
+        for name in sorted(module.used_exports):
+            export = module.exports.get(name)
+            if export is None:
+                target = next(t for t in module.stars if name in t.export_names())
+                value = f"{target.variable}.{name}" if _IDENT_RE.fullmatch(name) else f"{target.variable}[{json.dumps(name)}]"
+            elif export[0] == 'local':
+                value = export[1]
+                if value in mutated:
+                    self.report['warnings'].append(
+                        f"{module.path}: '{value}' is reassigned after export; importers keep its initial value")
+            elif export[0] == 'namespace':
+                value = export[1].variable
+            else:
+                value = f"{export[1].variable}.{export[2]}" if _IDENT_RE.fullmatch(export[2]) \
+                    else f"{export[1].variable}[{json.dumps(export[2])}]"
+            exported.append(_property(name, value))
+
+        code = '\n'.join(['"use strict";'] + [line.strip('\n') for line in body if line.strip()])
+        header = f"// ===== Module: {module.path} =====\n"
+        if exported:
+            parts.append(f"{header}const {module.variable} = (function () {{\n{code}\nreturn {{ {', '.join(exported)} }};\n}})();")
+        else:
+            parts.append(f"{header}(function () {{\n{code}\n}})();")
+
+    def reassigned_exports(self, module):
+        """Exported let/var locals assigned anywhere after their declaration"""
+        mutable = set()
+        for statement in module.statements:
+            if statement.kind == 'var' and statement.info.get('keyword') in ('let', 'var'):
+                mutable.update(statement.names)
+        tokens = module.parser.tokens
+        mutated = set()
+        for i, token in enumerate(tokens):
+            if token.kind != NAME or token.value not in mutable:
+                continue
+            after = tokens[i + 1] if i + 1 < len(tokens) else None
+            before = tokens[i - 1] if i else None
+            if before is not None and before.kind == PUNCT and before.value in ('.', '?.'):
+                continue
+            if (after is not None and after.kind == PUNCT and (after.value in ('++', '--') or after.value in _ASSIGNMENTS)
+                    and not (after.value == '=' and before is not None and before.kind == NAME
+                             and before.value in ('let', 'var', 'const'))) \
+                    or (before is not None and before.kind == PUNCT and before.value in ('++', '--')):
+                mutated.add(token.value)
+        return mutated
+
+    def bundle(self):
+        for path in self.entries:
+            content = self.sources.get(path)
+            if content is None:
+                self.report['missing'].append(path)
+                continue
+            parser = _Parser(content, path)
+            statements = parser.parse()
+            if parser.is_module:
+                self.load_module(path, parser)
+            else:
+                parser.keep_comments(statements)
+                self.classic.append((path, parser, statements))
+        self.check_imports()
+        self.shake_modules()
+        live, shadowed = self.shake_classic(self.module_free_names())
+
+        parts = []
+        emitted = set()
+        offset = 0
+        classic_by_path = {path: (parser, statements) for path, parser, statements in self.classic}
+        for path in self.entries:
+            if path in self.modules:
+                self.emit_module(self.modules[path], parts, emitted, [])
+                continue
+            if path not in classic_by_path:
+                continue
+            parser, statements = classic_by_path[path]
+            body = []
+            previous_end = 0
+            for index, statement in enumerate(statements, start=offset):
+                end = parser.tokens[statement.end - 1].end
+                if index in live:
+                    body.append(parser.text(statement, previous_end) + (';' if parser.needs_semicolon(statement) else ''))
+                else:
+                    target = 'shadowed' if index in shadowed else 'dropped'
+                    self.report[target].extend((path, name) for name in statement.names)
+                previous_end = end
+            offset += len(statements)
+            parts.append(f"// ===== Script: {path} =====\n" + ''.join(body).strip('\n'))
+        return '\n\n'.join(parts) + '\n'
+
+
+def bundle_scripts(script_order, sources, html=''):
+    """Bundle scripts into one JavaScript program with unreachable code removed
+
+    Args:
+        script_order: Script paths from the .app metadata, in order
+        sources: Dict of path -> content for the listed scripts and the
+            modules they import (None for files that do not exist)
+        html: The app's index.html, for names used by inline handlers
+
+    Returns:
+        Dict with js, modules (count), scripts (count), missing, dropped and
+        shadowed ([(path, name)]), warnings, bytes_in and bytes_out
+
+    Raises:
+        BundleError: for unresolved imports, missing exports, import cycles
+        and code the tokenizer cannot parse
+    """
+    bundler = _Bundler(script_order, sources, html)
+    js = bundler.bundle()
+    report = bundler.report
+    bytes_in = sum(len(content.encode('utf-8')) for path, content in bundler.sources.items()
+                   if content is not None and (path in bundler.modules or path in bundler.entries))
+    report.update(
+        js=js,
+        modules=len(bundler.modules),
+        scripts=len(bundler.classic),
+        bytes_in=bytes_in,
+        bytes_out=len(js.encode('utf-8'))
+    )
+    return report
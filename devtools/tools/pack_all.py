@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Pack All Module - Build release packages for every app under a directory
+
+Every package records a hash of its app's sources, packing options and packer
+version in package_info.source_hash. pack_all hashes each app (reusing file
+hashes while size and mtime are unchanged), compares that with the package
+already in the output directory and repacks only the apps that differ, on a
+process pool. Packages and their .sha256 files are replaced atomically, so an
+interrupted run never leaves a truncated release behind.
+
+Release packages are always built in reproducible mode (see
+pack_app.build_package), so an unchanged app repacked anywhere gives the same
+bytes and checksum.
+"""
+
+import io
+import os
+import sys
+import time
+import contextlib
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pack_app import (pack_app, prevalidate_apps, minify_options, bundle_mode, optimize_assets_mode, source_date_epoch,
+                      discover_apps)
+from package_writer import resolve_format_version
+from package_reader import read_header
+from compression import resolve_compression
+import build_cache
+import tracing
+
+
+def release_options():
+    """Packing options that change a release package, as recorded in its source hash"""
+    algorithm, level = resolve_compression(None)
+    options = {
+        'format_version': resolve_format_version(None),
+        'compression': [algorithm, level] if algorithm else None,
+        'minify': minify_options(),
+        'source_date_epoch': source_date_epoch()
+    }
+    # Only when on, so existing release hashes stay valid
+    if bundle_mode():
+        options['bundle'] = True
+    if optimize_assets_mode():
+        import asset_optimize
+        options['optimize_assets'] = asset_optimize.asset_options()
+    return options
+
+
+def existing_source_hash(package_file):
+    """Source hash recorded in an existing release package, or None if there is none"""
+    if not os.path.exists(package_file) or not os.path.exists(f"{package_file}.sha256"):
+        return None
+    try:
+        package_info = read_header(package_file, ('package_info',)).get('package_info') or {}
+        return package_info.get('source_hash')
+    except Exception as e:
+        print(f"⚠️  Warning: Could not read {os.path.basename(package_file)}: {e}")
+        return None
+
+
+def _pack_worker(app_dir, output_file, source_hash):
+    """Pack one app in a worker process, capturing its output and trace spans"""
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log), tracing.span('pack worker', output=os.path.basename(output_file)):
+            success = pack_app(app_dir, output_file, source_hash=source_hash, reproducible=True)
+    except Exception as e:
+        log.write(f"❌ Error packing app: {e}\n")
+        success = False
+    return success, time.perf_counter() - start, log.getvalue(), tracing.drain()
+
+
+def print_summary(results):
+    """Print a per-app summary table"""
+    name_width = max([len('App')] + [len(r['name']) for r in results])
+    print(f"\n📊 Summary:")
+    print(f"   {'App':<{name_width}}  {'Status':<11}  {'Pack':>8}  {'Size':>10}")
+    print(f"   {'-' * name_width}  {'-' * 11}  {'-' * 8}  {'-' * 10}")
+    for r in results:
+        pack_time = f"{r['pack_time']:.2f}s" if r['pack_time'] is not None else '-'
+        size = f"{r['size'] / 1024:.1f} KB" if r['size'] is not None else '-'
+        print(f"   {r['name']:<{name_width}}  {r['status']:<11}  {pack_time:>8}  {size:>10}")
+
+
+@tracing.traced()
+def pack_all(root_dir, output_dir, jobs=None, force=False):
+    """Pack every changed app under root_dir into output_dir/<id>_packaged.app
+
+    Args:
+        root_dir: Directory to search for apps
+        output_dir: Release directory holding the packages and .sha256 files
+        jobs: Number of pack worker processes (default: CPU count)
+        force: Repack every app even if its sources are unchanged
+
+    Returns:
+        True if every app is packed and up to date
+    """
+    apps = discover_apps(root_dir)
+    if not apps:
+        print(f"❌ Error: No apps found under {root_dir}")
+        return False
+
+    os.makedirs(output_dir, exist_ok=True)
+    total_start = time.perf_counter()
+    print(f"📦 Pack All: {len(apps)} apps from {root_dir}")
+    print(f"📁 Output: {output_dir}")
+
+    # Compare source hashes with the packages already in the output directory
+    options = release_options()
+    results = {}
+    dirty = {}
+    with tracing.span('dirty check', apps=len(apps)) as span:
+        for app_id, name, app_dir in apps:
+            output_file = os.path.join(output_dir, f"{app_id}_packaged.app")
+            source_hash = build_cache.compute_source_hash(app_dir, options)
+            results[app_id] = {'name': name, 'status': 'unchanged', 'pack_time': None, 'size': None}
+            if not force and existing_source_hash(output_file) == source_hash:
+                results[app_id]['size'] = os.path.getsize(output_file)
+            else:
+                dirty[app_id] = (app_dir, output_file, source_hash)
+        span.set(dirty=len(dirty))
+
+    print(f"🔍 {len(dirty)} of {len(apps)} apps changed" + (" (forced)" if force else ""))
+    if dirty:
+        # Validate the changed apps in one batched request; the packers then hit the cache
+        validation = prevalidate_apps({app_id: app_dir for app_id, (app_dir, _, _) in dirty.items()})
+        for app_id, result in validation.items():
+            if result is False:
+                results[app_id]['status'] = 'invalid'
+                dirty.pop(app_id)
+
+    if dirty:
+        # Only needed when something has to be packed; keeps no-op runs fast to start
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        jobs = min(jobs or os.cpu_count() or 1, len(dirty))
+        print(f"⚙️  Pack workers: {jobs}")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(_pack_worker, app_dir, output_file, source_hash): app_id
+                for app_id, (app_dir, output_file, source_hash) in dirty.items()
+            }
+            for future in as_completed(futures):
+                app_id = futures[future]
+                result = results[app_id]
+                try:
+                    success, pack_time, log, events = future.result()
+                    tracing.extend(events)
+                except Exception as e:
+                    success, pack_time, log = False, None, f"❌ Worker error: {e}\n"
+                result['pack_time'] = pack_time
+                if not success:
+                    result['status'] = 'pack failed'
+                    print(f"❌ Failed to pack {result['name']}:")
+                    print(log.rstrip())
+                    continue
+                result['status'] = 'packed'
+                result['size'] = os.path.getsize(dirty[app_id][1])
+                print(f"✅ Packed {result['name']} in {pack_time:.2f}s")
+
+    print_summary([results[app_id] for app_id, _, _ in apps])
+    print(f"\n⏱️  Total time: {time.perf_counter() - total_start:.2f}s")
+
+    failed = sum(1 for r in results.values() if r['status'] not in ('packed', 'unchanged'))
+    if failed:
+        print(f"❌ {failed} of {len(apps)} apps failed to pack")
+        return False
+
+    packed = sum(1 for r in results.values() if r['status'] == 'packed')
+    print(f"🎉 {packed} packed, {len(apps) - packed} unchanged")
+    return True
@@ -6,24 +6,94 @@ Pack App Module - Package existing user apps into distributable format
 import os
 import sys
 import json
-import base64
 import hashlib
-import requests
+import importlib
 from pathlib import Path
-from datetime import datetime
-from bs4 import BeautifulSoup, Tag
-import cssutils
-import logging
+from datetime import datetime, timezone
 
-def validate_content(content, filename, app_id):
-    """Validate content using the centralized validation API"""
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_cache
+import tracing
+import http_client
+import vendor_store
+from package_writer import Package, FORMAT_V2, resolve_format_version
+from compression import CompressionStats, resolve_compression
+from css_scope import scope_app_styles
+
+# App ID sent with dev-time validation requests
+VALIDATION_APP_ID = "dev-pack-validation"
+
+class PackError(Exception):
+    """The app's sources were rejected (validation or bundling) and it cannot be packed"""
+
+def discover_apps(root_dir):
+    """Find every app directory (one containing a non-packaged .app file) under root_dir
+
+    Returns a list of (app_id, app_name, app_dir) tuples sorted by directory.
+    """
+    apps = []
+    seen_ids = {}
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        # Skip hidden directories and never descend into app sources
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != 'src')
+
+        app_files = sorted(
+            f for f in filenames
+            if f.endswith('.app') and "_packaged" not in f
+        )
+        if not app_files:
+            continue
+
+        # An app directory's subfolders are not separate apps
+        dirnames[:] = []
+
+        app_file = os.path.join(dirpath, app_files[0])
+        try:
+            with open(app_file, 'r', encoding='utf-8') as f:
+                app_metadata = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Warning: Skipping {app_file}: {e}")
+            continue
+
+        app_id = app_metadata.get('id')
+        if not app_id:
+            print(f"⚠️  Warning: Skipping {app_file}: no 'id' field")
+            continue
+        if app_id in seen_ids:
+            print(f"⚠️  Warning: Skipping {dirpath}: app ID {app_id} already used by {seen_ids[app_id]}")
+            continue
+
+        seen_ids[app_id] = dirpath
+        apps.append((app_id, app_metadata.get('name', app_id), os.path.abspath(dirpath)))
+
+    return apps
+
+
+def _validation_rules_version():
+    """Version of the server validation rules; bump to invalidate cached results"""
+    return os.getenv('SYPNEX_VALIDATION_RULES_VERSION', '1')
+
+def _validation_cache_key(filename, content):
+    """Cache key for a validation result: file type, content hash and rules version"""
+    sha256_hash = hashlib.sha256()
+    sha256_hash.update(f"{_validation_rules_version()}\n{os.path.splitext(filename)[1]}\n".encode('utf-8'))
+    sha256_hash.update(content.encode('utf-8'))
+    return sha256_hash.hexdigest()
+
+def _post_validation(files, app_id):
+    """Send one validation request carrying all files
+    
+    Returns (is_valid, errors), or (None, None) if the API could not be used
+    and packing should continue without validation.
+    """
     try:
         # Get JWT token from environment
         jwt_token = os.getenv('SYPNEX_DEV_TOKEN')
         if not jwt_token:
             print("❌ Error: SYPNEX_DEV_TOKEN not found in environment")
             print("   Please set the development token to use validation")
-            return False
+            return False, []
         
         # Get server URL from environment or use default
         server_url = os.getenv('SYPNEX_SERVER_URL', 'http://localhost:5000')
@@ -36,96 +106,318 @@ def validate_content(content, filename, app_id):
         }
         
         payload = {
-            'files': {filename: content},
+            'files': files,
             'app_id': app_id,
             'enforce_server_side_only': False  # Dev-time validation, check all rules
         }
         
         # Make validation request
-        response = requests.post(validation_url, headers=headers, json=payload, timeout=10)
+        with tracing.http_span('POST', validation_url, files=len(files),
+                               bytes_sent=sum(len(content) for content in files.values())) as span:
+            # Best effort: an unreachable API skips validation at once instead of after backoff retries
+            response = http_client.post(validation_url, headers=headers, json=payload, retries=0)
+            span.set(status=response.status_code)
         
         if response.status_code != 200:
             print(f"❌ Validation API error: {response.status_code}")
             print(f"   Response: {response.text}")
-            return False
+            return False, []
         
         result = response.json()
         validation_results = result.get('validation_results', {})
-        
-        if validation_results.get('is_valid', False):
-            print(f"✅ Validation passed for {filename}")
-            return True
-        else:
-            print(f"❌ Validation failed for {filename}:")
-            errors = validation_results.get('errors', [])
-            for error in errors:
-                print(f"   • {error}")
-            return False
+        return validation_results.get('is_valid', False), validation_results.get('errors', [])
             
-    except requests.exceptions.RequestException as e:
+    except http_client.RequestException as e:
         print(f"❌ Error connecting to validation API: {e}")
         print("   Continuing without validation...")
-        return True  # Continue if API is unavailable
+        return None, None  # Continue if API is unavailable
     except Exception as e:
         print(f"❌ Validation error: {e}")
         print("   Continuing without validation...")
-        return True  # Continue if validation fails
+        return None, None  # Continue if validation fails
+
+@tracing.traced('validate')
+def validate_batch(apps):
+    """Validate the files of several apps with a single API call
+    
+    Files the server has already accepted (same content hash and rules version)
+    are served from the local result cache and never re-sent.
+    
+    Args:
+        apps: Dict of app_id -> {filename: content}
+    
+    Returns:
+        Dict of app_id -> True (valid), False (invalid) or None (the API could
+        not be reached, so the files were not validated)
+    """
+    results = {}
+    pending = {}
+    for app_id, files in apps.items():
+        uncached = {
+            filename: content for filename, content in files.items()
+            if build_cache.load_entry('validation', _validation_cache_key(filename, content)) is None
+        }
+        for filename in files:
+            if filename not in uncached:
+                print(f"♻️  Validation cached for {filename}" + (f" ({app_id})" if len(apps) > 1 else ""))
+        if uncached:
+            pending[app_id] = uncached
+        else:
+            results[app_id] = True
+    
+    if not pending:
+        return results
+    
+    def accept(app_id):
+        for filename, content in pending[app_id].items():
+            build_cache.store_entry('validation', _validation_cache_key(filename, content), {'is_valid': True})
+            print(f"✅ Validation passed for {filename}" + (f" ({app_id})" if len(apps) > 1 else ""))
+        results[app_id] = True
+    
+    if len(pending) == 1:
+        app_id, files = next(iter(pending.items()))
+        is_valid, errors = _post_validation(files, app_id)
+        if is_valid is None:
+            results[app_id] = None  # API unavailable - continue without caching
+        elif is_valid:
+            accept(app_id)
+        else:
+            print(f"❌ Validation failed for {', '.join(files)}:")
+            for error in errors:
+                print(f"   • {error}")
+            results[app_id] = False
+        return results
+    
+    # Several apps: namespace filenames by app and send everything at once
+    combined = {
+        f"{app_id}/{filename}": content
+        for app_id, files in pending.items()
+        for filename, content in files.items()
+    }
+    print(f"🔍 Validating {len(combined)} files from {len(pending)} apps in one request...")
+    is_valid, errors = _post_validation(combined, VALIDATION_APP_ID)
+    if is_valid is None:
+        for app_id in pending:
+            results[app_id] = None
+    elif is_valid:
+        for app_id in pending:
+            accept(app_id)
+    else:
+        # Errors are not attributed per file, so re-check each app on its own
+        print("⚠️  Batch validation failed - re-validating apps individually to locate errors")
+        for app_id, files in pending.items():
+            print(f"🔍 Validating {app_id}...")
+            results[app_id] = validate_files(files)
+    return results
+
+def validate_files(files, app_id=VALIDATION_APP_ID):
+    """Validate several files of one app with a single API call"""
+    return validate_batch({app_id: files})[app_id]
+
+def validate_content(content, filename, app_id):
+    """Validate content using the centralized validation API"""
+    # Continue if the API is unavailable
+    return validate_files({filename: content}, app_id) is not False
 
 def generate_checksum(file_path):
     """Generate SHA256 checksum for a file"""
-    sha256_hash = hashlib.sha256()
     try:
-        with open(file_path, "rb") as f:
-            # Read file in chunks to handle large files efficiently
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+        return build_cache.file_sha256(file_path)
     except Exception as e:
         print(f"❌ Error generating checksum: {e}")
         return None
 
+def verify_sources(files, app_id=None):
+    """Validate the app's HTML, CSS and JS sources in one request
+    
+    Returns True if the server accepted them, None if validation was skipped.
+    Raises PackError if the server rejected them.
+    """
+    result = validate_files(files)
+    if result is False:
+        raise PackError(f"Validation failed" + (f" for {app_id}" if app_id else "") + " - aborting pack")
+    return result
+
+# Minifiers are optional - without them the stage passes sources through unchanged.
+# They are imported on first use (htmlmin alone adds ~30 ms to startup).
+_MINIFIER_MODULES = {'css': 'csscompressor', 'js': 'jsmin', 'html': 'htmlmin'}
+_minifiers = {}
+
+def _minifier(kind):
+    """The minifier module for kind, or None if it is not installed"""
+    if kind not in _minifiers:
+        try:
+            _minifiers[kind] = importlib.import_module(_MINIFIER_MODULES[kind])
+        except ImportError:
+            _minifiers[kind] = None
+    return _minifiers[kind]
+
+def load_minifiers():
+    """Import every installed minifier now instead of on first use (the dev daemon warms up this way)"""
+    return {kind: _minifier(kind) is not None for kind in _MINIFIER_MODULES}
+
+def minify_options():
+    """Which minifiers are enabled, from SYPNEX_MINIFY and SYPNEX_MINIFY_<TYPE> (default: all on)"""
+    def enabled(name):
+        return os.getenv(name, '1').strip().lower() not in ('0', 'false', 'off', 'no')
+    minify = enabled('SYPNEX_MINIFY')
+    return {kind: minify and enabled(f'SYPNEX_MINIFY_{kind.upper()}') for kind in _MINIFIER_MODULES}
+
+def bundle_mode():
+    """Whether to bundle scripts with dead-code elimination instead of concatenating them (SYPNEX_BUNDLE_JS, default: off)"""
+    return os.getenv('SYPNEX_BUNDLE_JS', '0').strip().lower() not in ('', '0', 'false', 'off', 'no')
+
+def optimize_assets_mode():
+    """Whether to optimize additional files before packaging (SYPNEX_OPTIMIZE_ASSETS, default: off)"""
+    return os.getenv('SYPNEX_OPTIMIZE_ASSETS', '0').strip().lower() not in ('', '0', 'false', 'off', 'no')
+
+# Build time of reproducible packages when SOURCE_DATE_EPOCH is unset (1980-01-01, as for zip entries)
+_DEFAULT_SOURCE_DATE_EPOCH = 315532800
+
+def reproducible_mode(reproducible=None):
+    """Whether to write reproducible packages: the argument, else SYPNEX_REPRODUCIBLE, else whether SOURCE_DATE_EPOCH is set"""
+    if reproducible is not None:
+        return bool(reproducible)
+    value = os.getenv('SYPNEX_REPRODUCIBLE')
+    if value is not None:
+        return value.strip().lower() not in ('', '0', 'false', 'off', 'no')
+    return bool(os.getenv('SOURCE_DATE_EPOCH'))
+
+def source_date_epoch():
+    """Build time for reproducible packages, in seconds since the epoch (SOURCE_DATE_EPOCH)"""
+    value = os.getenv('SOURCE_DATE_EPOCH')
+    if not value:
+        return _DEFAULT_SOURCE_DATE_EPOCH
+    try:
+        return int(value)
+    except ValueError:
+        print(f"⚠️  Warning: Ignoring invalid SOURCE_DATE_EPOCH '{value}'")
+        return _DEFAULT_SOURCE_DATE_EPOCH
+
+def build_timestamp(reproducible=False):
+    """created_at for package_info: the current local time, or SOURCE_DATE_EPOCH (UTC) when reproducible"""
+    if not reproducible:
+        return datetime.now().isoformat()
+    return datetime.fromtimestamp(source_date_epoch(), timezone.utc).replace(tzinfo=None).isoformat()
+
 def minify_css(css_content,appi_id=None):
-    """Minify CSS content and validate it"""
-    # Validate CSS content first using a generic validation app_id
-    #print(css_content)
-    if not validate_content(css_content, "style.css", "dev-pack-validation"):
-        print(f"❌ CSS validation failed - aborting pack")
-        sys.exit(1)
-    
-    return css_content;  # Placeholder for CSS minification logic
-
-def verify_html(html_content):
-    """Minify HTML content and validate it"""
-    # Validate HTML content first using a generic validation app_id
-    #print(html_content)
-    if not validate_content(html_content, "index.html", "dev-pack-validation"):
-        print(f"❌ HTML validation failed - aborting pack")
-        sys.exit(1)
+    """Minify CSS content"""
+    csscompressor = _minifier('css')
+    if csscompressor is None:
+        return css_content
+    return csscompressor.compress(css_content)
 
 def minify_html(html_content):
-    """Minify HTML content and validate it"""
-    return html_content;  # Placeholder for HTML minification logic
+    """Minify HTML content"""
+    htmlmin = _minifier('html')
+    if htmlmin is None:
+        return html_content
+    return htmlmin.minify(html_content, remove_comments=True, remove_optional_attribute_quotes=False)
 
 
 def minify_js(js_content):
-    """Minify JavaScript content and validate it"""
-    # Validate JavaScript content first using a generic validation app_id
-    #print(js_content)
-    if not validate_content(js_content, "script.js", "dev-pack-validation"):
-        print(f"❌ JavaScript validation failed - aborting pack")
-        sys.exit(1)
+    """Minify JavaScript content"""
+    jsmin = _minifier('js')
+    if jsmin is None:
+        return js_content
+    # Treat template literals as strings so their contents are preserved
+    return jsmin.jsmin(js_content, quote_chars="'\"`")
+
+@tracing.traced('minify')
+def _minify_cached(kind, content, label):
+    """Minify content of the given kind, caching the result by content hash"""
+    module = _minifier(kind)
+    if module is None:
+        print(f"⚠️  Warning: {kind.upper()} minifier not installed - {label} left unminified")
+        return content
     
-    return js_content;  # Placeholder for JS minification logic
+    sha256_hash = hashlib.sha256()
+    sha256_hash.update(f"{kind}\n{module.__name__} {getattr(module, '__version__', '')}\n".encode('utf-8'))
+    sha256_hash.update(content.encode('utf-8'))
+    key = sha256_hash.hexdigest()
+    
+    cached = build_cache.load_entry('minify', key)
+    if cached is not None:
+        minified = cached['content']
+    else:
+        minifier = {'css': minify_css, 'js': minify_js, 'html': minify_html}[kind]
+        with tracing.span(f"minify {kind}", bytes_in=len(content)) as span:
+            minified = minifier(content)
+            span.set(bytes_out=len(minified))
+        build_cache.store_entry('minify', key, {'content': minified})
+    
+    before = len(content.encode('utf-8'))
+    after = len(minified.encode('utf-8'))
+    saved = 100 * (before - after) / before if before else 0
+    print(f"✂️  Minified {label}: {before:,} → {after:,} bytes ({saved:.0f}% smaller)" + (" [cached]" if cached is not None else ""))
+    return minified
 
+@tracing.traced('bundle')
+def _bundle_scripts(build):
+    """Bundle the app's scripts and the modules they import, dropping unreachable code"""
+    import js_bundle
+    try:
+        result = js_bundle.bundle_scripts(build['entry_scripts'], build['scripts'], build['index_html'])
+    except js_bundle.BundleError as e:
+        raise PackError(f"Bundling failed: {e}")
+    
+    for path, name in result['shadowed']:
+        print(f"⚠️  Warning: {name} in {path} is redefined by a later script - dropped")
+    for warning in result['warnings']:
+        print(f"⚠️  Warning: {warning}")
+    if result['dropped']:
+        names = ', '.join(name for _, name in result['dropped'][:10])
+        more = f" and {len(result['dropped']) - 10} more" if len(result['dropped']) > 10 else ""
+        print(f"🌳 Dropped {len(result['dropped'])} unused declarations: {names}{more}")
+    
+    print(f"📦 Bundled {result['scripts']} scripts and {result['modules']} modules: "
+          f"{result['bytes_in']:,} → {result['bytes_out']:,} bytes")
+    return result['js']
 
-def pack_app(source_dir, output_file):
-    """Pack an existing user app into a distributable format - ID-driven approach"""
+def validation_files(combined, libraries=()):
+    """Map concatenated sources to the filenames the validation API expects
+    
+    With shared libraries the script is validated inside the loader that runs
+    it (see vendor_store.loader_script), as it is shipped.
+    """
+    files = {'index.html': combined['html']}
+    if combined['css'] is not None:
+        files['style.css'] = combined['css']
+    if libraries:
+        files['script.js'] = vendor_store.loader_script(libraries, combined['js'])
+    elif combined['js'] is not None:
+        files['script.js'] = combined['js']
+    return files
+
+
+@tracing.traced()
+def build_package(source_dir, format_version=None, compression=None, external_threshold=None, source_hash=None,
+                  reproducible=None):
+    """Build an in-memory Package for an app - ID-driven approach
+    
+    The package references source files by path and holds only the auto-packed
+    HTML in memory; nothing is serialized until it is written or uploaded.
+    format_version is '1.0' (JSON) or '2.0' (binary container); the default
+    comes from SYPNEX_PACKAGE_FORMAT. compression is 'gzip', 'zstd' or 'none';
+    the default comes from SYPNEX_COMPRESSION. Additional files of at least
+    external_threshold bytes are referenced by hash instead of embedded (for
+    deploys that upload them separately); None embeds everything. Shared
+    vendor libraries (see vendor_store) are always referenced by hash, so
+    shared mode fails without an external_threshold. With SYPNEX_OPTIMIZE_ASSETS on, additional
+    files are first shrunk by asset_optimize and the package references the
+    optimized copies. source_hash
+    (see build_cache.compute_source_hash) is recorded in package_info so a
+    later `pack all` can tell whether the package is stale. reproducible
+    (default: see reproducible_mode) writes byte-identical packages for
+    identical sources: created_at comes from SOURCE_DATE_EPOCH, host paths are
+    left out and tables and keys are sorted. Returns None on failure.
+    """
     
     import glob
     
     # Find ANY .app file in the source directory (but ignore _packaged.app files)
     print(f"🔍 Looking for .app file in: {source_dir}")
-    all_app_files = glob.glob(os.path.join(source_dir, "*.app"))
+    all_app_files = sorted(glob.glob(os.path.join(source_dir, "*.app")))
     
     # Filter out any file that contains "_packaged" to be extra safe
     app_files = [f for f in all_app_files if "_packaged" not in os.path.basename(f)]
@@ -137,7 +429,7 @@ def pack_app(source_dir, output_file):
         print(f"❌ Error: No .app file found in {source_dir}")
         if all_app_files:
             print(f"   (Found {len(all_app_files)} _packaged.app files, but ignoring them)")
-        return False
+        return None
     
     if len(app_files) > 1:
         print(f"⚠️  Multiple .app files found: {[os.path.basename(f) for f in app_files]}")
@@ -155,38 +447,47 @@ def pack_app(source_dir, output_file):
         app_id = app_metadata.get('id', '')
         if not app_id:
             print(f"❌ Error: No 'id' field found in {os.path.basename(app_file)}")
-            return False
+            return None
         
         print(f"🆔 App ID from file: {app_id}")
         print(f"📦 Packing app: {app_metadata.get('name', app_id)}")
         print(f"📁 Source directory: {source_dir}")
         
-        # Auto-pack if needed (for user apps with src/ directory)
-        if app_metadata.get('type') != 'terminal_app':
-            packed_html_file = auto_pack_app(app_id, source_dir)  # Use app_id instead of app_name
-            if packed_html_file:
-                print(f"✅ Auto-packed HTML file: {packed_html_file}")
-        
-        # Prepare package
-        package = {
-            'app_metadata': app_metadata,  # Original .app content (unchanged)
-            'files': {},
-            'package_info': {
-                'format_version': '1.0',
-                'created_at': datetime.now().isoformat(),
-                'packaged_by': 'Sypnex OS App Packager',
-                'source_directory': source_dir
-            }
+        # Prepare package - files are referenced by path and streamed by the writer
+        reproducible = reproducible_mode(reproducible)
+        package_info = {
+            'format_version': resolve_format_version(format_version),
+            'created_at': build_timestamp(reproducible),
+            'packaged_by': 'Sypnex OS App Packager'
         }
+        if not reproducible:
+            # Host-specific, so left out of reproducible packages
+            package_info['source_directory'] = source_dir
+        if source_hash:
+            package_info['source_hash'] = source_hash
+        algorithm, level = resolve_compression(compression)
+        if algorithm:
+            if package_info['format_version'] == FORMAT_V2 and algorithm != 'gzip':
+                print(f"❌ Error: Format {FORMAT_V2} packages only support gzip compression")
+                return None
+            package_info['compression'] = {'algorithm': algorithm, 'level': level}
+        package_files = []
+        package_additional_files = None
         
-        # Add the original .app file (base64 encoded) - use app_id for naming
-        with open(app_file, 'rb') as f:
-            package['files'][f"{app_id}.app"] = base64.b64encode(f.read()).decode('utf-8')
-        print(f"✅ Added {app_id}.app")        # Handle additional files (VFS files)
+        # Add the original .app file - use app_id for naming
+        package_files.append((f"{app_id}.app", app_file))
+        print(f"✅ Added {app_id}.app")
+        
+        # Handle additional files (VFS files)
         additional_files = app_metadata.get('additional_files', [])
         if additional_files:
             print(f"📁 Processing {len(additional_files)} additional files...")
-            package['additional_files'] = []
+            package_additional_files = []
+            asset_optimize = None
+            if optimize_assets_mode():
+                import asset_optimize
+                asset_options = asset_optimize.asset_options()
+                optimized_assets = []
             
             for additional_file in additional_files:
                 vfs_path = additional_file.get('vfs_path')
@@ -205,97 +506,155 @@ def pack_app(source_dir, output_file):
                     continue
                 
                 try:
-                    # Read and encode the additional file
-                    with open(source_path, 'rb') as f:
-                        file_content = f.read()
-                    
-                    # Add to package
-                    package['additional_files'].append({
+                    # Add to package (content is streamed from disk when writing)
+                    size = os.path.getsize(source_path)
+                    if asset_optimize is not None:
+                        asset = asset_optimize.optimize_asset(source_path, source_file, asset_options)
+                        if asset['path'] != source_path:
+                            # Deploys of the package file upload the optimized copy, not the source
+                            optimized_assets.append({'vfs_path': vfs_path, 'source_file': source_file,
+                                                     'sha256': asset['sha256'], 'size': asset['size'],
+                                                     'original_size': asset['original_size']})
+                        source_path, size = asset['path'], asset['size']
+                    external = bool(external_threshold) and size >= external_threshold
+                    package_additional_files.append({
                         'vfs_path': vfs_path,
                         'filename': os.path.basename(vfs_path),
-                        'data': base64.b64encode(file_content).decode('utf-8'),
-                        'size': len(file_content)
+                        'path': source_path,
+                        'size': size,
+                        'external': external
                     })
                     
-                    print(f"✅ Added additional file: {source_file} → {vfs_path}")
+                    if external:
+                        print(f"✅ Added additional file: {source_file} → {vfs_path} (referenced by hash, {size / (1024 * 1024):.1f} MB uploaded separately)")
+                    else:
+                        print(f"✅ Added additional file: {source_file} → {vfs_path}")
                     
                 except Exception as e:
                     print(f"❌ Error processing additional file {source_file}: {e}")
                     continue
+            
+            if asset_optimize is not None and optimized_assets:
+                package_info['optimized_assets'] = optimized_assets
+                before = sum(asset['original_size'] for asset in optimized_assets)
+                after = sum(asset['size'] for asset in optimized_assets)
+                print(f"✂️  Optimized {len(optimized_assets)} of {len(additional_files)} additional files: "
+                      f"{before:,} → {after:,} bytes ({100 * (before - after) / before if before else 0:.0f}% smaller)")
         
         # Add app files based on type - use app_id for naming
         if app_metadata.get('type') == 'terminal_app':
             # Terminal app - add Python file using app_id naming
             python_file = os.path.join(source_dir, f"{app_id}.py")
             if os.path.exists(python_file):
-                with open(python_file, 'rb') as f:
-                    package['files'][f"{app_id}.py"] = base64.b64encode(f.read()).decode('utf-8')
+                package_files.append((f"{app_id}.py", python_file))
                 print(f"✅ Added {app_id}.py")
             else:
                 print(f"⚠️  Warning: Python file {app_id}.py not found")
         else:
-            # User app - add HTML file (packed or original) using app_id naming
+            # Vendor scripts ship once as content-addressed additional files
+            src_dir = os.path.join(source_dir, 'src')
+            libraries = []
+            if os.path.exists(src_dir):
+                libraries, _ = _vendor_split(src_dir, app_metadata.get('scripts', ['script.js']))
+            if libraries:
+                if not external_threshold:
+                    raise PackError("Shared vendor libraries are only uploaded separately - set "
+                                    "SYPNEX_LARGE_FILE_THRESHOLD and deploy to a server with /api/user-apps/uploads, "
+                                    "or turn SYPNEX_SHARED_VENDOR off")
+                package_info['shared_libraries'] = libraries
+                package_additional_files = package_additional_files or []
+            for library in libraries:
+                # Uploaded by hash, so the server stores one copy for every app
+                package_additional_files.append({
+                    'vfs_path': library['vfs_path'],
+                    'filename': library['name'],
+                    'path': os.path.join(src_dir, library['source_file']),
+                    'size': library['size'],
+                    'external': True
+                })
+                print(f"✅ Added shared library: {library['source_file']} → {library['vfs_path']}")
+            
+            # Auto-pack if needed (for user apps with src/ directory) - kept in memory
+            packed_html = build_app_html(app_id, source_dir)
             html_file = os.path.join(source_dir, f"{app_id}.html")
-            intermediate_html_created = False
             
-            if os.path.exists(html_file):
-                with open(html_file, 'rb') as f:
-                    package['files'][f"{app_id}.html"] = base64.b64encode(f.read()).decode('utf-8')
+            if packed_html is not None:
+                package_files.append((f"{app_id}.html", packed_html.encode('utf-8')))
+                print(f"✅ Auto-packed and added {app_id}.html")
+            elif os.path.exists(html_file):
+                # User app without src/ - add the prebuilt HTML file
+                package_files.append((f"{app_id}.html", html_file))
                 print(f"✅ Added {app_id}.html")
-                
-                # Check if this was an intermediate file created by auto-packing
-                if packed_html_file and packed_html_file == html_file:
-                    intermediate_html_created = True
             else:
                 print(f"⚠️  Warning: HTML file {app_id}.html not found")
         
-        # Use the provided output file path
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(package, f, indent=2)
+        return Package(app_id, app_metadata, package_info, package_files, package_additional_files,
+                       canonical=reproducible)
         
-        # Generate SHA256 checksum
-        checksum = generate_checksum(output_file)
+    except PackError as e:
+        print(f"❌ {e}")
+        return None
+    except Exception as e:
+        print(f"❌ Error packing app: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+@tracing.traced()
+def pack_app(source_dir, output_file, format_version=None, compression=None, external_threshold=None,
+             source_hash=None, reproducible=None):
+    """Pack an existing user app into a distributable format"""
+    package = build_package(source_dir, format_version, compression, external_threshold, source_hash, reproducible)
+    if package is None:
+        return False
+    
+    app_id = package.app_id
+    try:
+        # Stream the package to a temp file, hashing it in the same pass. The
+        # checksum file is replaced first: if the run dies in between, the old
+        # package (with its old source hash) is left and is repacked next time.
+        stats = CompressionStats(**(package.compression or {}))
         checksum_file = output_file + '.sha256'
-        
-        # Write checksum file
-        with open(checksum_file, 'w', encoding='utf-8') as f:
-            f.write(f"{checksum}  {os.path.basename(output_file)}\n")
-        
-        # Clean up intermediate HTML file if it was auto-created
-        if packed_html_file and intermediate_html_created:
-            try:
-                os.remove(packed_html_file)
-                print(f"🧹 Cleaned up intermediate file: {os.path.basename(packed_html_file)}")
-            except Exception as e:
-                print(f"⚠️  Warning: Could not clean up intermediate file: {e}")
+        with build_cache.atomic_path(output_file) as tmp_file:
+            with tracing.span('serialize', format=package.format_version) as span:
+                checksum, package_size = package.write(tmp_file, stats)
+                span.set(bytes=package_size, compressed=bool(package.compression))
+            build_cache.write_text_atomic(checksum_file, f"{checksum}  {os.path.basename(output_file)}\n")
         
         # Calculate package size
-        package_size = os.path.getsize(output_file)
         package_size_kb = package_size / 1024
         
         print(f"\n🎉 Successfully packaged '{app_id}'!")
         print(f"📦 Package file: {output_file}")
         print(f"🔐 Checksum file: {checksum_file}")
         print(f"📊 Package size: {package_size_kb:.1f} KB")
+        print(f"📐 Format version: {package.format_version}")
+        stats.report("Compression")
         print(f"🔍 SHA256: {checksum}")
         print(f"📋 Files included:")
-        for filename in package['files'].keys():
+        for filename, _ in package.files:
             print(f"   - {filename}")
         
         # Show additional files if any
-        if 'additional_files' in package and package['additional_files']:
+        if package.additional_files:
             print(f"📁 Additional VFS files:")
-            for additional_file in package['additional_files']:
+            for additional_file in package.additional_files:
                 vfs_path = additional_file['vfs_path']
                 size_kb = additional_file['size'] / 1024
                 print(f"   - {vfs_path} ({size_kb:.1f} KB)")
         
+        if package.format_version == FORMAT_V2:
+            header, blobs = package.v2_layout()
+            entries = len(header['files']) + len(header.get('additional_files', []))
+            if len(blobs) < entries:
+                print(f"♻️  Stored {len(blobs)} unique blobs for {entries} entries (duplicates stored once)")
+        
         print(f"\n💡 Next steps:")
         print(f"   1. Share both {output_file} and {checksum_file}")
         print(f"   2. Recipient can verify integrity using: sha256sum -c {checksum_file}")
         print(f"   3. Install using the app installer after verification")
         print(f"   4. Package contains all necessary files for installation")
-        if 'additional_files' in package and package['additional_files']:
+        if package.additional_files:
             print(f"   5. VFS files will be automatically deployed during installation")
         
         return True
@@ -306,38 +665,113 @@ def pack_app(source_dir, output_file):
         traceback.print_exc()
         return False
 
-def auto_pack_app(app_id, app_path):
-    """Auto-pack a development app into a single HTML file if src/ exists"""
-    src_dir = os.path.join(app_path, 'src')
-    if not os.path.exists(src_dir):
-        return None
+def _read_sources(src_dir, file_order):
+    """Read source files in order; missing files map to None"""
+    sources = {}
+    for name in file_order:
+        path = os.path.join(src_dir, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                sources[name] = f.read()
+        else:
+            sources[name] = None
+    return sources
+
+def _concatenate_sources(src_dir, index_html, style_order, styles, script_order, scripts):
+    """Combine the ordered styles and scripts into single CSS/JS blobs"""
+    all_styles = []
+    missing_styles = []
+    for style_file in style_order:
+        if styles.get(style_file) is not None:
+            all_styles.append(styles[style_file])
+            print(f"✅ Added style: {style_file}")
+        else:
+            missing_styles.append(style_file)
+            print(f"⚠️  Warning: Style file not found: {style_file}")
     
-    html_file = os.path.join(app_path, f"{app_id}.html")
+    if missing_styles:
+        print(f"⚠️  Missing styles: {missing_styles}")
+        print(f"   Available styles in src/: {[f for f in os.listdir(src_dir) if f.endswith('.css')]}")
     
-    # Only repack if any src file is newer than the packed file
-    if os.path.exists(html_file):
-        html_mtime = os.path.getmtime(html_file)
-        src_files = []
-        for f in os.listdir(src_dir):
-            if f.endswith(('.html', '.css', '.js')):
-                src_files.append(os.path.getmtime(os.path.join(src_dir, f)))
+    combined_style = None
+    if all_styles:
+        # Combine all styles with separators
+        style_separators = []
+        for style_name in style_order:
+            if styles.get(style_name) is not None:
+                style_separators.append(f"/* ===== Style: {style_name} ===== */\n")
         
-        if src_files and html_mtime > max(src_files):
-            return html_file  # Already up to date
+        combined_style = '\n\n'.join([sep + style for sep, style in zip(style_separators, all_styles)])
+    
+    all_scripts = []
+    missing_scripts = []
+    for script_file in script_order:
+        if scripts.get(script_file) is not None:
+            all_scripts.append(scripts[script_file])
+            print(f"✅ Added script: {script_file}")
+        else:
+            missing_scripts.append(script_file)
+            print(f"⚠️  Warning: Script file not found: {script_file}")
+    
+    if missing_scripts:
+        print(f"⚠️  Missing scripts: {missing_scripts}")
+        print(f"   Available scripts in src/: {[f for f in os.listdir(src_dir) if f.endswith('.js')]}")
+    
+    combined_script = None
+    if all_scripts:
+        # Combine all scripts with separators
+        script_separators = []
+        for script_name in script_order:
+            script_separators.append(f"// ===== Script: {script_name} =====\n")
+        
+        combined_script = '\n\n'.join(script_separators) + '\n\n'
+        combined_script += '\n\n'.join(all_scripts)
+    
+    return {
+        'html': index_html,
+        'css': combined_style,
+        'js': combined_script,
+        'style_count': len(all_styles),
+        'script_count': len(all_scripts)
+    }
+
+def _vendor_split(src_dir, script_order):
+    """(shared libraries, remaining script order) - vendor scripts are only split off in shared vendor mode
+    
+    Libraries are records from vendor_store.describe_library for the vendor
+    scripts that exist.
+    """
+    if not vendor_store.shared_vendor_mode():
+        return [], script_order
+    vendor_scripts, script_order = vendor_store.split_scripts(script_order)
+    libraries = []
+    for name in vendor_scripts:
+        path = os.path.join(src_dir, name)
+        if not os.path.isfile(path):
+            print(f"⚠️  Warning: Vendor script not found: {name}")
+            continue
+        libraries.append(vendor_store.describe_library(name, path))
+    return libraries, script_order
+
+@tracing.traced('read')
+def _prepare_build(app_id, app_path):
+    """Read an app's sources and compute its build cache key"""
+    src_dir = os.path.join(app_path, 'src')
     
     # Find any .app file to read metadata (ignore _packaged.app files)
     import glob
-    all_app_files = glob.glob(os.path.join(app_path, "*.app"))
+    all_app_files = sorted(glob.glob(os.path.join(app_path, "*.app")))
     app_files = [f for f in all_app_files if "_packaged" not in os.path.basename(f)]
     script_order = ['script.js']  # Default fallback
     style_order = ['style.css']   # Default fallback
-    app_metadata = None  # Initialize to None
+    app_file_bytes = None
     
     if app_files:
         app_file = app_files[0]  # Use the first .app file found
         try:
-            with open(app_file, 'r', encoding='utf-8') as f:
-                app_metadata = json.load(f)
+            with open(app_file, 'rb') as f:
+                app_file_bytes = f.read()
+            app_metadata = json.loads(app_file_bytes.decode('utf-8'))
             script_order = app_metadata.get('scripts', ['script.js'])
             style_order = app_metadata.get('styles', ['style.css'])
             print(f"📋 Script order from .app file: {script_order}")
@@ -351,6 +785,9 @@ def auto_pack_app(app_id, app_path):
         print(f"   Using default script order: {script_order}")
         print(f"   Using default style order: {style_order}")
     
+    # Vendor scripts are loaded from the shared store instead of being inlined
+    libraries, script_order = _vendor_split(src_dir, script_order)
+    
     # Read source files
     index_html_path = os.path.join(src_dir, 'index.html')
     
@@ -358,195 +795,192 @@ def auto_pack_app(app_id, app_path):
         print(f"⚠️  Warning: No index.html found in src/ for {app_id}")
         return None
     
-    merged = ''
     with open(index_html_path, 'r', encoding='utf-8') as f:
-        merged += f.read()
+        index_html = f.read()
+    styles = _read_sources(src_dir, style_order)
+    scripts = _read_sources(src_dir, script_order)
     
-    # Validate the raw HTML content before adding inline styles and scripts
-    verify_html(merged)
+    sources = {'index.html': index_html}
+    sources.update({f"styles/{name}": content for name, content in styles.items()})
+    sources.update({f"scripts/{name}": content for name, content in scripts.items()})
     
-    # Pack styles in order
-    all_styles = []
-    missing_styles = []
+    options = minify_options()
+    key_options = dict(options)
+    # A rules bump discards the cached stages too, so every app is validated again
+    rules_version = _validation_rules_version()
+    if rules_version != '1':
+        key_options['validation_rules'] = rules_version
+    entry_scripts = script_order
+    bundle = bundle_mode()
+    if bundle:
+        # ES modules imported by the scripts are part of the build too
+        import js_bundle
+        modules = js_bundle.module_dependencies(src_dir, script_order, scripts)
+        sources.update({f"modules/{name}": content for name, content in modules.items()})
+        key_options['bundle'] = True
+        # Validation sees every file that ends up in the bundle
+        script_order = script_order + sorted(modules)
+        scripts = dict(scripts, **modules)
+    if libraries:
+        key_options['shared_libraries'] = [[library['source_file'], library['sha256']] for library in libraries]
     
-    for style_file in style_order:
-        style_path = os.path.join(src_dir, style_file)
-        if os.path.exists(style_path):
-            with open(style_path, 'r', encoding='utf-8') as f:
-                style_content = f.read()
-            all_styles.append(style_content)
-            print(f"✅ Added style: {style_file}")
-        else:
-            missing_styles.append(style_file)
-            print(f"⚠️  Warning: Style file not found: {style_file}")
+    return {
+        'src_dir': src_dir,
+        'cache_key': build_cache.compute_build_key(app_id, app_file_bytes, entry_scripts, style_order, sources,
+                                                   key_options),
+        'minify': options,
+        'bundle': bundle,
+        'libraries': libraries,
+        'index_html': index_html,
+        'style_order': style_order,
+        'styles': styles,
+        'entry_scripts': entry_scripts,
+        'script_order': script_order,
+        'scripts': scripts
+    }
+
+@tracing.traced('concatenate')
+def _concatenate_stage(build):
+    """Stage 1: concatenate sources (cached under the build key)"""
+    combined = build_cache.load_stage(build['cache_key'], 'concatenate')
+    if combined is None:
+        combined = _concatenate_sources(
+            build['src_dir'], build['index_html'],
+            build['style_order'], build['styles'],
+            build['script_order'], build['scripts']
+        )
+        build_cache.store_stage(build['cache_key'], 'concatenate', combined)
+    return combined
+
+@tracing.traced()
+def prevalidate_apps(apps):
+    """Validate several apps in one batched request before they are packed
     
-    if missing_styles:
-        print(f"⚠️  Missing styles: {missing_styles}")
-        print(f"   Available styles in src/: {[f for f in os.listdir(src_dir) if f.endswith('.css')]}")
+    Accepted apps get their validate stage cached, so the packers that run
+    afterwards (possibly in other processes) skip validation entirely.
     
-    if all_styles:
-        # Combine all styles with separators
-        style_separators = []
-        for i, style_name in enumerate(style_order):
-            if style_name in [s for s in style_order if os.path.exists(os.path.join(src_dir, s))]:
-                style_separators.append(f"/* ===== Style: {style_name} ===== */\n")
-        
-        combined_style = '\n\n'.join([sep + style for sep, style in zip(style_separators, all_styles)])
-        
-        # Minify the combined CSS
-        minified_style = minify_css(combined_style, app_id)
-        merged += f'\n<style>{minified_style}</style>'
-        print(f"📦 Packed and minified {len(all_styles)} styles in order")
-    else:
-        print(f"⚠️  No styles found to pack")
+    Args:
+        apps: Dict of app_id -> app directory
     
-    # Pack scripts in order
-    all_scripts = []
-    missing_scripts = []
+    Returns:
+        Dict of app_id -> True/False/None (see validate_batch)
+    """
+    results = {}
+    builds = {}
+    batch = {}
+    for app_id, app_path in apps.items():
+        if not os.path.exists(os.path.join(app_path, 'src')):
+            continue
+        build = _prepare_build(app_id, app_path)
+        if build is None:
+            continue
+        if build_cache.load_stage(build['cache_key'], 'validate') is not None:
+            results[app_id] = True
+            continue
+        builds[app_id] = build
+        batch[app_id] = validation_files(_concatenate_stage(build), build['libraries'])
     
-    for script_file in script_order:
-        script_path = os.path.join(src_dir, script_file)
-        if os.path.exists(script_path):
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script_content = f.read()
-            all_scripts.append(script_content)
-            print(f"✅ Added script: {script_file}")
-        else:
-            missing_scripts.append(script_file)
-            print(f"⚠️  Warning: Script file not found: {script_file}")
+    if batch:
+        for app_id, result in validate_batch(batch).items():
+            if result:
+                build_cache.store_stage(builds[app_id]['cache_key'], 'validate', {'is_valid': True})
+            results[app_id] = result
+    return results
+
+@tracing.traced()
+def build_app_html(app_id, app_path):
+    """Build the single-file HTML for a development app if src/ exists
     
-    if missing_scripts:
-        print(f"⚠️  Missing scripts: {missing_scripts}")
-        print(f"   Available scripts in src/: {[f for f in os.listdir(src_dir) if f.endswith('.js')]}")
+    Every stage output is stored in the build cache under a key derived from
+    all inputs, so an unchanged app is rebuilt without any work.
+    Returns the HTML string, or None if the app has no src/index.html.
+    Raises PackError if validation or bundling rejects the sources.
+    """
+    src_dir = os.path.join(app_path, 'src')
+    if not os.path.exists(src_dir):
+        return None
     
-    if all_scripts:
-        # Combine all scripts with separators
-        script_separators = []
-        for i, script_name in enumerate(script_order):
-            script_separators.append(f"// ===== Script: {script_name} =====\n")
-        
-        combined_script = '\n\n'.join(script_separators) + '\n\n'
-        combined_script += '\n\n'.join(all_scripts)
-        
-        # Minify the combined JavaScript
-        minified_script = minify_js(combined_script)
-        merged += f'\n<script>{minified_script}</script>'
-        print(f"📦 Packed and minified {len(all_scripts)} scripts in order")
-    else:
-        print(f"⚠️  No scripts found to pack")
+    build = _prepare_build(app_id, app_path)
+    if build is None:
+        return None
+    cache_key = build['cache_key']
     
-    # Minify the final HTML document
-    minified_html = minify_html(merged)
-    scoped_html = scope_app_styles(minified_html, app_id)
+    # Fast path: the final output for these exact inputs is already cached and was validated
+    validated = build_cache.load_stage(cache_key, 'validate') is not None
+    cached = build_cache.load_stage(cache_key, 'scope') if validated else None
+    if cached is not None:
+        print(f"♻️  Build cache hit for {app_id} ({cache_key[:12]}) - skipping rebuild")
+        return cached['html']
     
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(scoped_html)
+    combined = _concatenate_stage(build)
     
-    return html_file
-
-def scope_app_styles(payload: str, appid: str) -> str:
-    if not payload or not appid:
-        return payload
-
-    try:
-        soup = BeautifulSoup(payload, 'lxml')
-
-        all_rewritten_css = []
+    # Stage 2: validate (raw HTML before inline styles and scripts are added)
+    if not validated:
+        if verify_sources(validation_files(combined, build['libraries']), app_id):
+            build_cache.store_stage(cache_key, 'validate', {'is_valid': True})
+            validated = True
+    else:
+        print(f"♻️  Validation cached for {app_id}")
+    
+    # Stage 3: minify (validation above always sees the original sources)
+    minified = build_cache.load_stage(cache_key, 'minify')
+    if minified is None:
+        options = build['minify']
         
-        # 1. Find, rewrite, and consolidate all CSS from <style> tags
-        for style_tag in soup.find_all('style'):
-            css_text = style_tag.string or ''
-            if not css_text.strip():
-                continue
-
-            # We will modify the sheet in-place, which is efficient.
-            sheet = cssutils.parseString(css_text, validate=False)
-            
-            prefix = f'[data-appid="{appid}"]'
-            keyframes_map = {}
-
-            # We iterate over a copy of the rules in case modification affects the list
-            for rule in list(sheet.cssRules):
-                # Using integer rule types for cross-version compatibility with cssutils.
-                # KEYFRAMES_RULE is type 7.
-                if rule.type == 7:
-                    original_name = rule.name
-                    new_name = f"{appid}-{original_name}"
-                    keyframes_map[original_name] = new_name
-                    rule.name = new_name
-
-            # Second pass: prefix selectors and update animation properties
-            for rule in list(sheet.cssRules):
-                # STYLE_RULE is type 1.
-                if rule.type == 1:
-                    # Rewrite selectors to be scoped under the appid attribute
-                    selectors = rule.selectorText.split(',')
-                    scoped_selectors = []
-                    for s in selectors:
-                        s_stripped = s.strip()
-                        if not s_stripped:
-                            continue
-                        
-                        # Handle special 'root' selectors by targeting the container
-                        if s_stripped.lower() in ['html', 'body', ':root']:
-                            scoped_selectors.append(prefix)
-                        else:
-                            # Prepend the prefix to all other selectors
-                            scoped_selectors.append(f"{prefix} {s_stripped}")
-                    rule.selectorText = ', '.join(scoped_selectors)
-
-                    # If we renamed any keyframes, update animation/animation-name properties
-                    if keyframes_map and rule.style.animationName:
-                        for old_name, new_name in keyframes_map.items():
-                            # Replace animation names in the style declaration
-                            current_animation_names = rule.style.animationName.split(',')
-                            new_animation_names = [
-                                new_name if name.strip() == old_name else name
-                                for name in current_animation_names
-                            ]
-                            rule.style.animationName = ', '.join(new_animation_names)
-            
-            # Serialize the entire modified sheet back to text
-            rewritten_css = sheet.cssText.decode('utf-8') if sheet.cssText else ""
-            if rewritten_css:
-                all_rewritten_css.append(rewritten_css)
-            
-            # Remove the original <style> tag now that we've processed it
-            style_tag.decompose()
-
-        # 2. Add the scoping attribute to the app's root HTML element(s)
-        # Since the payload is a fragment, BeautifulSoup wraps it in <html><body>.
-        # We find the actual root elements inside the body.
-        if soup.body:
-            root_elements = [tag for tag in soup.body.children if isinstance(tag, Tag) and tag.name not in ['style', 'script']]
-            
-            if len(root_elements) == 1:
-                # If there's a single root container, tag it
-                root_elements[0]['data-appid'] = appid
-            elif len(root_elements) > 1:
-                # If there are multiple root elements, wrap them in a new div
-                wrapper = soup.new_tag('div', attrs={'data-appid': appid})
-                for element in root_elements:
-                    wrapper.append(element.extract())
-                soup.body.insert(0, wrapper)
+        # Minify the HTML document on its own so inline styles and scripts are untouched by it
+        merged = combined['html']
+        if options['html']:
+            merged = _minify_cached('html', merged, 'index.html')
         
-        # 3. Add a single new <style> tag with all the rewritten CSS
-        if all_rewritten_css:
-            final_css = "\n\n".join(all_rewritten_css)
-            new_style_tag = soup.new_tag('style', type='text/css')
-            new_style_tag.string = final_css
-            
-            # Prepend the new style to the body, as it's a fragment
-            soup.body.insert(0, new_style_tag)
-
-        #raise Exception("test")
-        # 4. Return the processed HTML fragment
-        # We join the contents of the body to avoid returning the auto-added <html><body> tags.
-        return ''.join(str(c) for c in soup.body.contents)
+        if combined['css'] is not None:
+            css = combined['css']
+            if options['css']:
+                css = _minify_cached('css', css, f"CSS ({combined['style_count']} files)")
+            merged += f"\n<style>{css}</style>"
+            print(f"📦 Packed {combined['style_count']} styles in order")
+        else:
+            print(f"⚠️  No styles found to pack")
+        
+        js = None
+        if combined['js'] is not None:
+            js = combined['js']
+            if build['bundle']:
+                js = _bundle_scripts(build)
+            if options['js']:
+                js = _minify_cached('js', js, f"JS ({combined['script_count']} files)")
+            print(f"📦 Packed {combined['script_count']} scripts in order")
+        elif not build['libraries']:
+            print(f"⚠️  No scripts found to pack")
+        if build['libraries']:
+            # The app's code runs once the shared libraries have loaded
+            js = vendor_store.loader_script(build['libraries'], js)
+            names = ', '.join(library['name'] for library in build['libraries'])
+            print(f"🔗 Loading {len(build['libraries'])} shared libraries from the VFS: {names}")
+        if js is not None:
+            merged += f"\n<script>{js}</script>"
+        
+        minified = {'html': merged}
+        # Unvalidated builds (validation API unreachable) are never cached, so the next pack validates
+        if validated:
+            build_cache.store_stage(cache_key, 'minify', minified)
+    
+    # Stage 4: scope styles to the app
+    with tracing.span('scope', bytes_in=len(minified['html'])) as span:
+        scoped_html = scope_app_styles(minified['html'], app_id)
+        span.set(bytes_out=len(scoped_html))
+    if scoped_html and validated:
+        build_cache.store_stage(cache_key, 'scope', {'html': scoped_html})
+    
+    return scoped_html
 
-    except Exception as e:
-        print(f"Failed to process app styles for appid {appid}: {e}")
-        # In case of any unexpected error, return the original payload to prevent crashes.
-        return ""
+def auto_pack_app(app_id, app_path):
+    """Auto-pack a development app into a single HTML file if src/ exists"""
+    html = build_app_html(app_id, app_path)
+    if html is None:
+        return None
+    
+    html_file = os.path.join(app_path, f"{app_id}.html")
+    with open(html_file, 'w', encoding='utf-8') as f:
+        f.write(html)
     
- 
\ No newline at end of file
+    return html_file
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Package Reader Module - Read packaged apps in any supported format
+
+Detects the format from the file contents:
+    1.0  JSON document with base64-encoded files
+    2.0  Zip container with a package.json header and content-addressed blobs
+
+gzip/zstd-compressed v1 packages are decompressed transparently. Additional
+files marked external carry only their sha256 and size; their bytes were
+uploaded separately and cannot be read from the package.
+"""
+
+import os
+import re
+import sys
+import json
+import codecs
+import base64
+import hashlib
+import zipfile
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from package_writer import FORMAT_V1, FORMAT_V2, V2_HEADER_NAME, V2_BLOB_DIR
+from compression import open_decompressed
+
+_ZIP_MAGIC = b'PK\x03\x04'
+
+_READ_SIZE = 64 * 1024
+_WHITESPACE = ' \t\r\n'
+# Characters that matter while skipping: inside a string an escape or the
+# closing quote, outside one a quote or structural character
+_STRING_SPECIAL = re.compile(r'\\.|"', re.DOTALL)
+_STRUCTURAL = re.compile(r'["{}\[\],]')
+
+
+def detect_format(path):
+    """Return the format version of a package file from its leading bytes"""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    return FORMAT_V2 if head == _ZIP_MAGIC else FORMAT_V1
+
+
+class PackageReader:
+    """Read-only view of a packaged app
+
+    Attributes:
+        format_version: '1.0' or '2.0'
+        app_metadata: Original .app content
+        package_info: Package information dict
+        additional_files: List of dicts with vfs_path, filename and size (plus
+            sha256 and external for files stored outside the package)
+    """
+
+    def __init__(self, path, accept=(FORMAT_V1, FORMAT_V2)):
+        self.path = path
+        self.format_version = detect_format(path)
+        if self.format_version not in accept:
+            raise ValueError(f"Package format {self.format_version} not accepted (accepted: {', '.join(accept)})")
+
+        self._zip = None
+        if self.format_version == FORMAT_V2:
+            self._zip = zipfile.ZipFile(path)
+            header = json.loads(self._zip.read(V2_HEADER_NAME).decode('utf-8'))
+            self._file_table = header.get('files', {})
+        else:
+            with open_decompressed(path) as f:
+                header = json.load(f)
+            self._file_table = header.get('files', {})
+
+        self.app_metadata = header.get('app_metadata', {})
+        self.package_info = header.get('package_info', {})
+        self.additional_files = [
+            {key: value for key, value in entry.items() if key != 'data'}
+            for entry in header.get('additional_files', [])
+        ]
+        self._additional_data = [entry.get('data') for entry in header.get('additional_files', [])]
+
+    def file_names(self):
+        """Names of the packaged app files (e.g. <id>.app, <id>.html)"""
+        return list(self._file_table)
+
+    def _read_blob(self, digest):
+        return self._zip.read(V2_BLOB_DIR + digest)
+
+    def read_file(self, name):
+        """Return the raw bytes of a packaged app file"""
+        entry = self._file_table[name]
+        if self.format_version == FORMAT_V2:
+            return self._read_blob(entry['sha256'])
+        return base64.b64decode(entry)
+
+    def read_additional_file(self, index):
+        """Return the raw bytes of the additional file at index"""
+        if self.additional_files[index].get('external'):
+            raise ValueError(f"{self.additional_files[index]['vfs_path']} is stored outside the package")
+        if self.format_version == FORMAT_V2:
+            return self._read_blob(self.additional_files[index]['sha256'])
+        return base64.b64decode(self._additional_data[index])
+
+    def manifest(self):
+        """Content hashes of the deployable files, in the same shape as Package.manifest()"""
+        if self.format_version == FORMAT_V2:
+            files = {name: entry['sha256'] for name, entry in self._file_table.items()}
+            additional = {entry['vfs_path']: entry['sha256'] for entry in self.additional_files}
+        else:
+            files = {name: hashlib.sha256(self.read_file(name)).hexdigest() for name in self._file_table}
+            additional = {
+                entry['vfs_path']: entry.get('sha256') or hashlib.sha256(self.read_additional_file(index)).hexdigest()
+                for index, entry in enumerate(self.additional_files)
+            }
+        return {'files': files, 'additional_files': additional}
+
+    def additional_file_bytes(self, vfs_path):
+        """Return the raw bytes of the additional file installed at vfs_path"""
+        for index, entry in enumerate(self.additional_files):
+            if entry['vfs_path'] == vfs_path:
+                return self.read_additional_file(index)
+        raise KeyError(vfs_path)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_package(path, accept=(FORMAT_V1, FORMAT_V2)):
+    """Open a package file, restricted to the accepted format versions"""
+    return PackageReader(path, accept)
+
+
+class _JSONStream:
+    """Minimal pull scanner over a JSON text stream, for reading a few top-level keys"""
+
+    def __init__(self, f):
+        self._file = f
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._position = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read more text; returns False at end of stream"""
+        data = self._file.read(_READ_SIZE)
+        if not data:
+            return False
+        self._buffer = self._buffer[self._position:] + self._text.decode(data)
+        self._position = 0
+        return True
+
+    def next_char(self):
+        """Skip whitespace and return the next character (without consuming it), or '' at end"""
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.next_char() != char:
+            raise ValueError(f"Expected '{char}' in package JSON")
+        self._position += 1
+
+    def read_value(self):
+        """Decode one complete JSON value, reading more text until it parses"""
+        self.next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next read
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def skip_value(self):
+        """Skip one JSON value without keeping it in memory"""
+        depth = 0
+        in_string = False
+        self.next_char()
+        while True:
+            buffer = self._buffer
+            position = self._position
+            while True:
+                match = (_STRING_SPECIAL if in_string else _STRUCTURAL).search(buffer, position)
+                if match is None:
+                    # An unmatched backslash can only be the last character; keep it
+                    # so the character it escapes is seen with it after the next read
+                    if in_string and buffer.endswith('\\') and position < len(buffer):
+                        position = len(buffer) - 1
+                    else:
+                        position = len(buffer)
+                    break
+                char = match.group()
+                position = match.end()
+                if in_string:
+                    if char.startswith('\\'):
+                        continue
+                    in_string = False
+                    if depth == 0:
+                        self._position = position
+                        return
+                elif char == '"':
+                    in_string = True
+                elif char in '{[':
+                    depth += 1
+                elif char in '}]' and depth > 0:
+                    depth -= 1
+                    if depth == 0:
+                        self._position = position
+                        return
+                elif depth == 0:
+                    # A ',', '}' or ']' at depth 0 ends a bare literal (number, true, false, null)
+                    self._position = match.start()
+                    return
+            self._position = position
+            if not self._fill():
+                return
+
+
+def _v1_header(path, keys):
+    """Scan a v1 package up to the last of the wanted top-level keys"""
+    wanted = set(keys)
+    found = {}
+    with open_decompressed(path) as f:
+        stream = _JSONStream(f)
+        stream.expect('{')
+        while wanted and stream.next_char() == '"':
+            key = stream.read_value()
+            stream.expect(':')
+            if key in wanted:
+                found[key] = stream.read_value()
+                wanted.discard(key)
+            else:
+                stream.skip_value()
+            if stream.next_char() != ',':
+                break
+            stream.expect(',')
+    return found
+
+
+def read_header(path, keys=('app_metadata', 'package_info')):
+    """Return the wanted top-level header values of a package without loading its files
+
+    v2 packages read only their package.json entry. v1 packages are scanned
+    incrementally and reading stops once every wanted key has been parsed;
+    keys in between (such as the base64 file table) are skipped without being
+    buffered. The cost does not depend on the package size when the wanted keys
+    come first, as app_metadata and package_info do in packages this tool writes.
+    Missing keys are left out of the result.
+    """
+    if detect_format(path) == FORMAT_V2:
+        with zipfile.ZipFile(path) as archive:
+            header = json.loads(archive.read(V2_HEADER_NAME).decode('utf-8'))
+        return {key: header[key] for key in keys if key in header}
+    return _v1_header(path, keys)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Package Writer Module - Stream packaged apps without holding them in memory
+
+A Package references its files by path (or small in-memory blobs such as the
+auto-packed HTML) and produces the serialized package as a stream of chunks.
+The same stream is written to disk with the SHA256 computed in a single pass,
+or handed directly to a streaming multipart upload, so peak memory stays flat
+regardless of how large the packaged assets are.
+
+Two formats are supported:
+    1.0  JSON document with base64-encoded files (json.dump(indent=2) layout)
+    2.0  Zip container with a small package.json header (app_metadata,
+         package_info and a file table) followed by raw, content-addressed
+         blobs stored once under blobs/<sha256>
+
+When package_info records a compression setting, v1 packages are written as
+a single gzip/zstd stream and v2 packages store their entries deflated.
+
+Additional files marked external are not embedded in either format: the
+package lists their sha256 and size, and the bytes are sent separately with a
+resumable chunked upload (see chunked_upload).
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import zipfile
+
+# Add current directory to path for sibling module imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+from compression import compress_chunks
+
+# Read size for source files; a multiple of 3 so base64 chunks concatenate cleanly
+CHUNK_SIZE = 3 * 256 * 1024
+
+FORMAT_V1 = '1.0'
+FORMAT_V2 = '2.0'
+SUPPORTED_FORMATS = (FORMAT_V1, FORMAT_V2)
+
+# v2 container layout
+V2_HEADER_NAME = 'package.json'
+V2_BLOB_DIR = 'blobs/'
+# Fixed entry timestamp - blobs are content-addressed, so dates carry no information
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def resolve_format_version(format_version=None):
+    """Normalise a format version ('1', '2', '2.0', ...) defaulting to SYPNEX_PACKAGE_FORMAT"""
+    value = str(format_version or os.getenv('SYPNEX_PACKAGE_FORMAT', FORMAT_V1)).strip()
+    if '.' not in value:
+        value += '.0'
+    if value not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported package format '{format_version}' (supported: {', '.join(SUPPORTED_FORMATS)})")
+    return value
+
+
+def _dump_value(value, indent_level, sort_keys=False):
+    """Serialize a JSON value the way json.dump(indent=2) would at this nesting level"""
+    text = json.dumps(value, indent=2, sort_keys=sort_keys)
+    return text.replace('\n', '\n' + '  ' * indent_level).encode('utf-8')
+
+
+def _source_size(source):
+    """Size in bytes of a file path or in-memory bytes source"""
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    return os.path.getsize(source)
+
+
+def _base64_length(size):
+    return 4 * ((size + 2) // 3)
+
+
+def _iter_raw(source):
+    """Read a file path or bytes source chunk by chunk"""
+    if isinstance(source, (bytes, bytearray)):
+        for offset in range(0, len(source), CHUNK_SIZE):
+            yield bytes(source[offset:offset + CHUNK_SIZE])
+        return
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            yield chunk
+
+
+def _hash_source(source):
+    sha256_hash = hashlib.sha256()
+    for chunk in _iter_raw(source):
+        sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+class _ChunkSink:
+    """Unseekable write target that lets a ZipFile be drained as a stream"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(name, level=None):
+    """Zip entry header with a fixed timestamp; a level selects deflate compression"""
+    info = zipfile.ZipInfo(name, date_time=_ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_STORED if level is None else zipfile.ZIP_DEFLATED
+    return info
+
+
+def _iter_base64(source):
+    """Base64-encode a file path or bytes source chunk by chunk"""
+    for chunk in _iter_raw(source):
+        yield base64.b64encode(chunk)
+
+
+class Package:
+    """A packaged app that can be streamed to disk or to an upload
+
+    Args:
+        app_id: App ID from the .app metadata
+        app_metadata: Original .app content
+        package_info: Package information dict
+        files: List of (package filename, source) tuples, where source is a
+            file path or bytes
+        additional_files: List of dicts with vfs_path, filename, size and the
+            source path under 'path' (or None if the app has none). Entries
+            with 'external': True are referenced by hash instead of embedded.
+        canonical: Sort the file tables and every JSON object's keys, so equal
+            inputs always serialize to the same bytes (reproducible builds)
+    """
+
+    def __init__(self, app_id, app_metadata, package_info, files, additional_files=None, canonical=False):
+        self.app_id = app_id
+        self.app_metadata = app_metadata
+        self.package_info = package_info
+        self.canonical = canonical
+        if canonical:
+            files = sorted(files, key=lambda item: item[0])
+            if additional_files is not None:
+                additional_files = sorted(additional_files, key=lambda entry: entry['vfs_path'])
+        self.files = files
+        self.additional_files = additional_files
+        self._size = None
+        self._hashes = {}
+
+    @property
+    def filename(self):
+        return f"{self.app_id}_packaged.app"
+
+    @property
+    def format_version(self):
+        return self.package_info.get('format_version', FORMAT_V1)
+
+    def _source_hash(self, source):
+        key = id(source) if isinstance(source, (bytes, bytearray)) else source
+        if key not in self._hashes:
+            self._hashes[key] = _hash_source(source)
+        return self._hashes[key]
+
+    def v2_layout(self, package_info=None):
+        """Build the v2 header and the ordered, de-duplicated blob table
+
+        Returns (header, blobs) where blobs maps sha256 -> source.
+        """
+        blobs = {}
+        file_table = {}
+        for name, source in self.files:
+            digest = self._source_hash(source)
+            blobs.setdefault(digest, source)
+            file_table[name] = {'sha256': digest, 'size': _source_size(source)}
+
+        header = {
+            'app_metadata': self.app_metadata,
+            'package_info': self.package_info if package_info is None else package_info,
+            'files': file_table
+        }
+
+        if self.additional_files is not None:
+            header['additional_files'] = []
+            for entry in self.additional_files:
+                digest = self._source_hash(entry['path'])
+                record = {
+                    'vfs_path': entry['vfs_path'],
+                    'filename': entry['filename'],
+                    'sha256': digest,
+                    'size': int(entry['size'])
+                }
+                if entry.get('external'):
+                    record['external'] = True
+                else:
+                    blobs.setdefault(digest, entry['path'])
+                header['additional_files'].append(record)
+        return header, blobs
+
+    def _iter_v2_chunks(self, package_info, compression=None, stats=None):
+        """Stream the v2 zip container: header first, then each unique blob once"""
+        header, blobs = self.v2_layout(package_info)
+        level = None
+        if compression:
+            if compression['algorithm'] != 'gzip':
+                raise ValueError(f"Format {FORMAT_V2} packages only support gzip (deflate) compression")
+            level = compression['level']
+
+        def drain():
+            data = sink.drain()
+            if stats is not None:
+                stats.compressed_bytes += len(data)
+            return data
+
+        def timed_write(target, data):
+            start = time.perf_counter()
+            target.write(data)
+            if stats is not None:
+                stats.raw_bytes += len(data)
+                stats.seconds += time.perf_counter() - start
+
+        sink = _ChunkSink()
+        # Entries opened by name take the archive's compression and level, and the
+        # ZipInfo default timestamp (1980-01-01), so blobs stay reproducible
+        zip_compression = zipfile.ZIP_STORED if level is None else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(sink, 'w', zip_compression, compresslevel=level, allowZip64=True) as zf:
+            header_bytes = json.dumps(header, indent=2, sort_keys=self.canonical).encode('utf-8')
+            start = time.perf_counter()
+            zf.writestr(_zip_info(V2_HEADER_NAME, level), header_bytes, compresslevel=level)
+            if stats is not None:
+                stats.raw_bytes += len(header_bytes)
+                stats.seconds += time.perf_counter() - start
+            yield drain()
+            for digest, source in blobs.items():
+                size = _source_size(source)
+                with zf.open(V2_BLOB_DIR + digest, 'w', force_zip64=size > zipfile.ZIP64_LIMIT) as blob:
+                    for chunk in _iter_raw(source):
+                        timed_write(blob, chunk)
+                        data = drain()
+                        if data:
+                            yield data
+                yield drain()
+        yield drain()
+
+    def _segments(self, package_info):
+        """Yield the package as literal byte strings and base64 (source,) markers"""
+        yield b'{\n'
+        yield b'  "app_metadata": ' + _dump_value(self.app_metadata, 1, self.canonical) + b',\n'
+        yield b'  "package_info": ' + _dump_value(package_info, 1, self.canonical) + b',\n'
+
+        if self.files:
+            yield b'  "files": {\n'
+            for index, (name, source) in enumerate(self.files):
+                yield f'    {json.dumps(name)}: "'.encode('utf-8')
+                yield (source,)
+                yield b'"' + (b',\n' if index < len(self.files) - 1 else b'\n')
+            yield b'  }'
+        else:
+            yield b'  "files": {}'
+
+        if self.additional_files is not None:
+            yield b',\n  "additional_files": ['
+            for index, entry in enumerate(self.additional_files):
+                yield b'\n    {\n'
+                yield f'      "vfs_path": {json.dumps(entry["vfs_path"])},\n'.encode('utf-8')
+                yield f'      "filename": {json.dumps(entry["filename"])},\n'.encode('utf-8')
+                if entry.get('external'):
+                    yield f'      "sha256": "{self._source_hash(entry["path"])}",\n'.encode('utf-8')
+                    yield b'      "external": true,\n'
+                else:
+                    yield b'      "data": "'
+                    yield (entry['path'],)
+                    yield b'",\n'
+                yield f'      "size": {int(entry["size"])}\n'.encode('utf-8')
+                yield b'    }' + (b',' if index < len(self.additional_files) - 1 else b'\n  ')
+            yield b']'
+
+        yield b'\n}'
+
+    def _iter_v1_chunks(self, package_info):
+        """Yield the v1 document in the same layout as json.dump(indent=2)"""
+        for segment in self._segments(package_info):
+            if isinstance(segment, tuple):
+                yield from _iter_base64(segment[0])
+            else:
+                yield segment
+
+    @property
+    def compression(self):
+        """The {'algorithm', 'level'} compression recorded in package_info, or None"""
+        return self.package_info.get('compression')
+
+    def iter_chunks(self, package_info=None, stats=None):
+        """Yield the serialized package in its format version
+
+        Args:
+            package_info: Override the package_info written into the package
+                (its 'compression' entry also controls compression)
+            stats: Optional CompressionStats filled in as the stream is consumed
+        """
+        package_info = self.package_info if package_info is None else package_info
+        compression = package_info.get('compression')
+        if self.format_version == FORMAT_V2:
+            yield from self._iter_v2_chunks(package_info, compression, stats)
+            return
+
+        chunks = self._iter_v1_chunks(package_info)
+        if compression:
+            chunks = compress_chunks(chunks, compression['algorithm'], compression['level'], stats)
+        yield from chunks
+
+    @property
+    def size(self):
+        """Exact serialized size computed without encoding file contents, or None if unknown (v2 or compressed)"""
+        if self.format_version != FORMAT_V1 or self.compression:
+            return None
+        if self._size is None:
+            total = 0
+            for segment in self._segments(self.package_info):
+                if isinstance(segment, tuple):
+                    total += _base64_length(_source_size(segment[0]))
+                else:
+                    total += len(segment)
+            self._size = total
+        return self._size
+
+    def write(self, output_file, stats=None):
+        """Stream the package to output_file and return its (sha256, size)"""
+        sha256_hash = hashlib.sha256()
+        size = 0
+        with open(output_file, 'wb') as f:
+            for chunk in self.iter_chunks(stats=stats):
+                f.write(chunk)
+                sha256_hash.update(chunk)
+                size += len(chunk)
+        return sha256_hash.hexdigest(), size
+
+    def manifest(self):
+        """Content hashes of the deployable files
+
+        Returns {'files': {name: sha256}, 'additional_files': {vfs_path: sha256}}.
+        """
+        return {
+            'files': {name: self._source_hash(source) for name, source in self.files},
+            'additional_files': {
+                entry['vfs_path']: self._source_hash(entry['path']) for entry in self.additional_files or []
+            }
+        }
+
+    def external_files(self):
+        """Additional files sent outside the package: dicts with vfs_path, filename, path, size and sha256"""
+        return [
+            dict(entry, sha256=self._source_hash(entry['path']))
+            for entry in self.additional_files or [] if entry.get('external')
+        ]
+
+    def additional_file_bytes(self, vfs_path):
+        """Return the raw bytes of the additional file installed at vfs_path"""
+        for entry in self.additional_files or []:
+            if entry['vfs_path'] == vfs_path:
+                return b''.join(_iter_raw(entry['path']))
+        raise KeyError(vfs_path)
+
+    def content_hash(self):
+        """Hash the deployable content, ignoring per-build package_info and compression"""
+        sha256_hash = hashlib.sha256()
+        for chunk in self.iter_chunks(package_info={}):
+            sha256_hash.update(chunk)
+        return sha256_hash.hexdigest()
+
+
+class PackageFile:
+    """An already-written package on disk, streamable like a Package"""
+
+    def __init__(self, path, app_id=None):
+        self.path = path
+        self.app_id = app_id
+        self.filename = os.path.basename(path)
+
+    def iter_chunks(self):
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                yield chunk
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
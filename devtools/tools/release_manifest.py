@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Release Manifest Module - Build versions.json from packaged apps without loading them
+
+Only app_metadata is needed from each package. v2 packages keep it in a small
+zip header; v1 packages are JSON documents where it comes first, so they are
+scanned incrementally (package_reader.read_header) and reading stops as soon
+as app_metadata has been parsed - the base64 file blobs are never read. The
+cost per package is therefore constant, whatever its size.
+
+Results are cached in the build cache by the package file's path, size,
+modification and change times and inode, so a rewritten package is always
+read again.
+"""
+
+import os
+import sys
+import glob
+import hashlib
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from package_reader import read_header
+import build_cache
+
+# Fields copied from app_metadata into versions.json
+MANIFEST_FIELDS = ('name', 'version', 'author', 'description', 'icon')
+
+
+def read_app_metadata(path):
+    """Return the app_metadata of a package file, reading as little of it as possible"""
+    return read_header(path, ('app_metadata',)).get('app_metadata')
+
+
+def _cache_key(path):
+    """Identity of the package file as it is now (path, size, times and inode)
+
+    The .sha256 file next to a package is not used: it can be older than the
+    package, and a stale key would publish stale metadata.
+    """
+    stat = os.stat(path)
+    identity = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{stat.st_ctime_ns}|{stat.st_ino}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def manifest_entry(path):
+    """Return (app_id, entry) for a package, or None if it lacks an id or version"""
+    key = _cache_key(path)
+    cached = build_cache.load_entry('release-manifest', key)
+    if cached is not None:
+        metadata = cached
+    else:
+        app_metadata = read_app_metadata(path) or {}
+        metadata = {field: app_metadata.get(field) for field in ('id',) + MANIFEST_FIELDS}
+        build_cache.store_entry('release-manifest', key, metadata)
+
+    if metadata.get('id') is None or metadata.get('version') is None:
+        return None
+    return metadata['id'], {field: metadata.get(field) for field in MANIFEST_FIELDS}
+
+
+def build_manifest(releases_dir):
+    """Map app id -> {name, version, author, description, icon} for every package in releases_dir"""
+    manifest = {}
+    for path in sorted(glob.glob(os.path.join(releases_dir, '*.app'))):
+        entry = manifest_entry(path)
+        if entry is None:
+            print(f"⚠️  Skipping {os.path.basename(path)}: no id or version in app_metadata")
+            continue
+        app_id, fields = entry
+        manifest[app_id] = fields
+    return manifest
+
+
+def write_manifest(releases_dir, output_file):
+    """Build the manifest and write it to output_file; returns the manifest or None on failure"""
+    try:
+        manifest = build_manifest(releases_dir)
+        build_cache.write_json_atomic(output_file, manifest, indent=2, ensure_ascii=False)
+        return manifest
+    except Exception as e:
+        print(f"❌ Error building release manifest: {e}")
+        return None
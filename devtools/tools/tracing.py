@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tracing Module - Lightweight timed spans with Chrome trace export
+
+Stages and HTTP calls are wrapped in spans that record their duration and
+arguments such as byte counts and cache hits. Tracing is off by default and
+a disabled span costs a single check. When enabled (sypnex.py --profile),
+the collected spans are written in Chrome trace event format, which opens
+in chrome://tracing and https://ui.perfetto.dev.
+
+Worker processes inherit tracing through SYPNEX_TRACE and hand their spans
+back to the parent with drain()/extend(), so one trace covers a parallel run.
+"""
+
+import os
+import json
+import time
+import functools
+import threading
+
+_events = []
+_lock = threading.Lock()
+_enabled = os.getenv('SYPNEX_TRACE') == '1'
+
+
+def enable():
+    """Start recording spans in this process and in worker processes it starts"""
+    global _enabled
+    _enabled = True
+    os.environ['SYPNEX_TRACE'] = '1'
+
+
+def is_enabled():
+    return _enabled
+
+
+def _now_us():
+    return time.time_ns() / 1000
+
+
+def _record(event):
+    with _lock:
+        _events.append(event)
+
+
+class Span:
+    """A timed region; use set() to attach arguments while it runs"""
+
+    __slots__ = ('name', 'category', 'args', '_start')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start = None
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self._start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = f"{exc_type.__name__}: {exc}"
+        _record({
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': self._start,
+            'dur': _now_us() - self._start,
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': self.args
+        })
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled"""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, category='stage', **args):
+    """Context manager timing a region of work
+
+    Example:
+        with tracing.span('minify', kind='css') as s:
+            ...
+            s.set(bytes_in=before, bytes_out=after)
+    """
+    if not _enabled:
+        return _NOOP
+    return Span(name, category, args)
+
+
+def traced(name=None, category='stage'):
+    """Decorator wrapping every call of a function in a span"""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(label, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def http_span(method, url, **args):
+    """Span for an HTTP request, named after the method and URL path"""
+    if not _enabled:
+        return _NOOP
+    path = url.split('://', 1)[-1]
+    path = '/' + path.split('/', 1)[1] if '/' in path else '/'
+    return Span(f"{method} {path.split('?', 1)[0]}", 'http', dict(args, url=url))
+
+
+def instant(name, category='event', **args):
+    """Record a point-in-time event such as a cache hit"""
+    if _enabled:
+        _record({
+            'name': name,
+            'cat': category,
+            'ph': 'i',
+            's': 't',
+            'ts': _now_us(),
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': args
+        })
+
+
+def drain():
+    """Remove and return the spans recorded so far (to send from a worker to its parent)
+
+    Only this process's spans are returned; a forked worker starts with a copy
+    of its parent's spans, which the parent already has.
+    """
+    pid = os.getpid()
+    with _lock:
+        events = [event for event in _events if event['pid'] == pid]
+        _events.clear()
+    return events
+
+
+def extend(events):
+    """Add spans recorded in another process"""
+    if _enabled and events:
+        with _lock:
+            _events.extend(events)
+
+
+def write_trace(path, process_name='sypnex'):
+    """Write all recorded spans as a Chrome trace event file"""
+    with _lock:
+        events = list(_events)
+    metadata = [{
+        'name': 'process_name',
+        'ph': 'M',
+        'pid': pid,
+        'args': {'name': process_name if pid == os.getpid() else f"{process_name} worker {pid}"}
+    } for pid in sorted({event['pid'] for event in events} | {os.getpid()})]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Vendor Store Module - Share third-party libraries between apps by content hash
+
+Scripts listed in an app's .app file from a vendor/ directory (vendor/three.min.js,
+js/vendor/chart.js, ...) are not inlined into the packed HTML. Each one becomes
+an additional file at a content-addressed VFS path:
+
+    /shared/vendor/<sha256>/<filename>
+
+so every app shipping the same library bytes refers to the same file. The
+package lists them under package_info['shared_libraries'] (name, source file,
+sha256, size, vfs_path). They are never embedded: deploys send them as
+external files through the resumable upload (see chunked_upload), which the
+server completes immediately for blobs it already has, and each blob is
+uploaded at most once per run. Shared mode therefore needs
+SYPNEX_LARGE_FILE_THRESHOLD and a server with the uploads endpoint; without
+them the pack fails.
+
+In the packed HTML, a small loader replaces the vendor scripts. It reads each
+library with sypnexAPI.readVirtualFileBlob, checks it against its sha256 and
+runs them in declared order inside the function that holds the app's own
+inline code, so nothing touches window or adds <script> elements. The loader
+is part of the script the validation API checks. Libraries have to declare
+their globals with var, function or an assignment to this (as UMD builds do);
+top-level let, const and class declarations stay inside the eval.
+
+Configuration (environment / .env):
+    SYPNEX_SHARED_VENDOR  1 to share vendor scripts, 0 to inline them (default 0)
+"""
+
+import os
+import sys
+import json
+import posixpath
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_cache
+
+SHARED_VFS_DIR = '/shared/vendor'
+VENDOR_DIR_NAME = 'vendor'
+
+# Libraries are read through the app's own VFS API and run by a direct eval in
+# the function that holds the app code, so they see the same sandboxed scope
+_LOADER = """(function (libraries, run) {
+    function read(library) {
+        return sypnexAPI.readVirtualFileBlob(library.vfs_path).then(function (blob) {
+            return blob.arrayBuffer();
+        }).then(function (bytes) {
+            if (typeof crypto === 'undefined' || !crypto.subtle) {
+                return bytes;
+            }
+            return crypto.subtle.digest('SHA-256', bytes).then(function (digest) {
+                var hex = Array.prototype.map.call(new Uint8Array(digest), function (byte) {
+                    return ('0' + byte.toString(16)).slice(-2);
+                }).join('');
+                if (hex !== library.sha256) {
+                    throw new Error('Shared library ' + library.name + ' does not match its hash');
+                }
+                return bytes;
+            });
+        }).then(function (bytes) {
+            return new TextDecoder().decode(bytes);
+        });
+    }
+    Promise.all(libraries.map(read)).then(run, function (error) {
+        console.error('Failed to load shared libraries:', error);
+    });
+})(%s, function (__sypnexLibraries) {
+    for (var __sypnexIndex = 0; __sypnexIndex < __sypnexLibraries.length; __sypnexIndex++) {
+        eval(__sypnexLibraries[__sypnexIndex]);
+    }
+%s
+});"""
+
+
+def shared_vendor_mode():
+    """Whether vendor scripts are shared instead of inlined (SYPNEX_SHARED_VENDOR, default: off)"""
+    return os.getenv('SYPNEX_SHARED_VENDOR', '0').strip().lower() not in ('', '0', 'false', 'off', 'no')
+
+
+def is_vendor_script(path):
+    """Whether a script path from the .app file lies in a vendor/ directory"""
+    return VENDOR_DIR_NAME in path.replace('\\', '/').split('/')[:-1]
+
+
+def shared_vfs_path(sha256, name):
+    """Content-addressed VFS path of a shared library"""
+    filename = posixpath.basename(name.replace('\\', '/'))
+    return f"{SHARED_VFS_DIR}/{sha256}/{filename}"
+
+
+def describe_library(name, path):
+    """Shared library record for the vendor script name (read from path): name, source_file, sha256, size and vfs_path"""
+    sha256 = build_cache.file_sha256(path)
+    return {
+        'name': posixpath.basename(name.replace('\\', '/')),
+        'source_file': name,
+        'sha256': sha256,
+        'size': os.path.getsize(path),
+        'vfs_path': shared_vfs_path(sha256, name)
+    }
+
+
+def split_scripts(script_order):
+    """Split the .app script order into (vendor scripts, app scripts)"""
+    vendor = [name for name in script_order if is_vendor_script(name)]
+    return vendor, [name for name in script_order if not is_vendor_script(name)]
+
+
+def loader_script(libraries, code):
+    """JavaScript that reads the shared libraries from the VFS, runs them in order, then runs code
+
+    code stays inline: it becomes the body of the function the libraries are
+    evaluated in, so their top-level var and function declarations are visible
+    to it.
+    """
+    entries = [
+        {
+            'name': library['name'],
+            'sha256': library['sha256'],
+            'vfs_path': library['vfs_path']
+        }
+        for library in libraries
+    ]
+    # The result goes inside <script>, so "</" must not appear in string literals
+    return _LOADER % (json.dumps(entries).replace('</', '<\\/'), (code or '').rstrip() + '\n')
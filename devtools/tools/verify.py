@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Verify Module - Check packages against their .sha256 files in parallel
+
+Accepts package files, .sha256 files and directories (every *.app and
+*.sha256 directly inside). Checksum files use the sha256sum format
+("<digest>  <filename>", the filename relative to the checksum file), so
+results match `sha256sum -c`.
+
+Packages are hashed on a thread pool - hashlib releases the GIL and large
+files are memory-mapped, so hashing runs in parallel. Every computed digest is
+cached by (path, size, mtime, ctime, inode); a repeat run only hashes the
+packages that changed on disk.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import build_cache
+import tracing
+
+OK = 'ok'
+MISMATCH = 'mismatch'
+MISSING = 'missing'
+NO_CHECKSUM = 'no-checksum'
+ERROR = 'error'
+
+
+def parse_checksum_file(checksum_file):
+    """Return [(expected digest, package path)] from a sha256sum-format file"""
+    entries = []
+    base_dir = os.path.dirname(checksum_file)
+    with open(checksum_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            digest, _, filename = line.partition(' ')
+            # "<digest>  <name>" (text mode) or "<digest> *<name>" (binary mode)
+            filename = filename[1:] if filename[:1] in (' ', '*') else filename
+            if len(digest) != 64 or not filename:
+                raise ValueError(f"not a sha256sum line: {line[:80]}")
+            entries.append((digest.lower(), os.path.join(base_dir, filename)))
+    return entries
+
+
+def collect_checks(paths):
+    """Expand paths into checks: dicts with path, expected and checksum_file (or an error)"""
+    checks = {}
+
+    def add_checksum_file(checksum_file, only=None):
+        try:
+            entries = parse_checksum_file(checksum_file)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            checks.setdefault(checksum_file, {'path': checksum_file, 'expected': None, 'checksum_file': checksum_file,
+                                              'error': str(e)})
+            return
+        for expected, package_path in entries:
+            if only is None or os.path.abspath(package_path) == os.path.abspath(only):
+                checks[os.path.abspath(package_path)] = {'path': package_path, 'expected': expected,
+                                                         'checksum_file': checksum_file}
+
+    for path in paths:
+        if os.path.isdir(path):
+            for checksum_file in sorted(glob.glob(os.path.join(path, '*.sha256'))):
+                add_checksum_file(checksum_file)
+            packages = sorted(glob.glob(os.path.join(path, '*.app')))
+        elif path.endswith('.sha256'):
+            add_checksum_file(path)
+            packages = []
+        else:
+            packages = [path]
+
+        for package_path in packages:
+            if os.path.abspath(package_path) in checks:
+                continue
+            if os.path.exists(f"{package_path}.sha256"):
+                add_checksum_file(f"{package_path}.sha256", only=package_path)
+            if os.path.abspath(package_path) not in checks:
+                checks[os.path.abspath(package_path)] = {'path': package_path, 'expected': None,
+                                                         'checksum_file': None}
+    return list(checks.values())
+
+
+def _cache_key(path, stat):
+    identity = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{stat.st_ctime_ns}|{stat.st_ino}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def digest_file(path, use_cache=True):
+    """Return (sha256, from_cache) for a file"""
+    stat = os.stat(path)
+    key = _cache_key(path, stat)
+    if use_cache:
+        cached = build_cache.load_entry('verify', key)
+        if cached and cached.get('sha256'):
+            return cached['sha256'], True
+    with tracing.span('hash', path=os.path.basename(path), bytes=stat.st_size):
+        digest = build_cache.file_sha256(path)
+    if use_cache:
+        build_cache.store_entry('verify', key, {'sha256': digest})
+    return digest, False
+
+
+def _verify_one(check, use_cache):
+    result = {
+        'path': check['path'],
+        'checksum_file': check['checksum_file'],
+        'expected': check['expected'],
+        'actual': None,
+        'cached': False
+    }
+    if check.get('error'):
+        result.update(status=ERROR, error=check['error'])
+    elif check['expected'] is None:
+        result['status'] = NO_CHECKSUM
+    elif not os.path.isfile(check['path']):
+        result['status'] = MISSING
+    else:
+        try:
+            result['actual'], result['cached'] = digest_file(check['path'], use_cache)
+            result['status'] = OK if result['actual'] == check['expected'] else MISMATCH
+        except OSError as e:
+            result.update(status=ERROR, error=str(e))
+    return result
+
+
+@tracing.traced()
+def verify_paths(paths, jobs=None, use_cache=True):
+    """Verify every package found in paths; returns a list of result dicts in a stable order
+
+    Each result has path, checksum_file, expected, actual, cached and status
+    (ok, mismatch, missing, no-checksum or error, with an error message).
+    """
+    checks = collect_checks(paths)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lambda check: _verify_one(check, use_cache), checks))
+
+
+_TEXT_STATUS = {
+    OK: 'OK',
+    MISMATCH: 'FAILED',
+    MISSING: 'FAILED open or read',
+    NO_CHECKSUM: 'FAILED no checksum file',
+    ERROR: 'FAILED'
+}
+
+
+def report(results, seconds, as_json=False):
+    """Print results as sha256sum-style lines plus a summary, or as one JSON document"""
+    failed = [result for result in results if result['status'] != OK]
+    cached = sum(1 for result in results if result['cached'])
+    if as_json:
+        print(json.dumps({
+            'ok': not failed and bool(results),
+            'verified': len(results) - len(failed),
+            'failed': len(failed),
+            'cached': cached,
+            'seconds': round(seconds, 4),
+            'results': results
+        }, indent=2))
+        return
+
+    for result in results:
+        line = f"{result['path']}: {_TEXT_STATUS[result['status']]}"
+        if result.get('error'):
+            line += f" ({result['error']})"
+        print(line)
+    if not results:
+        print(f"❌ No packages or checksum files found")
+    elif failed:
+        print(f"❌ {len(failed)} of {len(results)} packages failed verification")
+    else:
+        print(f"✅ {len(results)} packages verified ({cached} from cache) in {seconds:.2f}s")
+
+
+def verify(paths, jobs=None, use_cache=True, as_json=False):
+    """Verify packages and print the results; returns True if every package matched"""
+    start = time.perf_counter()
+    results = verify_paths(paths, jobs, use_cache)
+    report(results, time.perf_counter() - start, as_json)
+    return bool(results) and all(result['status'] == OK for result in results)
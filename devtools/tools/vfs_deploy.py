@@ -5,10 +5,20 @@ VFS Deploy Module - Deploy Python files to VFS /scripts/ directory
 
 import os
 import sys
-import requests
 import json
+import time
+import hashlib
+import posixpath
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Add current directory to path for sibling module imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compression import CompressionStats, compress_bytes, resolve_compression
+import tracing
+import http_client
+import build_cache
+
 # Add parent directory to path for config import
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -26,8 +36,10 @@ def check_and_create_scripts_directory(server_url="http://localhost:5000"):
     """Check if /scripts directory exists, create it if it doesn't"""
     try:
         # Try to get info about the /scripts directory
-        response = requests.get(f'{server_url}/api/virtual-files/info/scripts', 
-                              headers=get_auth_headers())
+        info_url = f'{server_url}/api/virtual-files/info/scripts'
+        with tracing.http_span('GET', info_url) as span:
+            response = http_client.get(info_url, headers=get_auth_headers())
+            span.set(status=response.status_code)
         
         if response.status_code == 200:
             print(f"✅ /scripts directory already exists")
@@ -35,9 +47,12 @@ def check_and_create_scripts_directory(server_url="http://localhost:5000"):
         elif response.status_code == 404:
             # Directory doesn't exist, create it
             print(f"📁 Creating /scripts directory...")
-            create_response = requests.post(f'{server_url}/api/virtual-files/create-folder', 
-                json={'name': 'scripts', 'parent_path': '/'}, 
-                headers=get_auth_headers())
+            folder_url = f'{server_url}/api/virtual-files/create-folder'
+            with tracing.http_span('POST', folder_url) as span:
+                create_response = http_client.post(folder_url, 
+                    json={'name': 'scripts', 'parent_path': '/'}, 
+                    headers=get_auth_headers())
+                span.set(status=create_response.status_code)
             
             if create_response.status_code == 200:
                 print(f"✅ Created /scripts directory")
@@ -53,7 +68,7 @@ def check_and_create_scripts_directory(server_url="http://localhost:5000"):
             print(f"❌ Error checking /scripts directory: {response.status_code}")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except http_client.ConnectionError:
         print(f"❌ Error: Could not connect to server")
         print(f" Make sure your Sypnex OS server is running at {server_url}")
         return False
@@ -61,6 +76,48 @@ def check_and_create_scripts_directory(server_url="http://localhost:5000"):
         print(f"❌ Error checking/creating scripts directory: {e}")
         return False
 
+def write_text_file(server_url, parent_path, filename, content):
+    """Create or overwrite a text file in a VFS folder and return the response"""
+    payload = json.dumps({
+        'name': filename,
+        'parent_path': parent_path,
+        'content': content
+    }).encode('utf-8')
+    headers = get_auth_headers()
+    headers['Content-Type'] = 'application/json'
+    
+    # Compress the request body when SYPNEX_COMPRESSION is set
+    algorithm, level = resolve_compression()
+    stats = CompressionStats(algorithm, level)
+    if algorithm:
+        payload = compress_bytes(payload, algorithm, level, stats)
+        headers['Content-Encoding'] = algorithm
+    
+    # Create the file (API should handle overwriting automatically)
+    file_url = f'{server_url}/api/virtual-files/create-file'
+    with tracing.http_span('POST', file_url, file=filename, bytes_sent=len(payload), content_encoding=algorithm) as span:
+        response = http_client.post(file_url, 
+            data=payload,
+            headers=headers)
+        span.set(status=response.status_code)
+    stats.report(f"Upload of {filename}")
+    return response
+
+def upload_binary_file(server_url, parent_path, filename, data):
+    """Create or overwrite a binary file in a VFS folder and return the response"""
+    headers = get_auth_headers()
+    # requests sets the multipart Content-Type with its boundary
+    headers.pop('Content-Type', None)
+    upload_url = f'{server_url}/api/virtual-files/upload-file'
+    with tracing.http_span('POST', upload_url, file=filename, bytes_sent=len(data)) as span:
+        response = http_client.post(upload_url,
+            files={'file': (filename, data, 'application/octet-stream')},
+            data={'parent_path': parent_path},
+            headers=headers)
+        span.set(status=response.status_code)
+    return response
+
+@tracing.traced()
 def deploy_python_file(python_file, server_url="http://localhost:5000"):
     """Deploy a Python file to VFS /scripts/ directory"""
     
@@ -93,14 +150,7 @@ def deploy_python_file(python_file, server_url="http://localhost:5000"):
     # Step 3: Write file to VFS
     print(f"\n📝 Step 3: Writing {filename} to VFS...")
     try:
-        # Create the file (API should handle overwriting automatically)
-        create_response = requests.post(f'{server_url}/api/virtual-files/create-file', 
-            json={
-                'name': filename,
-                'parent_path': '/scripts',
-                'content': content
-            },
-            headers=get_auth_headers())
+        create_response = write_text_file(server_url, '/scripts', filename, content)
         
         if create_response.status_code == 200:
             result = create_response.json()
@@ -115,7 +165,7 @@ def deploy_python_file(python_file, server_url="http://localhost:5000"):
                 print(f"❌ Failed to write file: {create_response.status_code} - {create_response.text}")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except http_client.ConnectionError:
         print("❌ Error: Could not connect to server")
         print(f" Make sure your Sypnex OS server is running at {server_url}")
         return False
@@ -124,4 +174,231 @@ def deploy_python_file(python_file, server_url="http://localhost:5000"):
         return False
 
     
-    deploy_python_file(python_file, server_url) 
\ No newline at end of file
+    deploy_python_file(python_file, server_url) 
+
+
+# Local names never mirrored to the VFS
+SYNC_IGNORE = {'__pycache__', '.git', '.DS_Store', 'Thumbs.db'}
+SYNC_IGNORE_SUFFIXES = ('.pyc', '.pyo', '.swp', '~')
+
+
+def _is_directory_item(item):
+    return bool(item.get('is_directory') or item.get('is_dir')) or item.get('type') in ('directory', 'folder', 'dir')
+
+
+def list_remote_folder(server_url, vfs_path):
+    """List a VFS folder as {name: item}"""
+    list_url = f'{server_url}/api/virtual-files/list'
+    with tracing.http_span('GET', list_url, path=vfs_path) as span:
+        response = http_client.get(list_url, params={'path': vfs_path}, headers=get_auth_headers())
+        span.set(status=response.status_code)
+    if response.status_code != 200:
+        raise RuntimeError(f"listing {vfs_path} failed with status {response.status_code}")
+    data = response.json()
+    if isinstance(data, dict):
+        items = data.get('items', data.get('files', data.get('contents', [])))
+    else:
+        items = data
+    return {item['name']: item for item in items if isinstance(item, dict) and 'name' in item}
+
+
+def create_remote_folder(server_url, parent_path, name):
+    """Create a VFS folder; returns True on success"""
+    folder_url = f'{server_url}/api/virtual-files/create-folder'
+    with tracing.http_span('POST', folder_url, path=posixpath.join(parent_path, name)) as span:
+        response = http_client.post(folder_url,
+            json={'name': name, 'parent_path': parent_path},
+            headers=get_auth_headers())
+        span.set(status=response.status_code)
+    if response.status_code == 200:
+        return True
+    try:
+        error = response.json().get('error', response.status_code)
+    except Exception:
+        error = response.status_code
+    print(f"❌ Failed to create folder {posixpath.join(parent_path, name)}: {error}")
+    return False
+
+
+def scan_local_tree(local_dir):
+    """Walk a local directory; returns (sorted relative folder paths, {relative file path: absolute path})"""
+    folders = []
+    files = {}
+    for root, dirnames, filenames in os.walk(local_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in SYNC_IGNORE and not d.startswith('.'))
+        rel_root = os.path.relpath(root, local_dir).replace(os.sep, '/')
+        rel_root = '' if rel_root == '.' else rel_root
+        if rel_root:
+            folders.append(rel_root)
+        for filename in sorted(filenames):
+            if filename in SYNC_IGNORE or filename.startswith('.') or filename.endswith(SYNC_IGNORE_SUFFIXES):
+                continue
+            files[posixpath.join(rel_root, filename)] = os.path.join(root, filename)
+    return folders, files
+
+
+def _sync_record_key(server_url, remote_root):
+    return hashlib.sha256(f"{server_url.rstrip('/')}|{remote_root}".encode('utf-8')).hexdigest()
+
+
+def _ensure_remote_root(server_url, remote_root):
+    """Create every missing folder of remote_root; returns its listing ({} if just created) or None on failure"""
+    parent = '/'
+    listing = list_remote_folder(server_url, '/')
+    for name in [part for part in remote_root.split('/') if part]:
+        path = posixpath.join(parent, name)
+        item = listing.get(name) if listing is not None else None
+        if item is None:
+            print(f"📁 Creating {path}")
+            if not create_remote_folder(server_url, parent, name):
+                return None
+            listing = None
+        elif not _is_directory_item(item):
+            print(f"❌ {path} exists on the VFS and is not a folder")
+            return None
+        else:
+            listing = list_remote_folder(server_url, path)
+        parent = path
+    return listing or {}
+
+
+def _needs_upload(remote_item, local_hash, local_size, recorded):
+    """Decide whether a file must be sent
+
+    A remote hash is compared directly. Without one, the file is skipped only
+    when the remote size matches and the local sync record says this exact
+    content was the last upload.
+    """
+    if remote_item is None or _is_directory_item(remote_item):
+        return True
+    remote_hash = remote_item.get('sha256') or remote_item.get('hash')
+    if remote_hash:
+        return remote_hash != local_hash
+    remote_size = remote_item.get('size')
+    if remote_size is None or int(remote_size) != local_size:
+        return True
+    return not recorded or recorded.get('sha256') != local_hash
+
+
+def _upload_file(server_url, parent_path, filename, path):
+    """Upload one file as text when it decodes as UTF-8, otherwise as binary
+
+    The file is read here, in the upload worker, so only the files being sent
+    are held in memory.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError:
+        response = upload_binary_file(server_url, parent_path, filename, data)
+    else:
+        response = write_text_file(server_url, parent_path, filename, content)
+    if response.status_code == 200:
+        return True, None
+    try:
+        error = response.json().get('error', response.status_code)
+    except Exception:
+        error = response.status_code
+    return False, error
+
+
+@tracing.traced()
+def sync_directory(local_dir, remote_root, server_url="http://localhost:5000", concurrency=4):
+    """Mirror a local directory tree to a VFS folder
+    
+    Missing folders are created once, top-down. Files whose remote copy already
+    matches are skipped, and the rest are uploaded with at most `concurrency`
+    requests in flight. Remote files that do not exist locally are left alone.
+    """
+    start = time.perf_counter()
+    remote_root = '/' + remote_root.strip('/')
+    print(f"🔄 VFS Sync: {local_dir} → {remote_root}")
+    print(f"🌐 Server: {server_url}")
+    
+    if not os.path.isdir(local_dir):
+        print(f"❌ Error: Directory '{local_dir}' not found")
+        return False
+    
+    folders, files = scan_local_tree(local_dir)
+    print(f"📋 Found {len(files)} files in {len(folders) + 1} folders")
+    
+    record_key = _sync_record_key(server_url, remote_root)
+    record = build_cache.load_entry('vfs-sync', record_key) or {}
+    
+    try:
+        # Step 1: Create missing folders and collect the remote listings
+        root_listing = _ensure_remote_root(server_url, remote_root)
+        if root_listing is None:
+            return False
+        listings = {'': root_listing}
+        created = 0
+        for folder in folders:
+            parent_rel, name = posixpath.split(folder)
+            parent_listing = listings.get(parent_rel)
+            remote_parent = posixpath.join(remote_root, parent_rel) if parent_rel else remote_root
+            item = parent_listing.get(name) if parent_listing is not None else None
+            if item is not None and _is_directory_item(item):
+                listings[folder] = list_remote_folder(server_url, posixpath.join(remote_root, folder))
+                continue
+            if not create_remote_folder(server_url, remote_parent, name):
+                return False
+            created += 1
+            # A new folder is empty: nothing below it needs listing
+            listings[folder] = {}
+        if created:
+            print(f"📁 Created {created} folders")
+        
+        # Step 2: Work out which files changed
+        pending = []
+        unchanged = 0
+        for rel_path, abs_path in files.items():
+            local_hash = build_cache.file_sha256(abs_path)
+            local_size = os.path.getsize(abs_path)
+            parent_rel, filename = posixpath.split(rel_path)
+            remote_item = listings[parent_rel].get(filename)
+            if _needs_upload(remote_item, local_hash, local_size, record.get(rel_path)):
+                pending.append((rel_path, parent_rel, filename, abs_path, local_hash, local_size))
+            else:
+                unchanged += 1
+    except http_client.ConnectionError:
+        print(f"❌ Error: Could not connect to server")
+        print(f" Make sure your Sypnex OS server is running at {server_url}")
+        return False
+    except Exception as e:
+        print(f"❌ Error reading VFS folder state: {e}")
+        return False
+    
+    # Step 3: Upload changed files in parallel
+    print(f"📤 Uploading {len(pending)} files ({unchanged} unchanged, concurrency {concurrency})")
+    uploaded = 0
+    failed = 0
+    bytes_sent = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {}
+        for rel_path, parent_rel, filename, abs_path, local_hash, local_size in pending:
+            remote_parent = posixpath.join(remote_root, parent_rel) if parent_rel else remote_root
+            futures[pool.submit(_upload_file, server_url, remote_parent, filename, abs_path)] = (
+                rel_path, local_hash, local_size)
+        for future in as_completed(futures):
+            rel_path, local_hash, local_size = futures[future]
+            try:
+                success, error = future.result()
+            except Exception as e:
+                success, error = False, e
+            if success:
+                uploaded += 1
+                bytes_sent += local_size
+                record[rel_path] = {'sha256': local_hash, 'size': local_size}
+                print(f"✅ {rel_path}")
+            else:
+                failed += 1
+                print(f"❌ {rel_path}: {error}")
+    
+    # Drop records of files that no longer exist locally
+    record = {rel_path: entry for rel_path, entry in record.items() if rel_path in files}
+    build_cache.store_entry('vfs-sync', record_key, record)
+    
+    print(f"\n📊 Sync: {uploaded} uploaded ({bytes_sent / 1024:.1f} KB), {unchanged} unchanged, "
+          f"{failed} failed in {time.perf_counter() - start:.2f}s")
+    return failed == 0
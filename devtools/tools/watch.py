@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Watch Module - Redeploy apps automatically when their sources change
+
+Uses inotify on Linux and falls back to polling elsewhere. Bursts of saves
+are debounced, only the app whose files changed is repacked, and only what
+changed since the last deploy is sent (see deploy_state).
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# Add current directory to path for sibling module imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+from dev_deploy import package_app, deploy_changes, refresh_user_apps
+import deploy_state
+import tracing
+
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_IGNORED = 0x00008000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _skip_dir(name):
+    return name.startswith('.') or name == '__pycache__'
+
+
+class InotifyWatcher:
+    """Recursive directory watcher built on Linux inotify"""
+
+    def __init__(self, roots):
+        libc_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = path
+
+    def _add_tree(self, root):
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not _skip_dir(d)]
+            self._add_watch(dirpath)
+
+    def wait(self, timeout=None):
+        """Block until changes arrive (or timeout) and return the changed paths"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return set()
+            raise
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and not _skip_dir(os.path.basename(path)):
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback watcher that compares file mtimes and sizes"""
+
+    def __init__(self, roots, interval=1.0):
+        self._roots = list(roots)
+        self._interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for root in self._roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not _skip_dir(d)]
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Poll until changes appear (or timeout) and return the changed paths"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self._interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def create_watcher(roots, poll_interval=1.0):
+    """Create an inotify watcher when available, otherwise a polling watcher"""
+    if sys.platform.startswith('linux'):
+        try:
+            watcher = InotifyWatcher(roots)
+            print("👀 Using inotify file watching")
+            return watcher
+        except Exception as e:
+            print(f"⚠️  inotify unavailable ({e}), falling back to polling")
+    print(f"👀 Polling for changes every {poll_interval}s")
+    return PollingWatcher(roots, poll_interval)
+
+
+def _is_build_output(app_id, path):
+    """True for files the packer itself writes into the app directory"""
+    filename = os.path.basename(path)
+    return (
+        filename == f"{app_id}.html"
+        or "_packaged" in filename
+        or filename.startswith('.')
+        or filename.endswith(('~', '.swp', '.tmp'))
+    )
+
+
+def _owning_app(apps, path):
+    """Find the app whose directory contains path"""
+    for app_id, app_dir in apps:
+        if path == app_dir or path.startswith(app_dir + os.sep):
+            return None if _is_build_output(app_id, path) else app_id
+    return None
+
+
+@tracing.traced('redeploy')
+def _redeploy(app_id, app_dir, server_url, force=False):
+    """Repack one app and send whatever changed since its last deploy"""
+    start = time.perf_counter()
+    package = package_app(app_id, app_dir, server_url)
+    if package is None:
+        print(f"❌ Failed to pack {app_id} - waiting for the next change")
+        return False
+
+    success, action = deploy_changes(app_id, package, server_url, force)
+    if not success:
+        print(f"❌ Failed to install {app_id} - waiting for the next change")
+        return False
+    if action == deploy_state.UNCHANGED:
+        return True
+
+    if action == deploy_state.FULL_INSTALL:
+        refresh_user_apps(server_url)
+    print(f"✅ Redeployed {app_id} in {time.perf_counter() - start:.2f}s")
+    return True
+
+
+def watch_and_deploy(apps, server_url="http://127.0.0.1:5000", debounce=0.5, poll_interval=1.0, initial_deploy=True,
+                     force=False):
+    """Watch app directories and redeploy whichever app changes
+
+    Args:
+        apps: List of (app_id, app_dir) tuples
+        server_url: Target Sypnex OS server
+        debounce: Seconds of quiet required after a burst of saves before redeploying
+        poll_interval: Polling interval when inotify is unavailable
+        initial_deploy: Deploy every app once before watching
+        force: Reinstall on the initial deploy even if an app is unchanged
+    """
+    apps = [(app_id, os.path.abspath(app_dir)) for app_id, app_dir in apps]
+    if initial_deploy:
+        for app_id, app_dir in apps:
+            print(f"\n📦 Initial deploy of {app_id}...")
+            _redeploy(app_id, app_dir, server_url, force)
+
+    watcher = create_watcher([app_dir for _, app_dir in apps], poll_interval)
+    print(f"\n👀 Watching {len(apps)} app(s) for changes (Ctrl+C to stop)...")
+    try:
+        while True:
+            changed_apps = {_owning_app(apps, path) for path in watcher.wait()} - {None}
+            if not changed_apps:
+                continue
+
+            # Debounce: keep collecting until the burst of saves settles
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed_apps |= {_owning_app(apps, path) for path in more} - {None}
+
+            for app_id, app_dir in apps:
+                if app_id in changed_apps:
+                    tracing.instant('change detected', app_id=app_id)
+                    print(f"\n🔁 Change detected in {app_id} - redeploying...")
+                    _redeploy(app_id, app_dir, server_url)
+            print(f"\n👀 Watching for changes...")
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped watching")
+    finally:
+        watcher.close()
+    return True